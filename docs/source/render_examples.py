@@ -4,6 +4,8 @@ Render the examples to images and adds them to the documentation.
 
 # Standard library imports
 import glob
+import hashlib
+import json
 import os
 import shutil
 import token, tokenize
@@ -27,25 +29,76 @@ def is_mlab_example(filename):
     return ('mlab.show()' in code_only)
 
 
-def run_mlab_file(filename, image_file):
-    ## XXX: Monkey-patch mlab.show, so that we keep control of the
-    ## the mainloop
-    old_show = mlab.show
-    def my_show(func=None):
-        pass
-    mlab.show = my_show
-    mlab.clf()
-    e = mlab.get_engine()
-    e.close_scene(mlab.gcf())
+def _exec_mlab_file(filename):
+    # Runs an example in a worker process of `render_example_images`, the
+    # figure is saved by the worker.
+    mlab.show = lambda func=None: func
     exec(
         compile(open(filename).read(), filename, 'exec'),
         {'__name__': '__main__'}
     )
-    mlab.savefig(image_file)
-    size = mlab.gcf().scene.get_size()
-    for scene in e.scenes:
-        e.close_scene(scene)
-    mlab.show = old_show
+
+
+def render_example_images(filenames, images_dir, n_processes=None):
+    """Renders the thumbnails of the given mlab examples in parallel
+    worker processes with offscreen engines.
+
+    The images are cached in `images_dir` keyed by a hash of the example
+    source, so unchanged examples are not rendered again.  The render
+    time of each example is printed, along with its previous time if it
+    got much slower.
+    """
+    from mayavi.tools.batch import render_batch
+
+    cache_file = os.path.join(images_dir, 'render_cache.json')
+    cache = {}
+    if os.path.exists(cache_file):
+        with open(cache_file) as f:
+            cache = json.load(f)
+
+    todo = []
+    for filename in filenames:
+        short_file_name = os.path.basename(filename)[:-3]
+        image_file = os.path.join(images_dir,
+                                  'example_%s.jpg' % short_file_name)
+        with open(filename, 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        entry = cache.get(short_file_name, {})
+        if entry.get('hash') == digest and os.path.exists(image_file):
+            continue
+        todo.append((filename, short_file_name, image_file, digest))
+
+    print("Rendering %d of %d mlab examples" % (len(todo), len(filenames)))
+    if not todo:
+        return
+
+    def report(index, result):
+        filename, short_file_name, image_file, digest = todo[index]
+        if not result.ok:
+            print("Failed to render %s:\n%s" % (filename, result.error))
+            return
+        # The worker saves the image under a temporary name.
+        shutil.move(result.result, image_file)
+        total = result.build_time + result.render_time
+        old = cache.get(short_file_name, {}).get('time')
+        if old is not None and total > 1.5*old + 0.5:
+            print("Rendered %s in %.2f s (SLOWER, was %.2f s)" %
+                  (filename, total, old))
+        else:
+            print("Rendered %s in %.2f s" % (filename, total))
+        cache[short_file_name] = dict(hash=digest, time=round(total, 3))
+
+    if not os.path.exists(images_dir):
+        os.makedirs(images_dir)
+    tmp_dir = os.path.join(images_dir, 'tmp_render')
+    try:
+        render_batch(_exec_mlab_file, [t[0] for t in todo],
+                     n_processes=n_processes, directory=tmp_dir,
+                     file_pattern='%05d.jpg', callback=report)
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        with open(cache_file, 'w') as f:
+            json.dump(cache, f, indent=1, sort_keys=True)
 
 
 def extract_docstring(filename):
@@ -380,24 +433,25 @@ Advanced mlab examples
 
     images_dir = 'mayavi/generated_images'
 
-    def render_example_page(self, stream, index, file_details):
-        """ Hijack this method to, optionally, render images.
+    # The number of processes used to render the images, defaults to the
+    # number of CPUs.
+    n_processes = None
+
+    def render_all(self, stream, file_list):
+        """ Hijack this method to, optionally, render images before
+            the gallery refers to them.
         """
-        filename, short_file_name, short_desc, title, docstring, end_row = \
-                                                            file_details
         if self.render_images:
-            print("Generating images for %s" % filename)
-            image_file = os.path.join(self.images_dir, 'example_%s.jpg' \
-                                    % short_file_name)
-            run_mlab_file(filename, image_file=image_file)
-        ImagesExampleLister.render_example_page(self, stream,
-                                                index, file_details)
+            render_example_images(file_list, self.images_dir,
+                                  n_processes=self.n_processes)
+        ImagesExampleLister.render_all(self, stream, file_list)
 
 
 
 ################################################################################
 # Main entry point
-def render_examples(render_images=False, out_dir='mayavi/auto'):
+def render_examples(render_images=False, out_dir='mayavi/auto',
+                    n_processes=None):
     if not os.path.exists(out_dir):
         os.makedirs(out_dir)
     example_gallery_file = open(os.path.join(out_dir, 'examples.rst'), 'w')
@@ -423,10 +477,8 @@ Example gallery
 
     mlab_example_lister = MlabExampleLister(render_images=render_images,
                                         out_dir=out_dir,
-                                        images_dir='mayavi/generated_images')
-    if render_images:
-        pass
-        # XXX: Add logics to deal with rerendering examples cleverly
+                                        images_dir='mayavi/generated_images',
+                                        n_processes=n_processes)
 
     mlab_example_lister.render_all(example_gallery_file, example_files)
 
@@ -0,0 +1,73 @@
+"""Compare the time taken by the generic contour filter and by the
+flying edges algorithm of the Contour component to contour fields of
+growing size.
+
+Run it as::
+
+    $ python bench_contour.py [max_size]
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+from __future__ import print_function
+
+import sys
+import time
+
+import numpy as np
+
+from mayavi.core.null_engine import NullEngine
+from mayavi.modules.iso_surface import IsoSurface
+from mayavi.sources.array_source import ArraySource
+from tvtk.api import tvtk
+
+
+def make_field(n):
+    x, y, z = np.ogrid[-5:5:n*1j, -5:5:n*1j, -5:5:n*1j]
+    return np.sin(x*y*z)/(x*y*z + 1e-9) + 0.1*x*x + 0.1*y*y
+
+
+def bench(contour, algorithm):
+    contour.algorithm = algorithm
+    cf = contour.contour_filter
+    cf.modified()
+    start = time.time()
+    cf.update()
+    return cf.output.number_of_cells, time.time() - start
+
+
+def main(max_size=256):
+    if not hasattr(tvtk, 'FlyingEdges3D'):
+        print('Flying edges is not available in this VTK.')
+        return
+    e = NullEngine()
+    e.start()
+    print('%6s %10s %10s %10s %7s' % (
+        'size', 'cells', 'generic s', 'flying s', 'speedup'
+    ))
+    n = 32
+    while n <= max_size:
+        e.new_scene()
+        e.add_source(ArraySource(scalar_data=make_field(n)))
+        iso = IsoSurface()
+        e.add_module(iso)
+        iso.contour.contours = [0.5, 1.0, 2.0]
+        cells, generic = bench(iso.contour, 'generic')
+        fe_cells, flying = bench(iso.contour, 'flying_edges')
+        if fe_cells != cells:
+            print('Different number of cells: %d and %d' %
+                  (cells, fe_cells))
+        print('%6d %10d %10.3f %10.3f %7.1f' % (
+            n, cells, generic, flying, generic/max(flying, 1e-6)
+        ))
+        e.close_scene(e.current_scene)
+        n *= 2
+    e.stop()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(int(sys.argv[1]))
+    else:
+        main()
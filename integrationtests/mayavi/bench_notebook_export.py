@@ -0,0 +1,57 @@
+"""Compare the size and the time taken by the X3D and the binary glTF
+exports used to show scenes in Jupyter notebooks.
+
+Run it as::
+
+    $ python bench_notebook_export.py [max_triangles]
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+from __future__ import print_function
+
+import sys
+import time
+
+import numpy as np
+
+from mayavi import mlab
+from mayavi.tools import notebook
+
+
+def make_scene(n):
+    x, y = np.mgrid[-3:3:n*1j, -3:3:n*1j]
+    mlab.surf(x, y, np.sin(x*y))
+
+
+def bench(func, scene):
+    start = time.time()
+    html = func(scene)
+    return len(html), time.time() - start
+
+
+def main(max_triangles=2e6):
+    mlab.options.offscreen = True
+    print('%10s %14s %10s %14s %10s %7s' % (
+        'triangles', 'x3d bytes', 'x3d s', 'gltf bytes', 'gltf s', 'ratio'
+    ))
+    n = 100
+    while 2*(n - 1)**2 <= max_triangles:
+        fig = mlab.figure()
+        make_scene(n)
+        x3d_size, x3d_time = bench(notebook.scene_to_x3d, fig.scene)
+        gltf_size, gltf_time = bench(notebook.scene_to_gltf, fig.scene)
+        print('%10d %14d %10.3f %14d %10.3f %7.1f' % (
+            2*(n - 1)**2, x3d_size, x3d_time, gltf_size, gltf_time,
+            float(x3d_size)/gltf_size
+        ))
+        mlab.close(fig)
+        n *= 2
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        main(float(sys.argv[1]))
+    else:
+        main()
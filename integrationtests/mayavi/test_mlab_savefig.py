@@ -4,6 +4,7 @@ import sys
 import unittest
 import tempfile
 
+import mock
 import numpy
 
 from mayavi import mlab
@@ -78,6 +79,27 @@ class TestMlabSavefigUnitTest(unittest.TestCase):
             savefig(self.filename, size=(131, 217),
                     figure=self.figure)
 
+    def test_tiled_savefig_does_not_resize_window(self):
+        """Test if a tiled savefig produces the requested size"""
+        engine = Engine()
+        self.setup_engine_and_figure(engine)
+        create_quiver3d()
+        window_size = tuple(self.figure.scene.render_window.size)
+
+        for fname in ('tiled.png', 'tiled.jpg'):
+            # When
+            filename = os.path.join(self.temp_dir, fname)
+            savefig(filename, size=(331, 217), figure=self.figure,
+                    tiled=True)
+
+            # Then
+            image = mlab.pipeline.open(filename, figure=False)
+            self.assertEqual(
+                tuple(image.reader.output.dimensions[:2]), (331, 217)
+            )
+            self.assertEqual(tuple(self.figure.scene.render_window.size),
+                             window_size)
+
     def _get_pixel_ratio(self, fig):
         return getattr(fig.scene._vtk_control, '_pixel_ratio', 1.0)
 
@@ -101,6 +123,73 @@ class TestMlabSavefigUnitTest(unittest.TestCase):
             # Then
             self.assertEqual(data.shape, (sz[1], sz[0], 4))
 
+    def test_mlab_screenshot_modes_and_buffers(self):
+        # Given
+        engine = Engine()
+        self.setup_engine_and_figure(engine)
+        create_quiver3d()
+        rgb = screenshot(mode='rgb')
+        ny, nx = rgb.shape[:2]
+
+        # When
+        data = screenshot(mode='rgba_uint8')
+        depth = screenshot(mode='depth')
+
+        # Then
+        self.assertEqual(data.shape, (ny, nx, 4))
+        self.assertEqual(data.dtype, numpy.uint8)
+        numpy.testing.assert_array_equal(data[..., :3], rgb)
+        self.assertEqual(depth.shape, (ny, nx))
+        self.assertTrue(depth.min() >= 0.0 and depth.max() <= 1.0)
+
+        # When
+        out = numpy.zeros((ny, nx, 3), dtype=numpy.uint8)
+        result = screenshot(mode='rgb', out=out, reuse_buffer=True)
+        again = screenshot(mode='rgb', reuse_buffer=True)
+
+        # Then
+        self.assertIs(result, out)
+        numpy.testing.assert_array_equal(out, rgb)
+        self.assertTrue(numpy.may_share_memory(
+            again, screenshot(mode='rgb', reuse_buffer=True)
+        ))
+        self.assertRaises(ValueError, screenshot, mode='rgb',
+                          out=numpy.zeros((1, 1, 3), dtype=numpy.uint8))
+        self.assertRaises(ValueError, screenshot, mode='rgb',
+                          out=numpy.zeros((ny, nx, 3)))
+        self.assertRaises(ValueError, screenshot, mode='rgba',
+                          out=numpy.zeros((ny, nx, 4), dtype=numpy.uint8))
+        depth_out = numpy.zeros((ny, nx), dtype=numpy.float32)
+        self.assertIs(screenshot(mode='depth', out=depth_out), depth_out)
+
+    def test_screenshot_and_draw_with_coalesced_renders(self):
+        # Given
+        engine = Engine()
+        self.setup_engine_and_figure(engine)
+        create_quiver3d()
+        scene = self.figure.scene
+        screenshot(mode='rgb')
+        scene.coalesce_render = True
+        calls = []
+
+        for aa in (False, True):
+            # When
+            with mock.patch('pyface.api.GUI.invoke_later', calls.append):
+                scene.background = (1.0, 0.0, 0.0) if aa else (0.0, 0.0, 1.0)
+                data = screenshot(mode='rgb', antialiased=aa)
+
+            # Then the deferred render was done before grabbing.
+            expected = [255, 0, 0] if aa else [0, 0, 255]
+            self.assertEqual(data[0, 0].tolist(), expected)
+
+        # When
+        count = scene.render_count
+        with mock.patch('pyface.api.GUI.invoke_later', calls.append):
+            mlab.draw(self.figure)
+
+        # Then
+        self.assertEqual(scene.render_count, count + 1)
+
 
 class TestMlabSavefig(TestCase):
 
@@ -8,7 +8,7 @@
 import vtk
 
 # Enthought library imports.
-from traits.api import Instance, Bool, Enum
+from traits.api import Instance, Bool, Enum, Range, Int, Any
 from tvtk.api import tvtk
 from traits.api import DelegatesTo
 from tvtk.common import is_old_pipeline
@@ -17,6 +17,7 @@ from tvtk.common import is_old_pipeline
 from mayavi.core.component import Component
 from mayavi.core.source import Source
 from mayavi.core.utils import get_new_output
+from mayavi.core.lod import LODBuilder
 
 
 ######################################################################
@@ -58,6 +59,33 @@ class Actor(Component):
     # Composite data filter.
     comp_data_geom_filter = Instance(tvtk.CompositeDataGeometryFilter)
 
+    # Draw a decimated copy of the geometry while the scene is being
+    # interacted with.  The copy is computed in a background thread when
+    # the data changes.  The actor is then a `tvtk.LODActor` which picks
+    # the copy when the full geometry cannot be drawn at the interactor's
+    # desired update rate, the full geometry is drawn once the
+    # interaction stops.
+    enable_lod = Bool(False, desc='if a decimated copy of the geometry '
+                      'is drawn during interaction')
+
+    # The fraction of the triangles removed in the decimated copy.
+    lod_reduction = Range(0.0, 0.99, 0.9,
+                          desc='the fraction of the triangles removed in '
+                          'the decimated copy')
+
+    # No decimated copy is built for datasets with fewer cells.
+    lod_min_cells = Int(100000, desc='the smallest number of cells for '
+                        'which a decimated copy is built')
+
+    # The builder of the decimated copies, the mapper drawing them, the
+    # observers of the scene's renderer that build and install them and
+    # whether the copy needs to be rebuilt.
+    _lod_builder = Instance(LODBuilder, ())
+    _lod_mapper = Any
+    _lod_data = Any
+    _lod_observers = Any
+    _lod_dirty = Bool(False)
+
     ######################################################################
     # `object` interface
     ######################################################################
@@ -65,7 +93,8 @@ class Actor(Component):
         d = super(Actor, self).__get_pure_state__()
         for attr in ('texture', 'texture_source_object',
                      'enable_texture', 'tcoord_generator_mode',
-                     'tcoord_generator'):
+                     'tcoord_generator', '_lod_builder', '_lod_mapper',
+                     '_lod_data', '_lod_observers', '_lod_dirty'):
             d.pop(attr,None)
         return d
 
@@ -106,6 +135,7 @@ class Actor(Component):
 
         self._connect_mapper(input)
         self._tcoord_generator_mode_changed(self.tcoord_generator_mode)
+        self._update_lod()
         self.render()
 
     def update_data(self):
@@ -125,8 +155,15 @@ class Actor(Component):
                 self.mapper.update(0)
             else:
                 self.mapper.update()
+        self._update_lod()
         self.render()
 
+    def stop(self):
+        """Invoked when the component is stopped."""
+        self._remove_lod_observers()
+        self._lod_builder.cancel()
+        super(Actor, self).stop()
+
     ######################################################################
     # `Actor` interface
     ######################################################################
@@ -177,6 +214,7 @@ class Actor(Component):
         actor = self.actor
         if actor is not None:
             actor.mapper = new
+        self._update_lod()
         self.render()
 
     def _actor_changed(self, old, new):
@@ -201,6 +239,113 @@ class Actor(Component):
         if new is not actor.property:
             actor.property = new
 
+    def _update_lod(self):
+        """Drops the current decimated copy and schedules a new one to be
+        built after the next render, when the mapper's input is up to date.
+        """
+        if not self.enable_lod:
+            return
+        self._clear_lod()
+        self._lod_dirty = True
+        self._add_lod_observers()
+
+    def _on_render_end(self, obj, event):
+        if not self._lod_dirty:
+            return
+        self._lod_dirty = False
+        mapper = tvtk.to_vtk(self.mapper)
+        if mapper.IsA('vtkGlyph3DMapper'):
+            # The input points are not the drawn geometry, the glyph
+            # mapper is kept as the only LOD mapper.
+            return
+        data = mapper.GetInput()
+        if data is None or not data.IsA('vtkPolyData') or \
+                data.GetNumberOfCells() < self.lod_min_cells:
+            return
+        # The worker thread decimates a copy of the data, the sources may
+        # edit the points and cells of their data in place.
+        copy = data.NewInstance()
+        copy.DeepCopy(data)
+        self._lod_builder.reduction = self.lod_reduction
+        self._lod_builder.submit(copy)
+
+    def _clear_lod(self):
+        self._lod_builder.cancel()
+        self._lod_data = None
+        self._lod_mapper = None
+        # Draw the full geometry until the decimated copy is built.
+        # Without any LOD mapper the vtkLODActor creates its own point
+        # cloud and outline ones.
+        self._set_lod_mapper(tvtk.to_vtk(self.mapper))
+
+    def _set_lod_mapper(self, lod_mapper):
+        actor = tvtk.to_vtk(self.actor)
+        if actor is None or not actor.IsA('vtkLODActor'):
+            return
+        actor.GetLODMappers().RemoveAllItems()
+        if lod_mapper is not None:
+            actor.AddLODMapper(lod_mapper)
+
+    def _on_render_start(self, obj, event):
+        # Called before every render of the scene, in the UI thread, to
+        # install a newly built decimated copy and to keep the settings of
+        # its mapper in sync with the main mapper.
+        data = self._lod_builder.get_result()
+        actor = tvtk.to_vtk(self.actor)
+        if not actor.IsA('vtkLODActor'):
+            return
+        mapper = tvtk.to_vtk(self.mapper)
+        lod_mapper = self._lod_mapper
+        if data is not None:
+            self._lod_data = data
+            if lod_mapper is None:
+                lod_mapper = self._lod_mapper = vtk.vtkPolyDataMapper()
+                self._set_lod_mapper(lod_mapper)
+        elif lod_mapper is None or \
+                mapper.GetMTime() <= lod_mapper.GetMTime():
+            return
+        lod_mapper.ShallowCopy(mapper)
+        lod_mapper.SetInputData(self._lod_data)
+
+    def _add_lod_observers(self):
+        if self._lod_observers is not None or self.scene is None:
+            return
+        renderer = tvtk.to_vtk(self.scene.renderer)
+        self._lod_observers = (
+            renderer,
+            renderer.AddObserver('StartEvent', self._on_render_start),
+            renderer.AddObserver('EndEvent', self._on_render_end)
+        )
+
+    def _remove_lod_observers(self):
+        if self._lod_observers is not None:
+            renderer = self._lod_observers[0]
+            for id in self._lod_observers[1:]:
+                renderer.RemoveObserver(id)
+            self._lod_observers = None
+
+    def _enable_lod_changed(self, value):
+        old = self.actor
+        if old is None:
+            return
+        self._clear_lod()
+        if value:
+            new = tvtk.LODActor()
+        else:
+            self._remove_lod_observers()
+            new = tvtk.Actor()
+        # Keep the transform, visibility etc. of the old actor.
+        tvtk.to_vtk(new).ShallowCopy(tvtk.to_vtk(old))
+        self.actor = new
+        self._update_lod()
+        self.render()
+
+    def _lod_reduction_changed(self):
+        self._update_lod()
+
+    def _lod_min_cells_changed(self):
+        self._update_lod()
+
     def _foreground_changed_for_scene(self, old, new):
         # Change the default color for the actor.
         self.property.color = new
@@ -5,6 +5,16 @@ minimum and maximum value or explicitly specify the contours.  This
 component may be used for any input data.  The component also provides
 a convenient option to create "filled contours".
 
+By default the fastest contouring algorithm available for the input is
+used: flying edges for image data and a specialized filter for
+unstructured grids of linear cells, the `algorithm` trait overrides
+this choice.
+
+With the `incremental` option the surface of every explicitly given
+contour value is computed separately and cached, so that adding or
+changing one value only computes that surface and removing a value does
+not compute anything.
+
 """
 # Author: Prabhu Ramachandran <prabhu@aero.iitb.ac.in>
 # Copyright (c) 2005-2018, Enthought, Inc.
@@ -12,13 +22,15 @@ a convenient option to create "filled contours".
 
 # Enthought library imports.
 from traits.api import Instance, List, Tuple, Bool, Range, \
-                                 Float, Property
+                                 Float, Property, Dict, Enum, Str, \
+                                 on_trait_change
 from tvtk.api import tvtk
+from tvtk.common import is_old_pipeline
 
 # Local imports.
 from mayavi.core.module_manager import DataSetHelper
 from mayavi.core.component import Component
-from mayavi.core.common import error
+from mayavi.core.common import error, warning
 from mayavi.components.common \
      import get_module_source, convert_to_poly_data
 
@@ -92,6 +104,26 @@ class Contour(Component):
         desc='if the contour range is updated automatically'
     )
 
+    # The algorithm used for the (non-filled) contours.  'auto' picks
+    # the fastest one available for the input: 'flying_edges' for image
+    # data, 'linear_grid' for unstructured grids with only linear cells
+    # and 'generic' (tvtk.ContourFilter) otherwise.
+    algorithm = Enum('auto', 'generic', 'flying_edges', 'linear_grid',
+                     desc='the contouring algorithm to use')
+
+    # The algorithm currently used.
+    algorithm_used = Str('generic')
+
+    # Compute and cache the surface of every explicitly given contour
+    # value separately.  Adding or changing a value then only computes
+    # the new surface but every value needs a pass over the data when
+    # the input changes.  Not used for filled or automatic contours.
+    incremental = Bool(
+        False,
+        desc='if the contour of every value is cached and only new '
+             'values are computed'
+    )
+
     ########################################
     # The component's view is picked up from ui/contour.py
 
@@ -119,17 +151,43 @@ class Contour(Component):
     # The contour filter.
     _cont_filt = Instance(tvtk.ContourFilter, args=())
 
+    # The contour filter of the algorithm in use, `_cont_filt` or one of
+    # `_algorithm_filters`.
+    _iso_filt = Instance(tvtk.Object)
+
+    # The filters of the other algorithms keyed on their class name.
+    _algorithm_filters = Dict
+
+    # The last warning about an unsupported algorithm.
+    _algorithm_warning = Str
+
     # The filled contour filter.  This filter generates the filled contours.
     _fill_cont_filt = Instance(tvtk.BandedPolyDataContourFilter, args=(),
                                kw={'clipping': 1, 'scalar_mode': 'value'})
 
+    # The filter computing the contour of one value in incremental mode,
+    # of the same class as the contour filter in use.
+    _piece_filt = Instance(tvtk.Object)
+
+    # Merges the cached contours in incremental mode.
+    _append = Instance(tvtk.AppendPolyData, args=())
+
+    # The cached contours keyed on the contour value.
+    _pieces = Dict
+
+    # The settings of the contour filter used for the cached contours.
+    _piece_settings = Tuple
+
     ######################################################################
     # `object` interface
     ######################################################################
     def __get_pure_state__(self):
         d = super(Contour, self).__get_pure_state__()
         # These traits are dynamically created.
-        for name in ('_data_min', '_data_max', '_default_contour'):
+        for name in ('_data_min', '_data_max', '_default_contour',
+                     '_pieces', '_piece_settings', '_piece_filt',
+                     'algorithm_used', '_iso_filt', '_algorithm_filters',
+                     '_algorithm_warning'):
             d.pop(name, None)
 
         return d
@@ -147,6 +205,8 @@ class Contour(Component):
         if not self._has_input():
             return
         cf = self._set_contour_input()
+        # The cached contours are of the old input.
+        self._pieces = {}
         first = False
         if len(self._current_range) == 0:
             first = True
@@ -157,7 +217,9 @@ class Contour(Component):
             self.contours = [(cr[0] + cr[1])/2]
             self.minimum_contour = cr[0]
             self.maximum_contour = cr[1]
-        self.outputs = [cf]
+        elif self._use_incremental():
+            self._update_pieces()
+        self.outputs = [self._get_output_filter()]
 
     def update_data(self):
         """Override this method to do what is necessary when upstream
@@ -166,7 +228,12 @@ class Contour(Component):
         This method is invoked (automatically) when any of the inputs
         sends a `data_changed` event.
         """
-        self._update_ranges()
+        if self._use_incremental():
+            self._pieces = {}
+            self._update_ranges()
+            self._update_pieces()
+        else:
+            self._update_ranges()
         # Propagage the data changed event.
         self.data_changed = True
 
@@ -176,7 +243,7 @@ class Contour(Component):
 
     def get_output_object(self):
         """ Returns the output port."""
-        return self.contour_filter.output_port
+        return self._get_output_filter().output_port
 
     ######################################################################
     # Non-public methods.
@@ -184,6 +251,9 @@ class Contour(Component):
     def _contours_items_changed(self, list_event):
         if self.auto_contours or not self._has_input():
             return
+        if self._use_incremental():
+            self._contours_changed(self.contours)
+            return
         cf = self.contour_filter
         added, removed, index = (list_event.added, list_event.removed,
                                  list_event.index)
@@ -197,6 +267,10 @@ class Contour(Component):
     def _contours_changed(self, values):
         if self.auto_contours or not self._has_input():
             return
+        if self._use_incremental():
+            self._update_pieces()
+            self.data_changed = True
+            return
         cf = self.contour_filter
         cf.number_of_contours = len(values)
         for i, x in enumerate(values):
@@ -235,6 +309,14 @@ class Contour(Component):
             self._do_auto_contours()
         else:
             self._contours_changed(self.contours)
+        self._update_output_filter()
+
+    def _incremental_changed(self, value):
+        if not self._has_input():
+            return
+        self._pieces = {}
+        self._contours_changed(self.contours)
+        self._update_output_filter()
 
     def _auto_update_range_changed(self, value):
         if value:
@@ -262,28 +344,207 @@ class Contour(Component):
         cf = self._set_contour_input()
         # This will trigger a change.
         self._auto_contours_changed(self.auto_contours)
-        self.outputs = [cf]
+        self.outputs = [self._get_output_filter()]
+
+    @on_trait_change('_cont_filt:[compute_normals,compute_gradients,'
+                     'compute_scalars],_iso_filt:[compute_normals,'
+                     'compute_gradients,compute_scalars]')
+    def _contour_filter_settings_changed(self):
+        # The cached contours were computed with the old settings.
+        if self._has_input() and self._use_incremental():
+            self._update_pieces()
+            self.data_changed = True
+
+    def _algorithm_changed(self):
+        if not self._has_input():
+            return
+        old = self.contour_filter
+        self._set_contour_input()
+        if self.contour_filter is not old:
+            if self._use_incremental():
+                self._pieces = {}
+                self._update_pieces()
+            self._update_output_filter()
+            self.data_changed = True
 
     def _get_contour_filter(self):
         if self.filled_contours:
             return self._fill_cont_filt
+        elif self._iso_filt is not None:
+            return self._iso_filt
         else:
             return self._cont_filt
 
+    def _get_algorithm_filter(self, name):
+        """Returns the (cached) contour filter of the given tvtk class
+        name or None if it is not available in this VTK version.
+        """
+        if name == 'ContourFilter':
+            return self._cont_filt
+        filters = self._algorithm_filters
+        if name not in filters:
+            klass = getattr(tvtk, name, None)
+            filters[name] = None if klass is None else \
+                self._new_algorithm_filter(klass)
+        return filters[name]
+
+    def _new_algorithm_filter(self, klass):
+        """Returns a new contour filter of the given tvtk class that
+        keeps the point arrays of the input like tvtk.ContourFilter.
+        The fast filters drop them by default.
+        """
+        cf = klass()
+        for attr in ('interpolate_attributes', 'compute_scalars'):
+            if hasattr(cf, attr):
+                setattr(cf, attr, True)
+        return cf
+
+    def _get_algorithm(self, input):
+        """Returns the name of the algorithm and of the tvtk class of its
+        contour filter for the given input dataset.  This is the fastest
+        one or the one the user asked for if it supports the input.
+        """
+        supported = [('generic', 'ContourFilter')]
+        if input.is_a('vtkImageData'):
+            n_dims = len([x for x in input.dimensions if x > 1])
+            klass = {2: 'FlyingEdges2D', 3: 'FlyingEdges3D'}.get(n_dims)
+            cf = None if klass is None else \
+                self._get_algorithm_filter(klass)
+            # FlyingEdges2D cannot interpolate the other point arrays.
+            if cf is not None and (
+                    hasattr(cf, 'interpolate_attributes') or
+                    input.point_data.number_of_arrays < 2):
+                supported.append(('flying_edges', klass))
+        elif input.is_a('vtkUnstructuredGrid'):
+            cf = self._get_algorithm_filter('Contour3DLinearGrid')
+            scalars = input.point_data.scalars
+            if cf is not None and scalars is not None and \
+                    cf.can_fully_process_data_object(input, scalars.name):
+                supported.append(('linear_grid', 'Contour3DLinearGrid'))
+        if self.algorithm == 'auto':
+            return supported[-1]
+        for name, klass in supported:
+            if name == self.algorithm:
+                return name, klass
+        msg = 'The %s contouring algorithm does not support the %s '\
+              'input, using the generic one.' % (self.algorithm,
+                                                 input.class_name)
+        if msg != self._algorithm_warning:
+            # Only warn once, not on every update of the pipeline.
+            self._algorithm_warning = msg
+            warning(msg)
+        return supported[0]
+
+    def _select_algorithm(self):
+        """Makes the contour filter of the algorithm suited to the input
+        the one in use.  The contour values and the common settings of
+        the filter in use are copied to the new one.
+        """
+        input = self.inputs[0].get_output_dataset()
+        name, klass = self._get_algorithm(input)
+        new = self._get_algorithm_filter(klass)
+        old = self._iso_filt
+        if old is None:
+            old = self._cont_filt
+        if new is not old:
+            for attr in ('compute_normals', 'compute_gradients',
+                         'compute_scalars'):
+                if hasattr(old, attr) and hasattr(new, attr):
+                    setattr(new, attr, getattr(old, attr))
+            n = old.number_of_contours
+            new.number_of_contours = n
+            for i in range(n):
+                new.set_value(i, old.get_value(i))
+        self._iso_filt = new
+        self.algorithm_used = name
+
     def _set_contour_input(self):
         """Sets the input to the appropriate contour filter and
         returns the currently used contour filter.
         """
         inp = self.inputs[0].outputs[0]
-        cf = self.contour_filter
         if self.filled_contours:
+            cf = self.contour_filter
             inp = convert_to_poly_data(inp)
             self.configure_input(cf, inp)
         else:
+            self._select_algorithm()
+            cf = self.contour_filter
             self.configure_input(cf, inp)
+            if self._use_incremental():
+                # Only the contours of the new values are computed.
+                return cf
         cf.update()
         return cf
 
+    def _use_incremental(self):
+        return self.incremental and not (self.auto_contours or
+                                         self.filled_contours)
+
+    def _get_output_filter(self):
+        """Returns the filter whose output is the output of this
+        component.
+        """
+        if self._use_incremental():
+            return self._append
+        return self.contour_filter
+
+    def _update_output_filter(self):
+        if self._has_input() and \
+                self.outputs != [self._get_output_filter()]:
+            self.outputs = [self._get_output_filter()]
+
+    def _get_piece_settings(self):
+        cf = self.contour_filter
+        return (cf.__class__,) + tuple(
+            getattr(cf, attr, None) for attr in
+            ('compute_normals', 'compute_gradients', 'compute_scalars')
+        )
+
+    def _update_pieces(self):
+        """Computes the contours of the values that are not cached yet,
+        drops those of the values no longer used and merges them.
+        """
+        settings = self._get_piece_settings()
+        if settings != self._piece_settings:
+            # The contour filter or its settings changed since the
+            # contours were cached.
+            self._pieces = {}
+            self._piece_settings = settings
+            self._piece_filt = self._new_algorithm_filter(settings[0])
+        values = [float(x) for x in self.contours]
+        pieces = self._pieces
+        for value in set(pieces).difference(values):
+            del pieces[value]
+
+        missing = [x for x in values if x not in pieces]
+        if missing:
+            pf = self._piece_filt
+            for attr, value in zip(('compute_normals', 'compute_gradients',
+                                    'compute_scalars'), settings[1:]):
+                if value is not None:
+                    setattr(pf, attr, value)
+            self.configure_input(pf, self.inputs[0].outputs[0])
+            pf.number_of_contours = 1
+            for value in missing:
+                if value in pieces:
+                    continue
+                pf.set_value(0, value)
+                pf.update()
+                piece = tvtk.PolyData()
+                piece.shallow_copy(pf.output)
+                pieces[value] = piece
+
+        append = self._append
+        append.remove_all_inputs()
+        # An empty input avoids errors when there are no contours.
+        for piece in [pieces[x] for x in values] or [tvtk.PolyData()]:
+            if is_old_pipeline():
+                append.add_input(piece)
+            else:
+                append.add_input_data(piece)
+        append.update()
+
     def _has_input(self):
         """Returns if this component has a valid input."""
         if (len(self.inputs) > 0) and \
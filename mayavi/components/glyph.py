@@ -8,16 +8,18 @@ input point data.
 # License: BSD Style.
 
 # Enthought library imports.
-from traits.api import Instance, Trait, Bool
+from traits.api import Instance, Trait, Bool, Any, Int, Float, Range
 from traits.api import Enum
 from traitsui.api import View, Group, Item
 from tvtk.api import tvtk
+from tvtk import vtk_module as vtk
 from tvtk.tvtk_base import TraitRevPrefixMap
 
 # Local imports.
 from mayavi.core.component import Component
 from mayavi.core.module import Module
 from mayavi.components import glyph_source
+from mayavi.core.point_mask import PointMaskFilter
 
 
 ######################################################################
@@ -65,6 +67,33 @@ class Glyph(Component):
     # that only a subset of the input points must be displayed.
     mask_input_points = Bool(False, desc="if input points are masked")
 
+    # How the input points are masked.  'mask_points' uses the
+    # `mask_points` filter, the other modes are deterministic and only
+    # depend on the point coordinates so the glyphs do not change when
+    # only the data changes: 'grid' keeps one point per cell of a
+    # uniform grid, 'blue_noise' keeps points that are at least
+    # `mask_radius` apart and 'budget' keeps an evenly strided subset
+    # of `mask_max_glyphs` points.
+    mask_mode = Enum('mask_points', 'grid', 'blue_noise', 'budget',
+                     desc='how the input points are masked')
+
+    # The number of cells along the longest side of the bounding box
+    # for the 'grid' mask mode.
+    mask_grid_divisions = Range(1, 10000, 50, enter_set=True,
+                                auto_set=False,
+                                desc='the number of cells of the '
+                                'masking grid along its longest side')
+
+    # The minimum distance between the points for the 'blue_noise'
+    # mask mode.  If zero it is chosen from `mask_max_glyphs`.
+    mask_radius = Float(0.0, enter_set=True, auto_set=False,
+                        desc='the minimum distance between glyphs')
+
+    # The maximum number of glyphs for the 'grid', 'blue_noise' and
+    # 'budget' mask modes, no limit if zero.
+    mask_max_glyphs = Int(10000, enter_set=True, auto_set=False,
+                          desc='the maximum number of glyphs')
+
     # The MaskPoints filter.
     mask_points = Instance(tvtk.MaskPoints, args=(),
                            kw={'random_mode': True}, record=True)
@@ -72,6 +101,22 @@ class Glyph(Component):
     # The Glyph3D instance.
     glyph = Instance(tvtk.Object, allow_none=False, record=True)
 
+    # Draw the glyphs with `glyph_mapper`, which renders the glyph
+    # source once per point on the GPU, instead of copying its geometry
+    # for every point with `glyph`.  The memory used is then
+    # proportional to the number of points only.  The scaling,
+    # orientation and coloring are still set on `glyph`, scalars are
+    # scaled by their absolute value though.  Only vector glyphs can be
+    # instanced and the actor of the module must use `glyph_mapper` as
+    # its mapper, see `update_actor_mapper` and `update_instancing`.
+    instanced = Bool(False, desc='if the glyphs are drawn by instancing '
+                     'the glyph source on the GPU')
+
+    # The Glyph3DMapper used when `instanced` is True.
+    glyph_mapper = Instance(tvtk.Glyph3DMapper, args=(),
+                            kw={'use_lookup_table_scalar_range': True},
+                            record=True)
+
     # The Source to use for the glyph.  This is chosen from
     # `self._glyph_list` or `self.glyph_dict`.
     glyph_source = Instance(glyph_source.GlyphSource,
@@ -93,18 +138,43 @@ class Glyph(Component):
     # Used for optimization.
     _updating = Bool(False)
 
+    # The filter used by the deterministic mask modes.
+    _point_mask = Any
+
+    # The copy of the module manager's vector LUT used by the glyph
+    # mapper, see `get_lookup_table`.
+    _magnitude_lut = Any
+
+    # The vector LUT that `_magnitude_lut` copies and the id of the
+    # observer that keeps it in sync.
+    _lut_observer = Any
+
     ########################################
     # View related traits.
 
     view = View(Group(Item(name='mask_input_points'),
+                      Item(name='mask_mode',
+                           enabled_when='object.mask_input_points'),
+                      Item(name='mask_grid_divisions',
+                           enabled_when='object.mask_input_points',
+                           visible_when='object.mask_mode == "grid"'),
+                      Item(name='mask_radius',
+                           enabled_when='object.mask_input_points',
+                           visible_when='object.mask_mode == "blue_noise"'),
+                      Item(name='mask_max_glyphs',
+                           enabled_when='object.mask_input_points',
+                           visible_when='object.mask_mode != "mask_points"'),
                       Group(Item(name='mask_points',
                                  enabled_when='object.mask_input_points',
                                  style='custom', resizable=True),
                             show_labels=False,
+                            visible_when='object.mask_mode == "mask_points"',
                             ),
                       label='Masking',
                       ),
-                Group(Group(Item(name='scale_mode',
+                Group(Group(Item(name='instanced',
+                                 enabled_when='glyph_type == "vector"'),
+                            Item(name='scale_mode',
                                  enabled_when='show_scale_mode',
                                  visible_when='show_scale_mode'),
                             Item(name='color_mode',
@@ -133,7 +203,8 @@ class Glyph(Component):
     ######################################################################
     def __get_pure_state__(self):
         d = super(Glyph, self).__get_pure_state__()
-        for attr in ('module', '_updating'):
+        for attr in ('module', '_updating', '_point_mask',
+                     '_magnitude_lut', '_lut_observer'):
             d.pop(attr, None)
         return d
 
@@ -178,7 +249,7 @@ class Glyph(Component):
         self._scale_mode_changed(self.scale_mode)
 
         # Set our output.
-        self.outputs = [self.glyph]
+        self._update_outputs()
         self.pipeline_changed = True
 
     def update_data(self):
@@ -189,6 +260,7 @@ class Glyph(Component):
         sends a `data_changed` event.
         """
         self._scale_mode_changed(self.scale_mode)
+        self._update_glyph_mapper()
         self.data_changed = True
 
     def render(self):
@@ -206,6 +278,7 @@ class Glyph(Component):
     def stop(self):
         if not self.running:
             return
+        self._remove_lut_observer()
         self.glyph_source.stop()
         super(Glyph, self).stop()
 
@@ -215,22 +288,90 @@ class Glyph(Component):
 
     def get_output_object(self):
         """ Returns the output port."""
+        if self._is_instanced():
+            return self.glyph.get_input_connection(0, 0)
         return self.glyph.output_port
 
+    ######################################################################
+    # `Glyph` interface
+    ######################################################################
+    def update_actor_mapper(self, actor):
+        """Sets the mapper of `actor`, the actor of the module, to
+        `glyph_mapper` when the glyphs are instanced and back to a
+        poly data mapper otherwise.
+        """
+        if self._is_instanced():
+            actor.mapper = self.glyph_mapper
+        elif actor.mapper is self.glyph_mapper:
+            actor.mapper = tvtk.PolyDataMapper(
+                use_lookup_table_scalar_range=1
+            )
+
+    def update_instancing(self, actor):
+        """Updates the pipeline and the mapper of `actor`, the actor
+        of the module, when `instanced` changes.
+        """
+        # The glyph mapper must not be connected to the output of
+        # Glyph3D, that would draw a glyph at every point of every
+        # glyph, so the order of the updates matters.
+        if self._is_instanced():
+            self.update_pipeline()
+            self.update_actor_mapper(actor)
+        else:
+            self.update_actor_mapper(actor)
+            self.update_pipeline()
+
+    def get_lookup_table(self, lut):
+        """Returns the lookup table to color the glyphs by vector
+        given the module manager's vector LUT, `lut`.
+
+        The glyph mapper maps the vectors themselves, so when the
+        glyphs are instanced this is a copy of `lut` that maps their
+        magnitude and follows the changes of `lut`.  `lut` itself is
+        shared by the other modules of the module manager and is left
+        unchanged.
+        """
+        if not self._is_instanced():
+            self._remove_lut_observer()
+            return lut
+        vtk_lut = tvtk.to_vtk(lut)
+        observer = self._lut_observer
+        if observer is None or observer[0] is not vtk_lut:
+            self._remove_lut_observer()
+            oid = vtk_lut.AddObserver('ModifiedEvent', self._sync_lut)
+            self._lut_observer = (vtk_lut, oid)
+        if self._magnitude_lut is None:
+            self._magnitude_lut = tvtk.LookupTable()
+        self._sync_lut()
+        return self._magnitude_lut
+
     ######################################################################
     # Non-public methods.
     ######################################################################
+    def _sync_lut(self, *args):
+        magnitude_lut = tvtk.to_vtk(self._magnitude_lut)
+        magnitude_lut.DeepCopy(self._lut_observer[0])
+        magnitude_lut.SetVectorModeToMagnitude()
+
+    def _remove_lut_observer(self):
+        if self._lut_observer is not None:
+            vtk_lut, oid = self._lut_observer
+            vtk_lut.RemoveObserver(oid)
+            self._lut_observer = None
+
     def _update_source(self):
-        self.configure_source_data(self.glyph, self.glyph_source.outputs[0])
+        self._glyph_source_changed(self.glyph_source)
 
     def _glyph_source_changed(self, value):
         self.configure_source_data(self.glyph, value.outputs[0])
+        self.configure_source_data(self.glyph_mapper, value.outputs[0])
 
     def _color_mode_changed(self, value):
         if len(self.inputs) == 0:
             return
         if value != 'no_coloring':
             self.glyph.color_mode = value
+            self._update_glyph_mapper()
 
     def _color_mode_tensor_changed(self, value):
         if len(self.inputs) == 0:
@@ -263,17 +404,105 @@ class Glyph(Component):
             self._updating = False
             self.render()
 
+    def _is_instanced(self):
+        return self.instanced and self.glyph_type == 'vector'
+
+    def _update_outputs(self):
+        if self._is_instanced():
+            # The glyph mapper is fed with the (masked) points.
+            self.outputs = [self.glyph.get_input_algorithm()]
+        else:
+            self.outputs = [self.glyph]
+
+    def _update_glyph_mapper(self):
+        """Makes `glyph_mapper` scale, orient and color the glyphs like
+        `glyph`.
+        """
+        if not self._is_instanced() or len(self.inputs) == 0:
+            return
+        glyph, mapper = self.glyph, self.glyph_mapper
+        if glyph.vector_mode == 'use_normal':
+            vectors = vtk.vtkDataSetAttributes.NORMALS
+        else:
+            vectors = vtk.vtkDataSetAttributes.VECTORS
+        scale_mode = glyph.scale_mode
+        if scale_mode == 'scale_by_scalar':
+            scale_array = vtk.vtkDataSetAttributes.SCALARS
+        else:
+            scale_array = vectors
+        if scale_mode == 'scale_by_vector_components':
+            mapper_scale_mode = 'scale_by_vector_components'
+        else:
+            mapper_scale_mode = 'scale_by_magnitude'
+        mapper.trait_set(scaling=scale_mode != 'data_scaling_off',
+                         scale_mode=mapper_scale_mode,
+                         scale_factor=glyph.scale_factor,
+                         range=glyph.range,
+                         clamping=glyph.clamping,
+                         orient=glyph.vector_mode != 'vector_rotation_off')
+        mapper.set_scale_array(scale_array)
+        mapper.set_orientation_array(vectors)
+
+        # Glyph3D colors by the vector magnitude, the mapper uses the
+        # vector mode of its lookup table, see `get_lookup_table`.
+        data = self.inputs[0].get_output_dataset()
+        if glyph.vector_mode == 'use_normal':
+            array = data.point_data.normals
+        else:
+            array = data.point_data.vectors
+        if glyph.color_mode == 'color_by_vector' and array is not None \
+                and array.name:
+            mapper.scalar_mode = 'use_point_field_data'
+            mapper.color_by_array_component(array.name, -1)
+        else:
+            mapper.scalar_mode = 'default'
+
+    def _instanced_changed(self):
+        # The module calls `update_instancing` for its actor.
+        self._update_glyph_mapper()
+
     def _mask_input_points_changed(self, value):
         inputs = self.inputs
         if len(inputs) == 0:
             return
         if value:
-            mask = self.mask_points
+            if self.mask_mode == 'mask_points':
+                mask = self.mask_points
+            else:
+                mask = self._get_point_mask()
             self.configure_connection(mask, inputs[0].outputs[0])
             self.configure_connection(self.glyph, mask)
         else:
             self.configure_connection(self.glyph, inputs[0])
-        self.glyph.update()
+        if self._is_instanced():
+            self._update_outputs()
+        else:
+            self.glyph.update()
+
+    def _get_point_mask(self):
+        if self._point_mask is None:
+            self._point_mask = tvtk.to_tvtk(PointMaskFilter())
+        tvtk.to_vtk(self._point_mask).set_parameters(
+            self.mask_mode, self.mask_grid_divisions, self.mask_radius,
+            self.mask_max_glyphs
+        )
+        return self._point_mask
+
+    def _mask_mode_changed(self):
+        if self.mask_input_points:
+            self._mask_input_points_changed(True)
+            self.render()
+
+    def _change_mask_parameters(self):
+        if self.mask_input_points and self.mask_mode != 'mask_points':
+            self._get_point_mask()
+            if not self._is_instanced():
+                self.glyph.update()
+            self.render()
+
+    _mask_grid_divisions_changed = _change_mask_parameters
+    _mask_radius_changed = _change_mask_parameters
+    _mask_max_glyphs_changed = _change_mask_parameters
 
     def _glyph_type_changed(self, value):
         if self.glyph_type == 'vector':
@@ -281,7 +510,11 @@ class Glyph(Component):
         else:
             self.glyph = tvtk.TensorGlyph(scale_factor=0.1)
             self.show_scale_mode = False
-        self.glyph.on_trait_change(self.render)
+        self.glyph.on_trait_change(self._on_glyph_changed)
+
+    def _on_glyph_changed(self):
+        self._update_glyph_mapper()
+        self.render()
 
     def _scene_changed(self, old, new):
         super(Glyph, self)._scene_changed(old, new)
@@ -17,6 +17,10 @@ from traitsui.api import Item, Group, View
 view = View(Group(Item(name='filled_contours',
                        defined_when='show_filled_contours'),
                   Item(name='auto_contours'),
+                  Item(name='algorithm',
+                       visible_when='not filled_contours'),
+                  Item(name='algorithm_used', style='readonly',
+                       visible_when='not filled_contours'),
 
                   # One group or the other, but not both.
                   Group(
@@ -24,6 +28,9 @@ view = View(Group(Item(name='filled_contours',
                             style='custom',
                             visible_when='not auto_contours',
                             show_label=False),
+                       Item(name='incremental',
+                            visible_when='not auto_contours and '
+                                         'not filled_contours'),
                   ),
                   Group(
                       Item(name='number_of_contours'),
@@ -6,15 +6,27 @@ Code to help with managing a TVTK data set in Pythonic ways.
 # Copyright (c) 2008, Enthought, Inc.
 # License: BSD Style.
 
+from collections import OrderedDict
+
 from traits.api import (HasTraits, Instance, Array, Str,
                         Property, Dict)
 from tvtk.api import tvtk
-from tvtk.array_handler import array2vtk
+from tvtk.array_handler import array2vtk, vtk2array
 import tvtk.common as tvtk_common
 
 ######################################################################
 # Utility functions.
 ######################################################################
+# The attribute type for arrays with a given number of components.
+_ARRAY_TYPES = {1: 'scalars', 3: 'vectors', 4: 'scalars', 9: 'tensors'}
+
+# The cached inventories, keyed on the id and the modified time of the
+# VTK field data.  The modified time of VTK objects is a global counter
+# so a new object with a recycled id will not match an old entry.
+_inventory_cache = OrderedDict()
+_INVENTORY_CACHE_SIZE = 128
+
+
 def get_array_type(arr):
     """Returns if the array is a scalar ('scalars'), vector
     ('vectors') or tensor ('tensors').  It looks at the number of
@@ -22,48 +34,79 @@ def get_array_type(arr):
     returns the empty string.
     """
     n = arr.number_of_components
-    ret = {1: 'scalars', 3: 'vectors', 4: 'scalars', 9:'tensors'}
-    return ret.get(n) or ''
+    return _ARRAY_TYPES.get(n) or ''
+
+
+def get_attribute_inventory(data):
+    """Returns an inventory of the arrays in the given (TVTK or VTK)
+    point or cell data without creating any TVTK wrappers.  The result
+    is a dict with an 'arrays' key holding a list of (name, attribute
+    type, number of components) tuples and an 'active' key mapping
+    'scalars', 'vectors' and 'tensors' to the name of the active array
+    (or None).  The result is cached until the data is modified and
+    must not be changed.
+    """
+    if data is None:
+        return {'arrays': [], 'active': {}}
+    data = tvtk.to_vtk(data)
+    key = (id(data), data.GetMTime())
+    result = _inventory_cache.get(key)
+    if result is not None:
+        return result
+
+    arrays = []
+    for i in range(data.GetNumberOfArrays()):
+        arr = data.GetArray(i)
+        # Some VTK datasets claim they have n arrays, but actually some
+        # of these are None (eg the output of a tvtk.GraphToPolyData())
+        if arr is None:
+            continue
+        name = data.GetArrayName(i)
+        n_comp = arr.GetNumberOfComponents()
+        arrays.append((name, _ARRAY_TYPES.get(n_comp, ''), n_comp))
+
+    active = {}
+    for attr, getter in (('scalars', data.GetScalars),
+                         ('vectors', data.GetVectors),
+                         ('tensors', data.GetTensors)):
+        arr = getter()
+        active[attr] = arr.GetName() if arr is not None else None
+
+    result = {'arrays': arrays, 'active': active}
+    _inventory_cache[key] = result
+    while len(_inventory_cache) > _INVENTORY_CACHE_SIZE:
+        _inventory_cache.popitem(last=False)
+    return result
 
 
 def get_attribute_list(data):
     """ Gets scalar, vector and tensor information from the given data
     (either cell or point data).
     """
+    inventory = get_attribute_inventory(data)
     attr = {'scalars':[], 'vectors':[], 'tensors':[]}
-    if data is not None:
-        n = data.number_of_arrays
-        for i in range(n):
-            name = data.get_array_name(i)
-            t = get_array_type(data.get_array(i))
-            if len(t) > 0 and name is not None:
-                attr[t].extend([name])
-
-    def _mk_first(lst, value):
-        """Makes the specified `value` the first item in `lst`."""
-        lst.remove(value)
-        lst.insert(0, value)
-
-    attr1 = attr.copy()
+    for name, t, n_comp in inventory['arrays']:
+        if len(t) > 0 and name is not None:
+            attr[t].append(name)
+
     for a in attr:
-        v = getattr(data, a)
-        if v is not None:
-            name = v.name
-            if name is not None:
-                try:
-                    _mk_first(attr[a], v.name)
-                except ValueError:
-                    # Sometimes we have a multi-component scalar.
-                    attr1[a].insert(0, name)
-    return attr1
+        name = inventory['active'].get(a)
+        if name is not None:
+            # Make the active array the first one.  Sometimes we have a
+            # multi-component scalar which is not in the list.
+            if name in attr[a]:
+                attr[a].remove(name)
+            attr[a].insert(0, name)
+    return attr
 
 
 def get_all_attributes(obj):
     """Gets the scalar, vector and tensor attributes that are
     available in the given VTK data object.
     """
-    point_attr = get_attribute_list(obj.point_data)
-    cell_attr = get_attribute_list(obj.cell_data)
+    obj = tvtk.to_vtk(obj)
+    point_attr = get_attribute_list(obj.GetPointData())
+    cell_attr = get_attribute_list(obj.GetCellData())
     return point_attr, cell_attr
 
 
@@ -187,31 +230,30 @@ class DatasetManager(HasTraits):
         data this will setup the object and the data.
         """
         attrs = ['scalars', 'vectors', 'tensors']
-        aa = self._assign_attribute
-        input = self.dataset
-        data = getattr(input, '%s_data'%d_type)
+        data = tvtk.to_vtk(getattr(self.dataset, '%s_data'%d_type))
         for attr in attrs:
             values = attributes[attr]
             # Get the arrays from VTK, create numpy arrays and setup our
-            # traits.
+            # traits.  The raw VTK arrays are used to avoid creating a
+            # TVTK wrapper for each array.
             arrays = {}
             for name in values:
-                va = data.get_array(name)
-                npa = va.to_array()
+                va = data.GetArray(name)
+                npa = vtk2array(va)
                 # Now test if changes to the numpy array are reflected
                 # in the VTK array, if they are we are set, else we
                 # have to set the VTK array back to the numpy array.
                 if len(npa.shape) > 1:
                     old = npa[0,0]
                     npa[0][0] = old - 1
-                    if abs(va[0][0] - npa[0,0]) > 1e-8:
-                        va.from_array(npa)
+                    if abs(va.GetComponent(0, 0) - npa[0,0]) > 1e-8:
+                        tvtk.to_tvtk(va).from_array(npa)
                     npa[0][0] = old
                 else:
                     old = npa[0]
                     npa[0] = old - 1
-                    if abs(va[0] - npa[0]) > 1e-8:
-                        va.from_array(npa)
+                    if abs(va.GetComponent(0, 0) - npa[0]) > 1e-8:
+                        tvtk.to_tvtk(va).from_array(npa)
                     npa[0] = old
                 arrays[name] = npa
 
@@ -7,13 +7,18 @@ sources derive.
 # License: BSD Style.
 
 # Standard library imports.
+import json
 import re
-from os.path import split, join, isfile
-from glob import glob
+import threading
+import time
+from bisect import bisect_right
+from os import curdir, listdir, stat
+from os.path import dirname, split, join, isfile, normpath
+from xml.etree import ElementTree
 
 # Enthought library imports.
-from traits.api import (Any, Bool, Button, Float, List, Str, Instance, Int,
-                        Range)
+from traits.api import (Any, Bool, Button, Enum, Float, List, Str, Instance,
+                        Int, Range)
 from traitsui.api import Group, HGroup, Item, FileEditor, RangeEditor
 from apptools.persistence.state_pickler import set_state
 from apptools.persistence.file_path import FilePath
@@ -21,11 +26,170 @@ from apptools.persistence.file_path import FilePath
 # Local imports
 from mayavi.core.source import Source
 from mayavi.core.common import handle_children_state
+from mayavi.core.timestep_cache import TimestepCache
 
 
 ######################################################################
 # Utility functions.
 ######################################################################
+# Splits a file name into the part before the last group of digits, the
+# digits and the remaining (non-digit) part.
+_SERIES_RE = re.compile(r'^(.*?)([0-9]+)([^0-9]*)$')
+
+# Extensions of the manifest files that list the files of a time series
+# along with their physical time values.
+MANIFEST_EXTENSIONS = ('.pvd', '.series')
+
+
+def read_series_manifest(file_name):
+    """Reads a ParaView data (.pvd) or a file series (.series) manifest
+    and returns a list of series, each a list of (file_name, time)
+    tuples sorted by time.  A .pvd manifest has one series for every
+    `part` listed at each timestep, a .series manifest has a single
+    one.  The file names are made absolute relative to the manifest's
+    directory.
+    """
+    f_dir = split(file_name)[0]
+    parts = {}
+    if file_name.endswith('.pvd'):
+        tree = ElementTree.parse(file_name)
+        for i, ds in enumerate(tree.getroot().iter('DataSet')):
+            fname = ds.get('file')
+            if fname:
+                time = float(ds.get('timestep', i))
+                parts.setdefault(ds.get('part', '0'), []).append(
+                    (join(f_dir, fname), time)
+                )
+    else:
+        with open(file_name) as fp:
+            data = json.load(fp)
+        parts['0'] = [
+            (join(f_dir, entry['name']), float(entry.get('time', i)))
+            for i, entry in enumerate(data.get('files', []))
+        ]
+    result = []
+    for part in sorted(parts):
+        series = parts[part]
+        series.sort(key=lambda x: x[1])
+        result.append(series)
+    return result
+
+
+class DirectoryIndex(object):
+    """A cache of the time series present in directories.
+
+    Every directory is listed once and the entries are grouped by the
+    part of the name before and after the last group of digits.  The
+    listing is invalidated when the modification time of the directory
+    changes or when `invalidate` is called.  A single instance is shared
+    by all the file data sources.
+    """
+
+    def __init__(self):
+        self._dirs = {}
+        self._manifests = {}
+        self._lock = threading.Lock()
+
+    def get_series(self, file_name):
+        """Returns the sorted list of files in the time series that the
+        given file is a part of and their physical times.  The times are
+        None unless a manifest listing the file is found.
+        """
+        f_dir, f_base = split(file_name)
+        entry = self._get_directory(f_dir)
+        name = normpath(file_name)
+        for manifest in entry['manifests']:
+            series = self._get_manifest(join(f_dir, manifest)).get(name)
+            if series is not None:
+                return series
+
+        match = _SERIES_RE.match(f_base)
+        if match is None:
+            return [], None
+        head, digits, tail = match.groups()
+        files = entry['series'].get((head, tail), [])
+        return [join(f_dir, x[1]) for x in files], None
+
+    def invalidate(self, f_dir=None):
+        """Drops the cached listing of the given directory, or of all
+        directories if none is given.
+        """
+        with self._lock:
+            if f_dir is None:
+                self._dirs.clear()
+                self._manifests.clear()
+            else:
+                self._dirs.pop(f_dir, None)
+
+    def _get_directory(self, f_dir):
+        path = f_dir or curdir
+        try:
+            mtime = stat(path).st_mtime
+        except OSError:
+            return {'mtime': None, 'series': {}, 'manifests': []}
+        with self._lock:
+            entry = self._dirs.get(f_dir)
+            if entry is not None and entry['mtime'] == mtime:
+                return entry
+
+        series = {}
+        manifests = []
+        for name in listdir(path):
+            if name.endswith(MANIFEST_EXTENSIONS):
+                manifests.append(name)
+            match = _SERIES_RE.match(name)
+            if match is not None:
+                head, digits, tail = match.groups()
+                series.setdefault((head, tail), []).append(
+                    (float(digits), name)
+                )
+        for files in series.values():
+            files.sort()
+        entry = {'mtime': mtime, 'series': series,
+                 'manifests': sorted(manifests)}
+        with self._lock:
+            self._dirs[f_dir] = entry
+        return entry
+
+    def _get_manifest(self, file_name):
+        """Returns a dict mapping the normalized name of every file in
+        the manifest to the files and the times of its series.
+        """
+        try:
+            mtime = stat(file_name).st_mtime
+        except OSError:
+            return {}
+        with self._lock:
+            cached = self._manifests.get(file_name)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            parts = read_series_manifest(file_name)
+        except (IOError, ValueError, KeyError, ElementTree.ParseError):
+            parts = []
+        names = {}
+        for series in parts:
+            files = [x[0] for x in series]
+            times = [x[1] for x in series]
+            for name in files:
+                names[normpath(name)] = (files, times)
+        with self._lock:
+            self._manifests[file_name] = (mtime, names)
+        return names
+
+
+# The directory index shared by all the file data sources.
+directory_index = DirectoryIndex()
+
+
+def get_file_series(file_name):
+    """Returns the list of files in the time series of the given file
+    and a list of their physical times (None when there is no manifest
+    for the series).  See `get_file_list` for the naming convention.
+    """
+    return directory_index.get_series(file_name)
+
+
 def get_file_list(file_name):
     """ Given a file name, this function treats the file as a part of
     a series of files based on the index of the file and tries to
@@ -33,49 +197,9 @@ def get_file_list(file_name):
     file in a time series must be of the form 'some_name[0-9]*.ext'.
     That is the integers at the end of the file determine what part of
     the time series the file belongs to.  The files are then sorted as
-    per this index."""
-
-    # The matching is done only for the basename of the file.
-    f_dir, f_base = split(file_name)
-    # Find the head and tail of the file pattern.
-    head = re.sub("[0-9]+[^0-9]*$", "", f_base)
-    tail = re.sub("^.*[0-9]+", "", f_base)
-    pattern = head+"[0-9]*"+tail
-    # Glob the files for the pattern.
-    _files = glob(join(f_dir, pattern))
-
-    # A simple function to get the index from the file.
-    def _get_index(f, head=head, tail=tail):
-        base = split(f)[1]
-        result = base.replace(head, '')
-        return float(result.replace(tail, ''))
-
-    # Before sorting make sure the files in the globbed series are
-    # really part of a timeseries.  This can happen in cases like so:
-    # 5_2_1.vtk and 5_2_1s.vtk will be globbed but 5_2_1s.vtk is
-    # obviously not a valid time series file.
-    files = []
-    for x in _files:
-        try:
-            _get_index(x)
-        except ValueError:
-            pass
-        else:
-            files.append(x)
-
-    # Sort the globbed files based on the index value.
-    def file_sort(x, y):
-        x1 = _get_index(x)
-        y1 = _get_index(y)
-        if x1 > y1:
-            return 1
-        elif y1 > x1:
-            return -1
-        else:
-            return 0
-
-    files.sort(key=lambda x:_get_index(x))
-    return files
+    per this index.  If a .pvd or .series manifest in the same directory
+    lists the file, the files are taken from the manifest instead."""
+    return get_file_series(file_name)[0]
 
 
 class NoUITimer(object):
@@ -123,6 +247,11 @@ class FileDataSource(Source):
     # The list of file names for the timeseries.
     file_list = List(Str, desc='a list of files belonging to a time series')
 
+    # The physical time of each file in `file_list`.  This is only
+    # available when the series is described by a .pvd or .series
+    # manifest and is empty otherwise.
+    file_times = List(Float, desc='the physical time of each file')
+
     # The current time step (starts with 0).  This trait is a dummy
     # and is dynamically changed when the `file_list` trait changes.
     # This is done so the timestep bounds are linked to the number of
@@ -139,8 +268,38 @@ class FileDataSource(Source):
     play_delay = Float(0.2, desc='the delay between loading files')
     loop = Bool(False, desc='if animation is looped')
 
+    # In the 'stepwise' mode every timestep is shown, one per timer tick.
+    # In the 'real time' mode the physical time of the timesteps (from a
+    # series manifest or from the file names) is mapped to wall-clock
+    # time and timesteps are skipped to keep pace.
+    play_mode = Enum('stepwise', 'real time',
+                     desc='how timesteps are advanced while playing')
+
+    # The physical time that elapses per second of real time playback.
+    time_scale = Float(1.0, desc='the physical time played per second')
+
+    # Playback statistics: the achieved frames per second since play was
+    # started, the number of skipped timesteps and the time taken to
+    # load and to render the last timestep in seconds.
+    achieved_fps = Float(0.0, desc='the achieved frames per second')
+    skipped_frames = Int(0, desc='the number of timesteps skipped')
+    load_time = Float(0.0, desc='the time taken to load the last timestep')
+    render_time = Float(0.0,
+                        desc='the time taken to render the last timestep')
+
     update_files = Button('Rescan files')
 
+    # The number of decoded timesteps kept in memory.  Zero disables
+    # caching and prefetching.  Only used by readers that support it.
+    cache_size = Int(0, desc='the number of timesteps cached in memory')
+
+    # The memory budget of the timestep cache in MB.
+    cache_memory = Float(512.0, desc='the memory used by cached timesteps (MB)')
+
+    # The number of timesteps read ahead in the background while the
+    # current one is displayed.
+    prefetch = Int(2, desc='the number of timesteps read in the background')
+
     base_file_name=Str('', desc="the base name of the file",
                        enter_set=True, auto_set=False,
                        editor=FileEditor())
@@ -156,12 +315,30 @@ class FileDataSource(Source):
                                    ),
                               ),
                               Item(name='sync_timestep'),
+                              HGroup(
+                                  Item(name='cache_size'),
+                                  Item(name='prefetch'),
+                              ),
                               HGroup(
                                   Item(name='play'),
                                   Item(name='play_delay',
                                        label='Delay'),
                                   Item(name='loop'),
                               ),
+                              HGroup(
+                                  Item(name='play_mode'),
+                                  Item(name='time_scale',
+                                       enabled_when='object.play_mode '
+                                                    '== "real time"'),
+                              ),
+                              HGroup(
+                                  Item(name='achieved_fps', style='readonly',
+                                       format_str='%.1f'),
+                                  Item(name='load_time', style='readonly',
+                                       format_str='%.3f'),
+                                  Item(name='render_time', style='readonly',
+                                       format_str='%.3f'),
+                              ),
                               visible_when='len(object.file_list) > 1'
                           ),
                           Item(name='update_files', show_label=False),
@@ -178,7 +355,18 @@ class FileDataSource(Source):
     _min_timestep = Int(0)
     _max_timestep = Int(0)
     _timer = Any
+
+    # The wall-clock and physical time at which playback (re)started,
+    # the physical times of the files and the number of frames shown.
+    _play_start = Any
+    _play_times = Any
+    _play_frames = Int(0)
+    _fps_start = Float(0.0)
+    # True while the timestep is set by the playback.
+    _in_play_step = Bool(False)
     _in_update_files = Any(False)
+    _timestep_cache = Any
+    _last_timestep = Int(0)
 
     ######################################################################
     # `object` interface
@@ -186,7 +374,11 @@ class FileDataSource(Source):
     def __get_pure_state__(self):
         d = super(FileDataSource, self).__get_pure_state__()
         # These are obtained dynamically, so don't pickle them.
-        for x in ['file_list', 'timestep', 'play']:
+        for x in ['file_list', 'file_times', 'timestep', 'play',
+                  '_timestep_cache', '_play_start', '_play_times',
+                  '_play_frames', '_fps_start', '_in_play_step',
+                  'achieved_fps', 'skipped_frames',
+                  'load_time', 'render_time']:
             d.pop(x, None)
         return d
 
@@ -216,23 +408,107 @@ class FileDataSource(Source):
         """
         self.base_file_name = base_file_name
 
+    def stop(self):
+        """Invoked when this object is removed from the mayavi
+        pipeline.
+        """
+        if not self.running:
+            return
+        self._reset_timestep_cache()
+        super(FileDataSource, self).stop()
+
     ######################################################################
     # Non-public interface
     ######################################################################
     def _file_list_changed(self, value):
         # Change the range of the timestep suitably to reflect new list.
         n_files = len(self.file_list)
+        # The physical times are those of the old files.
+        self._play_times = None
+        self._play_start = None
         timestep = max(min(self.timestep, n_files-1), 0)
         if self.timestep == timestep:
-            self._timestep_changed(timestep)
+            self._timestep_changed(timestep, timestep)
         else:
             self.timestep = timestep
         self._max_timestep = max(n_files -1, 0)
 
+    def _make_timestep_loader(self):
+        """Returns a callable that reads the given file name and
+        returns a new VTK data object, or None if the reader does not
+        support caching.  The callable is also used from the prefetch
+        threads.  Subclasses should override this.
+        """
+        return None
+
+    def _get_timestep_cache(self):
+        cache = self._timestep_cache
+        if cache is None and self.cache_size > 0:
+            loader = self._make_timestep_loader()
+            if loader is not None:
+                cache = TimestepCache(
+                    loader, max_items=self.cache_size,
+                    max_bytes=int(self.cache_memory*1024*1024)
+                )
+                self._timestep_cache = cache
+        return cache
+
+    def _reset_timestep_cache(self):
+        cache = self._timestep_cache
+        if cache is not None:
+            cache.shutdown()
+            self._timestep_cache = None
+
+    def _read_timestep(self, file_name):
+        """Returns the VTK data object for the given file from the
+        timestep cache and schedules the next timesteps in the direction
+        of play to be read in the background.  Returns None if caching
+        is disabled.
+        """
+        cache = self._get_timestep_cache()
+        if cache is None:
+            return None
+        data = cache.get(file_name)
+        self._prefetch_timesteps()
+        return data
+
+    def _prefetch_timesteps(self):
+        cache = self._timestep_cache
+        file_list = self.file_list
+        n_files = len(file_list)
+        if cache is None or n_files < 2 or self.prefetch < 1:
+            return
+        step = -1 if self.timestep < self._last_timestep else 1
+        names = []
+        for i in range(1, min(self.prefetch, n_files - 1) + 1):
+            index = self.timestep + step*i
+            if self.loop:
+                index = index % n_files
+            elif index < 0 or index >= n_files:
+                break
+            names.append(file_list[index])
+        cache.prefetch(names)
+
+    def _cache_size_changed(self, value):
+        cache = self._timestep_cache
+        if value < 1:
+            self._reset_timestep_cache()
+        elif cache is not None:
+            cache.max_items = value
+
+    def _cache_memory_changed(self, value):
+        cache = self._timestep_cache
+        if cache is not None:
+            cache.max_bytes = int(value*1024*1024)
+
     def _file_list_items_changed(self, list_event):
         self._file_list_changed(self.file_list)
 
-    def _timestep_changed(self, value):
+    def _timestep_changed(self, old, value):
+        self._last_timestep = old
+        if not self._in_play_step:
+            # Playback continues from the chosen timestep.
+            self._play_start = None
         file_list = self.file_list
         if len(file_list) > 0:
             self.file_path = FilePath(file_list[value])
@@ -243,7 +519,7 @@ class FileDataSource(Source):
                 sibling.timestep = value
 
     def _base_file_name_changed(self, value):
-        self._update_files_fired()
+        self._rescan_files()
         try:
             self.timestep = self.file_list.index(value)
         except ValueError:
@@ -254,6 +530,7 @@ class FileDataSource(Source):
         if value:
             if mm is not None:
                 mm.animation_start()
+            self._reset_play_stats()
             self._timer = self._make_play_timer()
             if not self._timer.IsRunning():
                 self._timer.Start()
@@ -267,23 +544,118 @@ class FileDataSource(Source):
         if value and self.play:
             self._play_changed(self.play)
 
+    def _play_mode_changed(self):
+        self._reset_play_stats()
+
+    def _time_scale_changed(self):
+        self._reset_play_stats()
+
+    def _reset_play_stats(self):
+        self._play_start = None
+        self._play_times = None
+        self._play_frames = 0
+        self.skipped_frames = 0
+        self.achieved_fps = 0.0
+
+    def _get_play_times(self):
+        """Returns the physical time of each file.  These are taken from
+        the series manifest if available, otherwise from the index in
+        the file names and finally from the position in the file list.
+        """
+        file_list = self.file_list
+        if len(self.file_times) == len(file_list):
+            return list(self.file_times)
+        times = []
+        for fname in file_list:
+            match = _SERIES_RE.match(split(fname)[1])
+            if match is None:
+                return [float(i) for i in range(len(file_list))]
+            times.append(float(match.group(2)))
+        return times
+
+    def _get_next_timestep(self):
+        """Returns the next timestep to show and the number of seconds to
+        wait before it is due (zero unless nothing is due yet).
+        """
+        nf = self._max_timestep
+        pc = self.timestep
+        if self.play_mode == 'stepwise':
+            return pc + 1, 0.0
+
+        if self._play_times is None or len(self._play_times) != nf + 1:
+            self._play_times = self._get_play_times()
+        times = self._play_times
+        now = time.time()
+        if self._play_start is None:
+            self._play_start = (now, times[pc])
+        start, t_start = self._play_start
+        scale = self.time_scale if self.time_scale > 0 else 1.0
+        t_now = t_start + (now - start)*scale
+        if pc < nf:
+            t_next = times[pc + 1]
+        else:
+            # The last timestep is shown for an average timestep interval.
+            t_next = times[nf] + (times[nf] - times[0])/max(nf, 1)
+        if t_now < t_next:
+            return pc, (t_next - t_now)/scale
+        if pc >= nf:
+            return nf + 1, 0.0
+        # The last timestep whose time has been reached.
+        index = min(bisect_right(times, t_now) - 1, nf)
+        return max(index, pc + 1), 0.0
+
     def _play_event(self):
         mm = getattr(self.scene, 'movie_maker', None)
         nf = self._max_timestep
-        pc = self.timestep
-        pc += 1
+        pc, wait = self._get_next_timestep()
         if pc > nf:
             if self.loop:
                 pc = 0
+                self._play_start = None
             else:
                 self._timer.Stop()
                 pc = nf
                 if mm is not None:
                     mm.animation_stop()
         if pc != self.timestep:
-            self.timestep = pc
+            if pc > self.timestep + 1:
+                self.skipped_frames += pc - self.timestep - 1
+            self._show_timestep(pc)
             if mm is not None:
                 mm.animation_step()
+        elif wait > 0 and isinstance(self._timer, NoUITimer):
+            # There is no event loop to return to, so wait for the next
+            # timestep to be due.
+            time.sleep(wait)
+
+    def _show_timestep(self, value):
+        """Sets the timestep and records the time taken to load the data
+        and to render it.
+        """
+        scene = self.scene
+        toggle = scene is not None and \
+            not getattr(scene, 'disable_render', True)
+        t0 = time.time()
+        if toggle:
+            scene.disable_render = True
+        self._in_play_step = True
+        try:
+            self.timestep = value
+        finally:
+            self._in_play_step = False
+            t1 = time.time()
+            if toggle:
+                # Renders the scene.
+                scene.disable_render = False
+        t2 = time.time()
+        self.load_time = t1 - t0
+        self.render_time = t2 - t1
+
+        self._play_frames += 1
+        if self._play_frames == 1:
+            self._fps_start = t0
+        elif t2 > self._fps_start:
+            self.achieved_fps = (self._play_frames - 1)/(t2 - self._fps_start)
 
     def _play_delay_changed(self):
         if self.play:
@@ -307,6 +679,17 @@ class FileDataSource(Source):
             return []
 
     def _update_files_fired(self):
+        # An explicit rescan does not rely on the directory modification
+        # time since it may not have changed yet.
+        dirs = set([dirname(self.base_file_name)])
+        if self.sync_timestep:
+            for sibling in self._find_sibling_datasets():
+                dirs.add(dirname(sibling.base_file_name))
+        for f_dir in dirs:
+            directory_index.invalidate(f_dir)
+        self._rescan_files()
+
+    def _rescan_files(self):
         # First get all the siblings before we change the current file list.
         if self._in_update_files:
             return
@@ -317,11 +700,16 @@ class FileDataSource(Source):
             else:
                 siblings = []
             fname = self.base_file_name
-            file_list = get_file_list(fname)
+            # The files may have been rewritten.
+            if self._timestep_cache is not None:
+                self._timestep_cache.clear()
+            file_list, file_times = get_file_series(fname)
             if len(file_list) == 0:
-                file_list = [fname]
+                file_list, file_times = [fname], None
+            self.file_times = file_times or []
             self.file_list = file_list
             for sibling in siblings:
-                sibling.update_files = True
+                if sibling is not self:
+                    sibling._rescan_files()
         finally:
             self._in_update_files = False
@@ -0,0 +1,262 @@
+"""A least recently used cache of cell locators shared between the
+filters and modules.
+
+Building a cell locator for a large mesh is expensive and every VTK
+filter that searches cells builds its own one by default.  The filters
+and modules using the same dataset get their locator from this cache so
+that it is only built once for all of them, and only built again when
+the dataset is modified.  The locators are requested on behalf of a
+scene and a scene discards the locators that only it uses when it is
+closed.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+# Standard library imports.
+import threading
+import weakref
+from collections import OrderedDict
+
+# Enthought library imports.
+from tvtk import vtk_module as vtk
+
+# Local imports.
+from mayavi.core.timestep_cache import get_data_size
+
+
+# The static cell locator is much faster to build and to search than
+# the classic one but is missing in old VTK versions.
+_LOCATOR_CLASS = getattr(vtk, 'vtkStaticCellLocator', vtk.vtkCellLocator)
+
+
+def needs_locator(data):
+    """Returns whether cells of the raw VTK dataset `data` are searched
+    with a locator.  Cells of the structured datasets with implicit
+    points are found directly.
+    """
+    return data is not None and data.IsA('vtkPointSet') and \
+        data.GetNumberOfCells() > 0
+
+
+def get_locator_size(locator):
+    """Returns the approximate memory used by a cell locator in bytes.
+    """
+    data = locator.GetDataSet()
+    if data is None:
+        return 0
+    # A cell and bucket id per cell plus the cached bounds of the cell.
+    size = 16
+    if locator.GetCacheCellBounds():
+        size += 48
+    return size*data.GetNumberOfCells()
+
+
+def _get_address(data):
+    """Returns a hashable identity of the raw VTK dataset, the VTK data
+    objects are not hashable.  The address is not reused while the
+    cached locator holds a reference to the dataset.
+    """
+    return data.GetAddressAsString('vtkObject')
+
+
+def _get_geometry_key(data):
+    """Returns a key that changes when the points or the cells of the
+    raw VTK dataset change.  The points may be edited in place and only
+    the dataset modified, as `MlabSource.update` does, so this also
+    changes when only the attributes change.
+    """
+    return (data.GetNumberOfPoints(), data.GetNumberOfCells(),
+            data.GetMTime())
+
+
+######################################################################
+# `LocatorCache` class.
+######################################################################
+class LocatorCache(object):
+    """An LRU cache of built cell locators keyed on the dataset.
+
+    The cache holds the locators of at most `max_items` datasets and
+    evicts the least recently used ones when the locators and their
+    datasets take more than `max_bytes`: the cached locators keep a
+    reference to their dataset.  The most recently used locator is never
+    evicted.  Each locator remembers the owners, the scenes, it was
+    requested for so that `discard_owner` only removes the locators no
+    other owner uses.
+    """
+
+    def __init__(self, max_items=8, max_bytes=1024*1024*1024):
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._locators = OrderedDict()
+        self._keys = {}
+        self._sizes = {}
+        self._owners = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    ######################################################################
+    # `LocatorCache` interface
+    ######################################################################
+    def get(self, data, owner=None):
+        """Returns a built cell locator for the raw VTK dataset `data`,
+        or None if the dataset does not need one.  The locator is
+        recorded as used by `owner` if it is not None, the owner is
+        only weakly referenced.
+        """
+        if not needs_locator(data):
+            return None
+        address = _get_address(data)
+        key = _get_geometry_key(data)
+        while True:
+            with self._lock:
+                locator = self._use(address, key, owner)
+                if locator is not None:
+                    self.hits += 1
+                    return locator
+                event = self._pending.get(address)
+                if event is None:
+                    # Built without the lock so that the other datasets
+                    # can be used meanwhile, the other requests for this
+                    # one wait for it.
+                    event = self._pending[address] = threading.Event()
+                    self.misses += 1
+                    break
+            event.wait()
+
+        try:
+            locator = _LOCATOR_CLASS()
+            locator.SetDataSet(data)
+            locator.BuildLocator()
+            with self._lock:
+                self._locators.pop(address, None)
+                self._locators[address] = locator
+                self._keys[address] = key
+                self._sizes[address] = get_locator_size(locator) + \
+                    get_data_size(data)
+                owners = self._owners.setdefault(address, weakref.WeakSet())
+                if owner is not None:
+                    owners.add(owner)
+                self._evict()
+        finally:
+            with self._lock:
+                del self._pending[address]
+            event.set()
+        return locator
+
+    def discard(self, data):
+        """Removes the locator of the given raw VTK dataset."""
+        address = _get_address(data)
+        with self._lock:
+            self._remove(address)
+
+    def discard_owner(self, owner):
+        """Removes the locators used by `owner` that no other owner
+        uses.
+        """
+        with self._lock:
+            for address, owners in list(self._owners.items()):
+                if owner in owners:
+                    owners.discard(owner)
+                    if len(owners) == 0:
+                        self._remove(address)
+
+    def clear(self):
+        """Removes all the cached locators."""
+        with self._lock:
+            self._locators.clear()
+            self._keys.clear()
+            self._sizes.clear()
+            self._owners.clear()
+
+    def __contains__(self, data):
+        address = _get_address(data)
+        with self._lock:
+            return address in self._locators
+
+    def __len__(self):
+        with self._lock:
+            return len(self._locators)
+
+    @property
+    def nbytes(self):
+        """The total size of the cached locators and of their datasets
+        in bytes.
+        """
+        with self._lock:
+            return sum(self._sizes.values())
+
+    ######################################################################
+    # Non-public interface
+    ######################################################################
+    def _use(self, address, key, owner):
+        # Must be called with the lock held.  Returns the cached locator
+        # if it is up to date and makes it the most recently used one.
+        if self._keys.get(address) != key:
+            return None
+        locator = self._locators.pop(address)
+        self._locators[address] = locator
+        if owner is not None:
+            self._owners[address].add(owner)
+        return locator
+
+    def _remove(self, address):
+        # Must be called with the lock held.
+        self._locators.pop(address, None)
+        self._keys.pop(address, None)
+        self._sizes.pop(address, None)
+        self._owners.pop(address, None)
+
+    def _evict(self):
+        # Must be called with the lock held.
+        locators, sizes = self._locators, self._sizes
+        total = sum(sizes.values())
+        while len(locators) > 1 and (len(locators) > self.max_items or
+                                     total > self.max_bytes):
+            address = next(iter(locators))
+            total -= sizes.get(address, 0)
+            self._remove(address)
+
+
+_locator_cache = LocatorCache()
+
+
+def get_locator_cache():
+    """Returns the `LocatorCache` shared by the filters and modules."""
+    return _locator_cache
+
+
+def _to_vtk(obj):
+    """Returns the raw VTK object of a TVTK object."""
+    if obj is not None and not isinstance(obj, vtk.vtkObjectBase):
+        from tvtk.api import tvtk
+        obj = tvtk.to_vtk(obj)
+    return obj
+
+
+def get_cell_locator(data, owner=None):
+    """Returns the shared, built cell locator for the given dataset or
+    None if it does not need one.  Both TVTK and raw VTK datasets are
+    accepted, the locator is a raw VTK object.  The `owner`, usually the
+    TVTK scene showing the data, discards the locator when it is closed.
+    """
+    data = _to_vtk(data)
+    if data is None:
+        return None
+    return _locator_cache.get(data, owner)
+
+
+def set_cell_locator(filter, data, owner=None):
+    """Makes the given TVTK or raw VTK filter, a vtkProbeFilter for
+    example, search the cells of the dataset `data` with the shared
+    locator.  Nothing is done if the filter does not accept a locator
+    in the VTK version used, and the filter searches the cells itself if
+    the data does not need a locator.  See `get_cell_locator` for the
+    `owner`.
+    """
+    filter = _to_vtk(filter)
+    if not hasattr(filter, 'SetCellLocator'):
+        return
+    filter.SetCellLocator(get_cell_locator(data, owner))
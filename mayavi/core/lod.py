@@ -0,0 +1,210 @@
+"""Build decimated copies of large meshes in a background thread.
+
+The decimated copies are used as the low resolution levels of detail
+drawn while the user interacts with a scene and by the
+`VertexClustering` filter.  Only raw VTK objects are used in the worker
+thread since TVTK objects and the traits machinery are not thread safe.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+# Standard library imports.
+import math
+import threading
+
+# Enthought library imports.
+from tvtk import vtk_module as vtk
+
+
+def _set_input_data(obj, data):
+    if hasattr(obj, 'SetInputData'):
+        obj.SetInputData(data)
+    else:
+        obj.SetInput(data)
+
+
+def get_triangles(data):
+    """Returns the surface of a raw VTK dataset as vtkPolyData made of
+    triangles, lines and vertices.
+    """
+    if not data.IsA('vtkPolyData'):
+        geometry = vtk.vtkGeometryFilter()
+        _set_input_data(geometry, data)
+        geometry.Update()
+        data = geometry.GetOutput()
+    triangles = vtk.vtkTriangleFilter()
+    _set_input_data(triangles, data)
+    triangles.Update()
+    return triangles.GetOutput()
+
+
+def decimate_polydata(data, reduction):
+    """Returns a copy of the raw VTK dataset `data` with about the given
+    fraction of its triangles removed.  The point data of the remaining
+    points is kept.
+    """
+    data = get_triangles(data)
+    # Unlike vtkQuadricDecimation, vtkDecimatePro keeps a subset of the
+    # original points and so their scalars.
+    decimate = vtk.vtkDecimatePro()
+    decimate.PreserveTopologyOff()
+    decimate.SetTargetReduction(reduction)
+    _set_input_data(decimate, data)
+    decimate.Update()
+    output = vtk.vtkPolyData()
+    output.ShallowCopy(decimate.GetOutput())
+    return output
+
+
+def _get_clustering_area(bounds):
+    """Returns half the area of the faces of the bounding box, an
+    estimate of the area of a surface filling it.
+    """
+    d = [max(bounds[2*i + 1] - bounds[2*i], 0.0) for i in range(3)]
+    return d[0]*d[1] + d[1]*d[2] + d[0]*d[2]
+
+
+def _get_divisions(bounds, size):
+    d = [max(bounds[2*i + 1] - bounds[2*i], 0.0) for i in range(3)]
+    return tuple(max(1, int(math.ceil(x/size))) for x in d)
+
+
+def cluster_polydata(data, target_triangles):
+    """Returns a copy of the raw VTK dataset `data` simplified by vertex
+    clustering with about `target_triangles` triangles, together with
+    the number of divisions of the clustering grid.
+
+    The points are binned in a uniform grid of cubic bins, the size of
+    the bins is estimated from the bounds of the data and refined once
+    if the result has too many triangles.  This is much faster than
+    `decimate_polydata` on very large meshes but the point data is not
+    kept.
+    """
+    data = get_triangles(data)
+    n_cells = data.GetNumberOfCells()
+    bounds = data.GetBounds()
+    area = _get_clustering_area(bounds)
+    if n_cells <= target_triangles or area <= 0.0:
+        output = vtk.vtkPolyData()
+        output.ShallowCopy(data)
+        return output, (0, 0, 0)
+
+    # A surface of area A crosses about A/size**2 bins and every bin
+    # produces about two triangles.
+    size = math.sqrt(2.0*area/target_triangles)
+    cluster = vtk.vtkQuadricClustering()
+    cluster.AutoAdjustNumberOfDivisionsOff()
+    _set_input_data(cluster, data)
+    for attempt in range(2):
+        divisions = _get_divisions(bounds, size)
+        cluster.SetNumberOfDivisions(*divisions)
+        cluster.Update()
+        n_triangles = cluster.GetOutput().GetNumberOfCells()
+        if n_triangles <= 1.25*target_triangles:
+            break
+        size *= math.sqrt(float(n_triangles)/target_triangles)
+    output = vtk.vtkPolyData()
+    output.ShallowCopy(cluster.GetOutput())
+    return output, divisions
+
+
+######################################################################
+# `BackgroundWorker` class.
+######################################################################
+class BackgroundWorker(object):
+    """Runs functions in a background thread.
+
+    Only the most recently submitted job is of interest: a job still
+    waiting to be run is replaced by a newer one and the result of a job
+    that was superseded while it was running is dropped.  The optional
+    `callback` is called without arguments, in the worker thread, when
+    a result is ready.
+    """
+
+    def __init__(self, callback=None):
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._generation = 0
+        self._next = None
+        self._result = None
+        self._thread = None
+
+    ######################################################################
+    # `BackgroundWorker` interface
+    ######################################################################
+    def submit(self, function, *args):
+        """Schedules `function(*args)` to be run.  The arguments must not
+        be modified while the job runs, pass shallow copies of datasets
+        if necessary.
+        """
+        with self._lock:
+            self._generation += 1
+            self._next = (self._generation, function, args)
+            self._result = None
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker)
+                self._thread.daemon = True
+                self._thread.start()
+        self._wakeup.set()
+
+    def cancel(self):
+        """Drops any pending job and result."""
+        with self._lock:
+            self._generation += 1
+            self._next = None
+            self._result = None
+
+    def get_result(self):
+        """Returns the result of the last job submitted if it is ready,
+        None otherwise.  A result is returned only once.
+        """
+        with self._lock:
+            result, self._result = self._result, None
+            return result
+
+    ######################################################################
+    # Non-public interface
+    ######################################################################
+    def _worker(self):
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                self._wakeup.clear()
+                job, self._next = self._next, None
+            if job is None:
+                continue
+            generation, function, args = job
+            try:
+                result = function(*args)
+            except Exception:
+                result = None
+            with self._lock:
+                current = generation == self._generation
+                if current:
+                    self._result = result
+            if current and result is not None and \
+                    self.callback is not None:
+                self.callback()
+
+
+######################################################################
+# `LODBuilder` class.
+######################################################################
+class LODBuilder(BackgroundWorker):
+    """Decimates datasets in a background thread with
+    `decimate_polydata`.
+    """
+
+    def __init__(self, reduction=0.9, callback=None):
+        super(LODBuilder, self).__init__(callback=callback)
+        self.reduction = reduction
+
+    def submit(self, data):
+        """Schedules the given raw VTK dataset to be decimated.  The
+        dataset must not be modified while it is being decimated, pass a
+        shallow copy if necessary.
+        """
+        super(LODBuilder, self).submit(decimate_polydata, data,
+                                       self.reduction)
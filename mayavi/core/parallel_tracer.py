@@ -0,0 +1,244 @@
+"""Integrate streamlines from batches of seeds in worker threads.
+
+This is used by the `Streamline` module to keep the UI responsive with
+many seeds on large datasets.  The batches are only integrated on
+several cores at once if the VTK Python wrappers release the GIL while
+a stream tracer runs, that is if VTK was built with
+VTK_PYTHON_FULL_THREADSAFE.  Otherwise the threads take turns but the
+UI still stays responsive between the batches.  Only raw VTK objects
+are used in the worker threads since TVTK objects and the traits
+machinery are not thread safe.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+# Standard library imports.
+import multiprocessing
+import threading
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+import numpy as np
+
+# Enthought library imports.
+from tvtk import vtk_module as vtk
+from vtk.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+
+
+# The settings copied from the stream tracer of the module to the
+# tracers of the worker threads, those missing in the VTK version used
+# are skipped.
+_TRACER_SETTINGS = (
+    'MaximumPropagation', 'MinimumIntegrationStep',
+    'MaximumIntegrationStep', 'InitialIntegrationStep',
+    'IntegrationStepUnit', 'MaximumNumberOfSteps', 'MaximumError',
+    'TerminalSpeed', 'IntegrationDirection', 'IntegratorType',
+    'ComputeVorticity', 'RotationScale', 'SurfaceStreamlines',
+)
+
+
+def copy_tracer_settings(source, target):
+    """Copies the integration settings of the raw vtkStreamTracer
+    `source` to `target`.
+    """
+    for name in _TRACER_SETTINGS:
+        getter = getattr(source, 'Get' + name, None)
+        if getter is not None:
+            getattr(target, 'Set' + name)(getter())
+
+
+def split_seeds(seeds, batch_size):
+    """Returns a list of vtkPolyData with the points of the raw VTK
+    dataset `seeds`, at most `batch_size` in each.
+    """
+    n = seeds.GetNumberOfPoints()
+    if n == 0:
+        return []
+    if seeds.GetPoints() is not None:
+        points = vtk_to_numpy(seeds.GetPoints().GetData())
+    else:
+        points = np.array([seeds.GetPoint(i) for i in range(n)])
+    batches = []
+    for start in range(0, n, max(batch_size, 1)):
+        vtk_points = vtk.vtkPoints()
+        vtk_points.SetData(numpy_to_vtk(
+            np.ascontiguousarray(points[start:start + batch_size]),
+            deep=True
+        ))
+        batch = vtk.vtkPolyData()
+        batch.SetPoints(vtk_points)
+        batches.append(batch)
+    return batches
+
+
+######################################################################
+# `ParallelStreamTracer` class.
+######################################################################
+class ParallelStreamTracer(object):
+    """Integrates streamlines in a pool of threads.
+
+    The seeds are split in batches of `batch_size` points that are
+    integrated as the threads become free.  The results of the batches
+    are collected with `get_results` as they finish.  Submitting new
+    seeds drops the batches of the previous ones that are not done.
+    The optional `callback` is called without arguments, in a worker
+    thread, every time a batch is done.
+
+    The threads integrate in a deep copy of the input since the
+    sources may edit the arrays of their data in place while a trace is
+    running.  Every thread keeps its own vtkStreamTracer on a shallow
+    copy of it, so the cell locator built by a tracer is reused for new
+    seeds as long as the input is not modified.
+    """
+
+    def __init__(self, number_of_threads=0, batch_size=500, callback=None):
+        if number_of_threads <= 0:
+            number_of_threads = multiprocessing.cpu_count()
+        self.number_of_threads = number_of_threads
+        self.batch_size = batch_size
+        self.callback = callback
+        self._lock = threading.Lock()
+        self._done = threading.Condition(self._lock)
+        self._queue = Queue()
+        self._generation = 0
+        self._pending = 0
+        self._results = []
+        self._input = None
+        self._input_key = None
+        self._threads = []
+
+    ######################################################################
+    # `ParallelStreamTracer` interface
+    ######################################################################
+    def submit(self, data, seeds, settings):
+        """Schedules the integration from the points of the raw VTK
+        dataset `seeds` in the raw VTK dataset `data` with the settings
+        of the raw vtkStreamTracer `settings`.  The datasets must not be
+        modified while the integration runs.
+        """
+        batches = split_seeds(seeds, self.batch_size)
+        # The threads use a copy of the settings.
+        tracer = vtk.vtkStreamTracer()
+        copy_tracer_settings(settings, tracer)
+        with self._lock:
+            self._generation += 1
+            self._pending = len(batches)
+            self._results = []
+            self._set_input(data)
+            job = (self._generation, self._input, tracer)
+            self._start_threads()
+        for batch in batches:
+            self._queue.put(job + (batch,))
+
+    def trace(self, data, seeds, settings):
+        """Integrates the streamlines like `submit` and waits for all
+        the batches.  Returns the streamlines as one vtkPolyData.
+        """
+        self.submit(data, seeds, settings)
+        with self._lock:
+            while self._pending > 0:
+                self._done.wait()
+        return merge_polydata(self.get_results()[0])
+
+    def cancel(self):
+        """Drops the pending batches and the results."""
+        with self._lock:
+            self._generation += 1
+            self._pending = 0
+            self._results = []
+            self._done.notify_all()
+
+    def get_results(self):
+        """Returns a list of the vtkPolyData of the batches done since
+        the last call and whether all the batches are done.
+        """
+        with self._lock:
+            results, self._results = self._results, []
+            return results, self._pending == 0
+
+    def shutdown(self):
+        """Drops the pending batches and stops the threads."""
+        self.cancel()
+        for t in self._threads:
+            self._queue.put(None)
+        self._threads = []
+
+    ######################################################################
+    # Non-public interface
+    ######################################################################
+    def _set_input(self, data):
+        # Keep the same copy of the input, and so the locators of the
+        # tracers, while the data is not modified.  A shallow copy would
+        # share the points and the vectors, which `MlabSource.update`
+        # for instance edits in place, with the threads.
+        key = (data, data.GetMTime())
+        if key != self._input_key:
+            self._input_key = key
+            self._input = data.NewInstance()
+            self._input.DeepCopy(data)
+
+    def _start_threads(self):
+        while len(self._threads) < self.number_of_threads:
+            t = threading.Thread(target=self._worker)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    def _worker(self):
+        tracer = vtk.vtkStreamTracer()
+        # A cell locator is much faster than the default point locator
+        # on large unstructured grids once it is built.
+        if hasattr(tracer, 'SetCellLocatorToStaticCellLocator'):
+            tracer.SetCellLocatorToStaticCellLocator()
+        elif hasattr(tracer, 'SetInterpolatorTypeToCellLocator'):
+            tracer.SetInterpolatorTypeToCellLocator()
+        input = None
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            generation, data, settings, batch = job
+            with self._lock:
+                if generation != self._generation:
+                    continue
+            try:
+                if data is not input:
+                    # A shallow copy per thread avoids sharing the state
+                    # cached by the dataset between threads.
+                    input = data
+                    copy = data.NewInstance()
+                    copy.ShallowCopy(data)
+                    tracer.SetInputData(copy)
+                copy_tracer_settings(settings, tracer)
+                tracer.SetSourceData(batch)
+                tracer.Update()
+                output = vtk.vtkPolyData()
+                output.ShallowCopy(tracer.GetOutput())
+            except Exception:
+                output = None
+            with self._lock:
+                current = generation == self._generation
+                if current:
+                    if output is not None:
+                        self._results.append(output)
+                    self._pending -= 1
+                    self._done.notify_all()
+            if current and self.callback is not None:
+                self.callback()
+
+
+def merge_polydata(pieces):
+    """Returns the raw vtkPolyData of the given list appended."""
+    output = vtk.vtkPolyData()
+    if len(pieces) == 0:
+        return output
+    append = vtk.vtkAppendPolyData()
+    for piece in pieces:
+        append.AddInputData(piece)
+    append.Update()
+    output.ShallowCopy(append.GetOutput())
+    return output
@@ -0,0 +1,270 @@
+"""Deterministic, vectorized selection of a subset of the points of a
+dataset.
+
+This is used by the `Glyph` component to thin out the points that are
+glyphed.  Unlike `tvtk.MaskPoints` in random mode the selection only
+depends on the point coordinates, so it does not change from frame to
+frame when only the data on the points changes, and unlike its
+`on_ratio` it covers the dataset evenly.  The strategies are:
+
+- `grid`: keeps the point closest to the center of every occupied cell
+  of a uniform grid.
+- `blue_noise`: keeps a subset of points that are at least a given
+  radius apart, similar to Poisson disk sampling.
+- `budget`: keeps an evenly strided subset of at most a given number of
+  points.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import itertools
+
+import numpy as np
+
+from tvtk import vtk_module as vtk
+from vtk.util.numpy_support import numpy_to_vtk, vtk_to_numpy
+
+
+def budget_sample(n_points, max_points):
+    """Returns the indices of an evenly strided subset of at most
+    `max_points` out of `n_points`.
+    """
+    if max_points <= 0 or n_points <= max_points:
+        return np.arange(n_points)
+    return np.unique(
+        np.linspace(0, n_points - 1, max_points).astype(np.int64)
+    )
+
+
+def _get_cells(points, size):
+    """Returns the integer cell coordinates of the points in a grid of
+    cubic cells of the given size and a unique key for every cell.
+    """
+    delta = points - points.min(axis=0)
+    ijk = np.floor(delta/size).astype(np.int64)
+    # Points on the upper bounds go in the last cell rather than in an
+    # extra one.
+    n = np.ceil(delta.max(axis=0)/size*(1.0 - 1e-9)).astype(np.int64)
+    ijk = np.minimum(ijk, np.maximum(n, 1) - 1)
+    dims = ijk.max(axis=0) + 1
+    keys = (ijk[:, 0]*dims[1] + ijk[:, 1])*dims[2] + ijk[:, 2]
+    return ijk, dims, keys
+
+
+def _first_per_cell(keys, priority):
+    """Returns the index of the point with the lowest priority in every
+    cell, sorted by cell key.
+    """
+    order = np.lexsort((priority, keys))
+    sorted_keys = keys[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = sorted_keys[1:] != sorted_keys[:-1]
+    return order[first]
+
+
+def get_sample_spacing(points, max_points):
+    """Returns the spacing for about `max_points` points evenly spread
+    over the bounding box of the given points.
+    """
+    extent = points.max(axis=0) - points.min(axis=0)
+    extent = extent[extent > 0]
+    if len(extent) == 0 or max_points <= 0:
+        return 0.0
+    return (np.prod(extent)/max_points)**(1.0/len(extent))
+
+
+def grid_sample(points, divisions):
+    """Returns the indices of the points closest to the center of each
+    occupied cell of a grid with `divisions` cubic cells along the
+    longest side of the bounding box of the (n, 3) `points`.
+    """
+    if len(points) == 0:
+        return np.arange(0)
+    size = (points.max(axis=0) - points.min(axis=0)).max()/divisions
+    if size <= 0:
+        return np.arange(1)
+    ijk, dims, keys = _get_cells(points, size)
+    centers = points.min(axis=0) + (ijk + 0.5)*size
+    distance = ((points - centers)**2).sum(axis=1)
+    return np.sort(_first_per_cell(keys, distance))
+
+
+def blue_noise_sample(points, radius, seed=0):
+    """Returns the indices of a subset of the (n, 3) `points` that are
+    at least `radius` apart.
+
+    One candidate is picked per cell of a grid with cells of size
+    `radius` using a fixed pseudo random priority and a candidate is
+    dropped if a neighboring candidate of lower priority is closer than
+    `radius`.  This is a vectorized approximation of Poisson disk
+    sampling and is the same for the same points and seed.
+    """
+    n = len(points)
+    if n == 0:
+        return np.arange(0)
+    if radius <= 0:
+        return np.arange(n)
+    priority = np.random.RandomState(seed).permutation(n)
+    ijk, dims, keys = _get_cells(points, radius)
+    candidates = _first_per_cell(keys, priority)
+    c_keys = keys[candidates]
+    c_ijk = ijk[candidates]
+    c_points = points[candidates]
+    c_priority = priority[candidates]
+    m = len(candidates)
+    dropped = np.zeros(m, dtype=bool)
+    r2 = radius*radius
+    for offset in itertools.product((-1, 0, 1), repeat=3):
+        if offset == (0, 0, 0):
+            continue
+        n_ijk = c_ijk + offset
+        valid = ((n_ijk >= 0) & (n_ijk < dims)).all(axis=1)
+        n_keys = (n_ijk[:, 0]*dims[1] + n_ijk[:, 1])*dims[2] + n_ijk[:, 2]
+        pos = np.searchsorted(c_keys, n_keys)
+        pos[pos >= m] = 0
+        found = valid & (c_keys[pos] == n_keys)
+        i = np.nonzero(found)[0]
+        j = pos[i]
+        close = ((c_points[i] - c_points[j])**2).sum(axis=1) < r2
+        conflict = close & (c_priority[j] < c_priority[i])
+        dropped[i[conflict]] = True
+    return np.sort(candidates[~dropped])
+
+
+def sample_points(points, mode, divisions=50, radius=0.0, max_points=0):
+    """Returns the indices of the points selected with the given
+    strategy, one of 'grid', 'blue_noise' or 'budget'.  If `max_points`
+    is positive at most that many points are selected.  A `radius` of
+    zero for 'blue_noise' means one chosen so that about `max_points`
+    points are selected.
+    """
+    n = len(points)
+    if mode == 'grid':
+        indices = grid_sample(points, divisions)
+    elif mode == 'blue_noise':
+        if radius <= 0 and max_points > 0:
+            # Poisson disk samples are sparser than a grid of the same
+            # spacing.
+            radius = 0.7*get_sample_spacing(points, max_points)
+        indices = blue_noise_sample(points, radius)
+    elif mode == 'budget':
+        indices = np.arange(n)
+    else:
+        raise ValueError('Unknown sampling mode %r' % mode)
+    if max_points > 0 and len(indices) > max_points:
+        indices = indices[budget_sample(len(indices), max_points)]
+    return indices
+
+
+def get_coordinates(data, indices=None):
+    """Returns the coordinates of the points of a raw VTK dataset as an
+    (n, 3) array, only those of the given point indices if any.  The
+    coordinates of the points of image data and rectilinear grids are
+    computed from their structured indices.
+    """
+    if indices is None:
+        indices = np.arange(data.GetNumberOfPoints())
+    if hasattr(data, 'GetPoints'):
+        points = data.GetPoints()
+        if points is None:
+            return np.empty((0, 3))
+        return vtk_to_numpy(points.GetData())[indices]
+    if data.IsA('vtkImageData'):
+        axes = [o + s*np.arange(n) for o, s, n in
+                zip(data.GetOrigin(), data.GetSpacing(),
+                    data.GetDimensions())]
+    elif data.IsA('vtkRectilinearGrid'):
+        axes = [vtk_to_numpy(a) for a in (data.GetXCoordinates(),
+                                          data.GetYCoordinates(),
+                                          data.GetZCoordinates())]
+    else:
+        return np.array([data.GetPoint(i) for i in indices]).reshape(-1, 3)
+    # The x index varies fastest.
+    nx, ny, nz = data.GetDimensions()
+    k, j, i = np.unravel_index(indices, (nz, ny, nx))
+    return np.column_stack((axes[0][i], axes[1][j], axes[2][k]))
+
+
+######################################################################
+# `PointMaskFilter` class.
+######################################################################
+class PointMaskFilter(vtk.VTKPythonAlgorithmBase):
+    """A VTK filter producing poly data with the points of its input
+    selected by `sample_points` and their point data.
+
+    The selection is cached and only computed again when the input or
+    the parameters change.
+    """
+
+    def __init__(self):
+        vtk.VTKPythonAlgorithmBase.__init__(
+            self, nInputPorts=1, inputType='vtkDataSet',
+            nOutputPorts=1, outputType='vtkPolyData'
+        )
+        self.mode = 'budget'
+        self.divisions = 50
+        self.radius = 0.0
+        self.max_points = 10000
+        self._cache_key = None
+        self._indices = None
+
+    def set_parameters(self, mode, divisions, radius, max_points):
+        """Sets the arguments passed to `sample_points`."""
+        params = (mode, divisions, radius, max_points)
+        if params != (self.mode, self.divisions, self.radius,
+                      self.max_points):
+            self.mode, self.divisions, self.radius, self.max_points = \
+                params
+            self.Modified()
+
+    def get_indices(self, data):
+        """Returns the indices of the points of the raw VTK dataset
+        selected with the current parameters.
+        """
+        # The points may be edited in place and only the dataset
+        # modified.
+        key = (data.GetMTime(), data.GetNumberOfPoints(), self.mode,
+               self.divisions, self.radius, self.max_points)
+        if key != self._cache_key:
+            if self.mode == 'budget':
+                # No need for the coordinates.
+                indices = budget_sample(data.GetNumberOfPoints(),
+                                        self.max_points)
+            else:
+                points = get_coordinates(data)
+                indices = sample_points(points, self.mode, self.divisions,
+                                        self.radius, self.max_points)
+            self._cache_key, self._indices = key, indices
+        return self._indices
+
+    def RequestData(self, request, in_info, out_info):
+        input = vtk.vtkDataSet.GetData(in_info[0])
+        output = vtk.vtkPolyData.GetData(out_info)
+        output.Initialize()
+        if input is None or input.GetNumberOfPoints() == 0:
+            return 1
+        indices = self.get_indices(input)
+
+        coords = get_coordinates(input, indices)
+        points = vtk.vtkPoints()
+        points.SetData(numpy_to_vtk(np.ascontiguousarray(coords),
+                                    deep=True))
+        output.SetPoints(points)
+
+        in_pd, out_pd = input.GetPointData(), output.GetPointData()
+        for i in range(in_pd.GetNumberOfArrays()):
+            array = in_pd.GetArray(i)
+            if array is None:
+                # Not a data array, e.g. a string array.
+                continue
+            data = vtk_to_numpy(array)[indices]
+            new = numpy_to_vtk(np.ascontiguousarray(data), deep=True,
+                               array_type=array.GetDataType())
+            new.SetName(array.GetName())
+            out_pd.AddArray(new)
+        for attr in ('Scalars', 'Vectors', 'Normals', 'Tensors'):
+            array = getattr(in_pd, 'Get' + attr)()
+            if array is not None and array.GetName():
+                getattr(out_pd, 'SetActive' + attr)(array.GetName())
+        return 1
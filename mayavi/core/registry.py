@@ -6,11 +6,13 @@
 # License: BSD Style.
 
 # Standard library imports.
-from os.path import splitext
+from collections import OrderedDict
+from os import stat
+from os.path import abspath, splitext
 import logging
 
 # Enthought library imports.
-from traits.api import HasTraits, List, Instance, Dict, Str
+from traits.api import Any, HasTraits, List, Instance, Dict, Int, Str
 
 # Local imports.
 from mayavi.core.metadata import Metadata, import_symbol
@@ -41,6 +43,20 @@ class Registry(HasTraits):
     # The metadata for the filters.
     filters = List(Metadata)
 
+    # The maximum number of cached `can_read_test` results.
+    can_read_cache_size = Int(256)
+
+    ########################################
+    # Private traits.
+
+    # A mapping from a file extension to the source metadata that handle
+    # it, in registration order.  Rebuilt lazily when `sources` changes.
+    _extension_index = Any
+
+    # The results of the `can_read_test` callables keyed on the test,
+    # the absolute file name, its size and modification time.
+    _can_read_cache = Instance(OrderedDict, ())
+
     ######################################################################
     # `Registry` interface.
     ######################################################################
@@ -89,8 +105,7 @@ class Registry(HasTraits):
         result = []
         if len(ext) > 0:
             ext = ext[1:]
-            result = [src for src in self.sources \
-                      if ext in src.extensions]
+            result = list(self._get_extension_index().get(ext, []))
 
         # 'result' contains list of all source metadata that can handle
         # the file.
@@ -110,7 +125,7 @@ class Registry(HasTraits):
         if len(result) > 1:
             for res in result[:]:
                 if len(res.can_read_test) > 0:
-                    can_read = import_symbol(res.can_read_test)(filename)
+                    can_read = self._can_read(res.can_read_test, filename)
                     if can_read:
                         return res
                     else:
@@ -138,6 +153,50 @@ class Registry(HasTraits):
         else:
             raise TypeError("Scene not attached to a mayavi engine.")
 
+    ######################################################################
+    # Non-public interface.
+    ######################################################################
+    def _get_extension_index(self):
+        index = self._extension_index
+        if index is None:
+            index = {}
+            for src in self.sources:
+                for ext in src.extensions:
+                    lst = index.setdefault(ext, [])
+                    if src not in lst:
+                        lst.append(src)
+            self._extension_index = index
+        return index
+
+    def _can_read(self, can_read_test, filename):
+        """Calls the given `can_read_test` on the file, reusing the
+        result of an earlier call on the same unmodified file.
+        """
+        try:
+            st = stat(filename)
+        except OSError:
+            # Let the test deal with a missing file, do not cache it.
+            return import_symbol(can_read_test)(filename)
+
+        key = (can_read_test, abspath(filename), st.st_size, st.st_mtime)
+        cache = self._can_read_cache
+        if key in cache:
+            result = cache.pop(key)
+        else:
+            result = import_symbol(can_read_test)(filename)
+        cache[key] = result
+        while len(cache) > self.can_read_cache_size:
+            cache.popitem(last=False)
+        return result
+
+    def _sources_changed(self):
+        self._extension_index = None
+        self._can_read_cache.clear()
+
+    def _sources_items_changed(self):
+        self._extension_index = None
+        self._can_read_cache.clear()
+
 
 
 # The global registry instance.
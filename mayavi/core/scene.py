@@ -4,6 +4,9 @@
 # Copyright (c) 2005,  Enthought, Inc.
 # License: BSD Style.
 
+# Standard library imports.
+from functools import partial
+
 # Enthought library imports.
 from traits.api import Event, List, Str, Instance
 from traitsui.api import View, Group, Item
@@ -15,6 +18,7 @@ from mayavi.core.base import Base
 from mayavi.core.source import Source
 from mayavi.core.common import handle_children_state, exception
 from mayavi.core.adder_node import SourceAdderNode
+from mayavi.core.locator_cache import get_cell_locator, get_locator_cache
 
 ######################################################################
 # `Scene` class.
@@ -146,6 +150,12 @@ class Scene(Base):
         # Disallow the hide action in the context menu
         self._HideShowAction.enabled = False
 
+        # Share the cell locators of the data with the picker.
+        picker = getattr(self.scene, 'picker', None)
+        if picker is not None and picker.cell_locator_factory is None:
+            picker.cell_locator_factory = partial(get_cell_locator,
+                                                  owner=self.scene)
+
         super(Scene, self).start()
 
     def stop(self):
@@ -169,6 +179,9 @@ class Scene(Base):
             if scene is not None:
                 scene.disable_render = status
                 self.scene = None
+        # Do not keep the datasets of the closed scene alive.
+        if scene is not None:
+            get_locator_cache().discard_owner(scene)
         super(Scene, self).stop()
 
     def add_child(self, child):
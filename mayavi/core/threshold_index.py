@@ -0,0 +1,291 @@
+"""Extraction of the cells with scalars in a range using a sorted index
+of the scalars.
+
+This is used by the `Threshold` filter so that moving the thresholds
+interactively does not test every cell of the input again.  The minimum
+and maximum of the scalars of every cell are computed and sorted once
+per input, the cells in a new range are then found with a binary search
+and only those are extracted.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import numpy as np
+
+from tvtk import vtk_module as vtk
+from vtk.util.numpy_support import get_vtk_to_numpy_typemap, vtk_to_numpy
+
+
+_ID_TYPE = get_vtk_to_numpy_typemap()[vtk.VTK_ID_TYPE]
+
+
+# The settings copied from the threshold filter of the Mayavi filter to
+# the one used when the index cannot be, those missing in the VTK
+# version used are skipped.
+_THRESHOLD_SETTINGS = (
+    'AllScalars', 'UseContinuousCellRange', 'ComponentMode',
+    'SelectedComponent', 'Invert', 'AttributeMode', 'OutputPointsPrecision',
+)
+
+
+def copy_threshold_settings(source, target):
+    """Copies the settings of the raw vtkThreshold `source` to `target`,
+    except the thresholds.
+    """
+    for name in _THRESHOLD_SETTINGS:
+        getter = getattr(source, 'Get' + name, None)
+        if getter is not None:
+            getattr(target, 'Set' + name)(getter())
+
+
+def set_threshold_range(threshold, lower, upper):
+    """Makes the raw vtkThreshold `threshold` keep the cells between
+    `lower` and `upper`.
+    """
+    if hasattr(threshold, 'SetThresholdFunction'):
+        threshold.SetLowerThreshold(lower)
+        threshold.SetUpperThreshold(upper)
+        threshold.SetThresholdFunction(threshold.THRESHOLD_BETWEEN)
+    else:
+        threshold.ThresholdBetween(lower, upper)
+
+
+def _get_connectivity(data):
+    """Returns the offsets and the point ids of the cells of the raw VTK
+    unstructured grid or poly data as arrays, or None for other datasets
+    or old VTK versions.
+    """
+    if data.IsA('vtkUnstructuredGrid'):
+        cell_arrays = [data.GetCells()]
+    elif data.IsA('vtkPolyData'):
+        # The cells are numbered in this order.
+        cell_arrays = [data.GetVerts(), data.GetLines(), data.GetPolys(),
+                       data.GetStrips()]
+    else:
+        return None
+    offsets, connectivity = [np.zeros(1, dtype=np.int64)], []
+    start = 0
+    for cells in cell_arrays:
+        if cells is None or cells.GetNumberOfCells() == 0:
+            continue
+        if not hasattr(cells, 'GetOffsetsArray'):
+            return None
+        o = vtk_to_numpy(cells.GetOffsetsArray()).astype(np.int64)
+        offsets.append(o[1:] + start)
+        connectivity.append(vtk_to_numpy(cells.GetConnectivityArray()))
+        start += o[-1]
+    if len(connectivity) == 0:
+        return None
+    return np.concatenate(offsets), np.concatenate(connectivity)
+
+
+def get_cell_ranges(data, values):
+    """Returns the minimum and the maximum of the point data `values`
+    over the points of every cell of the raw VTK dataset `data`, or None
+    if this is not supported for the dataset.  NaNs propagate.
+    """
+    if hasattr(data, 'GetDimensions'):
+        # Structured data, the cells are between consecutive points.
+        dims = data.GetDimensions()
+        cmin = cmax = values.reshape(dims[::-1])
+        for axis in range(3):
+            if cmin.shape[axis] > 1:
+                lo = [slice(None)]*3
+                hi = [slice(None)]*3
+                lo[axis], hi[axis] = slice(None, -1), slice(1, None)
+                lo, hi = tuple(lo), tuple(hi)
+                cmin = np.minimum(cmin[lo], cmin[hi])
+                cmax = np.maximum(cmax[lo], cmax[hi])
+        return cmin.ravel(), cmax.ravel()
+
+    conn = _get_connectivity(data)
+    if conn is None:
+        return None
+    offsets, connectivity = conn
+    if len(offsets) - 1 != data.GetNumberOfCells() or \
+            (np.diff(offsets) == 0).any():
+        # Empty cells cannot be reduced.
+        return None
+    cell_values = values[connectivity]
+    return (np.minimum.reduceat(cell_values, offsets[:-1]),
+            np.maximum.reduceat(cell_values, offsets[:-1]))
+
+
+def _get_cells_key(data):
+    """Returns a key that changes when the cells of the raw VTK dataset
+    change.
+    """
+    key = [data.GetNumberOfCells()]
+    for name in ('GetCells', 'GetVerts', 'GetLines', 'GetPolys',
+                 'GetStrips'):
+        getter = getattr(data, name, None)
+        cells = getter() if getter is not None else None
+        if cells is not None:
+            key.append(cells.GetMTime())
+    if hasattr(data, 'GetDimensions'):
+        key.append(tuple(data.GetDimensions()))
+    return tuple(key)
+
+
+######################################################################
+# `ThresholdIndex` class.
+######################################################################
+class ThresholdIndex(object):
+    """The cells sorted on the minimum and on the maximum of their
+    scalars.  For cell data both are the scalars of the cells.
+    """
+
+    def __init__(self, cell_min, cell_max):
+        self.cell_min = cell_min
+        self.cell_max = cell_max
+        # NaNs are sorted last and never in a range.
+        self._min_order, self._sorted_min = self._sort(cell_min)
+        if cell_max is cell_min:
+            self._max_order, self._sorted_max = \
+                self._min_order, self._sorted_min
+        else:
+            self._max_order, self._sorted_max = self._sort(cell_max)
+
+    def query(self, lower, upper):
+        """Returns the sorted ids of the cells with all their scalars
+        between `lower` and `upper`.
+        """
+        if upper < lower:
+            return np.zeros(0, dtype=np.int64)
+        sorted_min, sorted_max = self._sorted_min, self._sorted_max
+        # The cells with min >= lower and max <= upper.
+        start = np.searchsorted(sorted_min, lower, 'left')
+        if self.cell_max is self.cell_min:
+            end = np.searchsorted(sorted_min, upper, 'right')
+            ids = self._min_order[start:end]
+        else:
+            # Filter the smallest of the two candidate sets.
+            n_max = np.searchsorted(sorted_max, upper, 'right')
+            if len(sorted_min) - start <= n_max:
+                ids = self._min_order[start:len(sorted_min)]
+                ids = ids[self.cell_max[ids] <= upper]
+            else:
+                ids = self._max_order[:n_max]
+                ids = ids[self.cell_min[ids] >= lower]
+        return np.sort(ids)
+
+    def _sort(self, values):
+        order = np.argsort(values, kind='mergesort')
+        sorted_values = values[order]
+        n_valid = len(values) - np.count_nonzero(np.isnan(values))
+        return order, sorted_values[:n_valid]
+
+
+######################################################################
+# `IndexedThreshold` class.
+######################################################################
+class IndexedThreshold(vtk.VTKPythonAlgorithmBase):
+    """A VTK filter keeping the cells of its input with scalars between
+    two thresholds like vtkThreshold, using a `ThresholdIndex`.
+
+    The index is only built again when the cells or the scalars of the
+    input change.  The settings of the raw vtkThreshold `settings` are
+    followed, those the index does not support, multi-component scalars
+    and an inverted range for instance, make the filter fall back to a
+    vtkThreshold.
+    """
+
+    def __init__(self):
+        vtk.VTKPythonAlgorithmBase.__init__(
+            self, nInputPorts=1, inputType='vtkDataSet',
+            nOutputPorts=1, outputType='vtkUnstructuredGrid'
+        )
+        self.lower = -1e20
+        self.upper = 1e20
+        self.settings = vtk.vtkThreshold()
+        self._index_key = None
+        self._index = None
+        self._extract = vtk.vtkExtractCells()
+        # Produce the same arrays as vtkThreshold.
+        if hasattr(self._extract, 'SetPassThroughCellIds'):
+            self._extract.SetPassThroughCellIds(False)
+        if hasattr(self._extract, 'SetAssumeSortedAndUniqueIds'):
+            self._extract.SetAssumeSortedAndUniqueIds(True)
+        self._threshold = vtk.vtkThreshold()
+
+    def set_range(self, lower, upper):
+        """Sets the thresholds."""
+        if (lower, upper) != (self.lower, self.upper):
+            self.lower, self.upper = lower, upper
+            self.Modified()
+
+    def get_index(self, data):
+        """Returns the `ThresholdIndex` for the raw VTK dataset or None
+        if the settings or the data are not supported.
+        """
+        settings = self.settings
+        for name in ('Invert', 'UseContinuousCellRange'):
+            if getattr(settings, 'Get' + name, lambda: False)():
+                return None
+        array, association = self._get_scalars(data)
+        if array is None or array.GetNumberOfComponents() != 1 or \
+                array.GetNumberOfTuples() == 0:
+            return None
+        points = vtk.vtkDataObject.FIELD_ASSOCIATION_POINTS
+        is_point_data = association == points
+        if is_point_data and not settings.GetAllScalars():
+            return None
+
+        # The dataset is modified when its arrays are edited in place
+        # and the array itself is not.
+        key = (_get_cells_key(data), association, array.GetName(),
+               data.GetMTime())
+        if key != self._index_key:
+            values = vtk_to_numpy(array).astype(np.float64)
+            if is_point_data:
+                ranges = get_cell_ranges(data, values)
+                index = None if ranges is None else ThresholdIndex(*ranges)
+            else:
+                index = ThresholdIndex(values, values)
+            self._index_key, self._index = key, index
+        return self._index
+
+    def RequestData(self, request, in_info, out_info):
+        input = vtk.vtkDataSet.GetData(in_info[0])
+        output = vtk.vtkUnstructuredGrid.GetData(out_info)
+        output.Initialize()
+        if input is None or input.GetNumberOfCells() == 0:
+            return 1
+        index = self.get_index(input)
+        if index is None:
+            fil = self._threshold
+            copy_threshold_settings(self.settings, fil)
+            set_threshold_range(fil, self.lower, self.upper)
+        else:
+            ids = index.query(self.lower, self.upper)
+            fil = self._extract
+            self._set_cell_ids(ids)
+        fil.SetInputData(input)
+        fil.Update()
+        output.ShallowCopy(fil.GetOutput())
+        # Do not keep a reference to the input.
+        fil.SetInputData(None)
+        return 1
+
+    def _set_cell_ids(self, ids):
+        extract = self._extract
+        if hasattr(extract, 'SetCellIds'):
+            ids = np.ascontiguousarray(ids, dtype=_ID_TYPE)
+            extract.SetCellIds(ids, len(ids))
+        else:
+            id_list = vtk.vtkIdList()
+            id_list.SetNumberOfIds(len(ids))
+            for i, cell_id in enumerate(ids):
+                id_list.SetId(i, cell_id)
+            extract.SetCellList(id_list)
+
+    def _get_scalars(self, data):
+        """Returns the array and the association of the scalars used by
+        vtkThreshold by default: the point scalars, else the cell ones.
+        """
+        scalars = data.GetPointData().GetScalars()
+        if scalars is not None:
+            return scalars, vtk.vtkDataObject.FIELD_ASSOCIATION_POINTS
+        scalars = data.GetCellData().GetScalars()
+        return scalars, vtk.vtkDataObject.FIELD_ASSOCIATION_CELLS
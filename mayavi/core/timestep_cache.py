@@ -0,0 +1,209 @@
+"""A least recently used cache of decoded timestep datasets with
+background prefetching.
+
+The cache is used by the `FileDataSource` to avoid re-reading the files
+of a time series when scrubbing back and forth and to read the next few
+timesteps in worker threads while the current one is displayed.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+# Standard library imports.
+import threading
+from collections import OrderedDict
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+
+def get_data_size(data):
+    """Returns the approximate memory used by a VTK data object in
+    bytes.  Objects that do not report their size count as zero.
+    """
+    try:
+        return data.GetActualMemorySize()*1024
+    except AttributeError:
+        return 0
+
+
+######################################################################
+# `TimestepCache` class.
+######################################################################
+class TimestepCache(object):
+    """An LRU cache of datasets keyed on the file name.
+
+    The `loader` is a callable that is given a file name and returns a
+    new VTK data object.  It must not touch any traits or the rendering
+    pipeline since it is also called from the prefetch threads.  The
+    cache holds at most `max_items` datasets and evicts the least
+    recently used ones when the datasets take more than `max_bytes`.
+    The most recently used dataset is never evicted.  The prefetched
+    datasets that were not used yet are only evicted when no other
+    dataset can be, the last requested first, so prefetching more
+    timesteps than the cache can hold does not evict the current one or
+    the next ones.
+    """
+
+    def __init__(self, loader, max_items=8, max_bytes=512*1024*1024,
+                 n_threads=2):
+        self.loader = loader
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._pending = {}
+        # The key of the most recently used dataset and the priority of
+        # the keys of the last `prefetch` call.
+        self._current = None
+        self._wanted = {}
+        self._lock = threading.Lock()
+        self._queue = Queue()
+        self._threads = []
+        for i in range(n_threads):
+            t = threading.Thread(target=self._worker)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    ######################################################################
+    # `TimestepCache` interface
+    ######################################################################
+    def get(self, key):
+        """Returns the dataset for the given key, reading it in the
+        calling thread if it is neither cached nor being prefetched.
+        """
+        with self._lock:
+            data = self._use(key)
+            if data is not None:
+                self.hits += 1
+                return data
+            event = self._pending.get(key)
+
+        if event is not None:
+            # Being read in the background, wait for it.
+            event.wait()
+            with self._lock:
+                data = self._use(key)
+                if data is not None:
+                    self.hits += 1
+                    return data
+
+        with self._lock:
+            self.misses += 1
+        data = self.loader(key)
+        self.put(key, data)
+        return data
+
+    def put(self, key, data):
+        """Adds a dataset to the cache as the most recently used one.
+        """
+        if data is None:
+            return
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = data
+            self._sizes[key] = get_data_size(data)
+            self._current = key
+            self._evict()
+
+    def prefetch(self, keys):
+        """Schedules the given keys to be read in the background, in
+        the order they will be needed.  Keys that are cached or already
+        scheduled are ignored.
+        """
+        with self._lock:
+            self._wanted = dict((key, i) for i, key in enumerate(keys))
+        for key in keys:
+            with self._lock:
+                if key in self._data or key in self._pending:
+                    continue
+                self._pending[key] = threading.Event()
+            self._queue.put(key)
+
+    def discard(self, key):
+        """Removes the given key from the cache."""
+        with self._lock:
+            self._data.pop(key, None)
+            self._sizes.pop(key, None)
+
+    def clear(self):
+        """Removes all the cached datasets."""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+
+    def shutdown(self):
+        """Clears the cache and stops the prefetch threads."""
+        self.clear()
+        for t in self._threads:
+            self._queue.put(None)
+        self._threads = []
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    @property
+    def nbytes(self):
+        """The total size of the cached datasets in bytes."""
+        with self._lock:
+            return sum(self._sizes.values())
+
+    ######################################################################
+    # Non-public interface
+    ######################################################################
+    def _use(self, key):
+        # Must be called with the lock held.  Returns the cached dataset
+        # and makes it the most recently used one.
+        data = self._data.pop(key, None)
+        if data is not None:
+            self._data[key] = data
+            self._current = key
+        return data
+
+    def _evict(self):
+        # Must be called with the lock held.
+        data, sizes = self._data, self._sizes
+        total = sum(sizes.values())
+        current, wanted = self._current, self._wanted
+        # The least recently used first, then the prefetched datasets
+        # needed last.  The current one is never evicted.
+        keys = [k for k in data if k != current and k not in wanted]
+        keys += sorted((k for k in data if k != current and k in wanted),
+                       key=wanted.get, reverse=True)
+        for key in keys:
+            if len(data) <= self.max_items and total <= self.max_bytes:
+                break
+            del data[key]
+            total -= sizes.pop(key, 0)
+
+    def _worker(self):
+        while True:
+            key = self._queue.get()
+            if key is None:
+                break
+            try:
+                data = self.loader(key)
+            except Exception:
+                # The error is reported when the timestep is actually
+                # requested and read in the foreground.
+                data = None
+            if data is not None:
+                with self._lock:
+                    if key not in self._data:
+                        self._data[key] = data
+                        self._sizes[key] = get_data_size(data)
+                        self._evict()
+            with self._lock:
+                event = self._pending.pop(key, None)
+            if event is not None:
+                event.set()
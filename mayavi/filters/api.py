@@ -38,6 +38,7 @@ from .transform_data import TransformData
 from .triangle_filter import TriangleFilter
 from .tube import Tube
 from .user_defined import UserDefined
+from .vertex_clustering import VertexClustering
 from .vorticity import Vorticity
 from .warp_scalar import WarpScalar
 from .warp_vector import WarpVector
@@ -13,6 +13,7 @@ import tvtk.common as tvtk_common
 
 # Local imports.
 from mayavi.core.filter import Filter
+from mayavi.core.locator_cache import set_cell_locator
 from mayavi.core.pipeline_info import PipelineInfo
 
 
@@ -115,6 +116,9 @@ class ImageDataProbe(Filter):
         if self.dimensions.sum() == 0:
             reset = True
         self._setup_probe_data(reset)
+        # Use the cell locator shared with the other users of the input.
+        set_cell_locator(fil, self.inputs[0].get_output_dataset(),
+                         owner=self.scene)
         fil.update()
         self._rescale_scalars_changed(self.rescale_scalars)
         self._set_outputs([fil])
@@ -549,6 +549,22 @@ warp_vector_filter = FilterMetadata(
                                attributes=['any'])
 )
 
+vertex_clustering_filter = FilterMetadata(
+    id            = "VertexClusteringFilter",
+    menu_name          = "Vertex Clustering",
+    class_name = BASE + '.vertex_clustering.VertexClustering',
+    tooltip = "Quickly simplifies a large mesh to a number of triangles",
+    desc = "Quickly simplifies a large mesh to a number of triangles",
+    help = "Quickly simplifies a large mesh to a number of triangles "\
+           "by clustering its points in a background thread",
+    input_info = PipelineInfo(datasets=['poly_data'],
+                              attribute_types=['any'],
+                              attributes=['any']),
+    output_info = PipelineInfo(datasets=['poly_data'],
+                               attribute_types=['any'],
+                               attributes=['any'])
+)
+
 # Now collect all the filters for the mayavi registry.
 filters = [cell_derivatives_filter,
            cell_to_point_data_filter,
@@ -581,6 +597,7 @@ filters = [cell_derivatives_filter,
            triangle_filter,
            tube_filter,
            user_defined_filter,
+           vertex_clustering_filter,
            vorticity_filter,
            warp_scalar_filter,
            warp_vector_filter,
@@ -11,14 +11,15 @@ import numpy as np
 
 # Enthought library imports.
 from traits.api import Instance, Range, Float, Bool, \
-                                 Property, Enum
+                                 Property, Enum, Any
 from traitsui.api import View, Group, Item
 from tvtk.api import tvtk
 
 # Local imports
 from mayavi.core.filter import Filter
 from mayavi.core.pipeline_info import PipelineInfo
-from mayavi.core.utils import DataSetHelper
+from mayavi.core.threshold_index import IndexedThreshold
+from mayavi.core.utils import DataSetHelper, get_new_output
 
 
 ######################################################################
@@ -67,6 +68,13 @@ class Threshold(Filter):
                             'automatically reset when upstream '
                             'data changes')
 
+    # Find the cells in the threshold range with an index of the
+    # scalars, built once for every new input, instead of testing all
+    # the cells each time the thresholds change.  Only used when the
+    # cells are filtered.
+    indexed = Bool(True, desc='if the cells in the threshold range are '
+                   'found with a sorted index of the scalars')
+
     input_info = PipelineInfo(datasets=['any'],
                               attribute_types=['any'],
                               attributes=['any'])
@@ -81,7 +89,9 @@ class Threshold(Filter):
                             Item(name='lower_threshold'),
                             Item(name='auto_reset_lower'),
                             Item(name='upper_threshold'),
-                            Item(name='auto_reset_upper')),
+                            Item(name='auto_reset_upper'),
+                            Item(name='indexed',
+                                 visible_when='object.filter_type == "cells"')),
                       Item(name='_'),
                       Group(Item(name='threshold_filter',
                                  show_label=False,
@@ -108,13 +118,21 @@ class Threshold(Filter):
     # Internal data to
     _first = Bool(True)
 
+    # The `IndexedThreshold` used for the cells, created when needed.
+    _indexed_threshold = Any
+
+    # The key of the input scalars and their range last computed.
+    _range_key = Any
+    _data_range = Any
+
     ######################################################################
     # `object` interface.
     ######################################################################
     def __get_pure_state__(self):
         d = super(Threshold, self).__get_pure_state__()
         # These traits are dynamically created.
-        for name in ('_first', '_data_min', '_data_max'):
+        for name in ('_first', '_data_min', '_data_max',
+                     '_indexed_threshold', '_range_key', '_data_range'):
             d.pop(name, None)
 
         return d
@@ -143,7 +161,7 @@ class Threshold(Filter):
         fil = self.threshold_filter
         self.configure_connection(fil, self.inputs[0])
         self._update_ranges()
-        self._set_outputs([self.threshold_filter])
+        self._update_outputs()
 
     def update_data(self):
         """Override this method to do what is necessary when upstream
@@ -166,13 +184,13 @@ class Threshold(Filter):
     def _lower_threshold_changed(self, new_value):
         fil = self.threshold_filter
         fil.threshold_between(new_value, self.upper_threshold)
-        fil.update()
+        self._get_output_filter().update()
         self.data_changed = True
 
     def _upper_threshold_changed(self, new_value):
         fil = self.threshold_filter
         fil.threshold_between(self.lower_threshold, new_value)
-        fil.update()
+        self._get_output_filter().update()
         self.data_changed = True
 
     def _update_ranges(self):
@@ -223,16 +241,36 @@ class Threshold(Filter):
 
     def _get_data_range(self):
         """Returns the range of the input scalar data."""
-        dsh = DataSetHelper(self.inputs[0].outputs[0])
+        input = self.inputs[0].outputs[0]
+        # Only scan the scalars when they are new or modified.
+        key = self._get_range_key(input)
+        if key is not None and key == self._range_key:
+            return list(self._data_range)
+
+        dsh = DataSetHelper(input)
         name, rng = dsh.get_range('scalars', 'point')
-        if name is not None:
-            return rng
-        else:
+        if name is None:
             name, rng = dsh.get_range('scalars', 'cell')
             if name is None:
-                return []
-            else:
-                return rng
+                rng = []
+        self._range_key = self._get_range_key(input)
+        self._data_range = list(rng)
+        return rng
+
+    def _get_range_key(self, input):
+        """Returns a key that changes with the input scalars, None if
+        the range cannot be cached.  The dataset is modified when its
+        arrays are edited in place."""
+        data = get_new_output(input)
+        if data is None or not data.is_a('vtkDataSet'):
+            return None
+        data = tvtk.to_vtk(data)
+        for mode, attr in (('point', data.GetPointData()),
+                           ('cell', data.GetCellData())):
+            scalars = attr.GetScalars()
+            if scalars is not None:
+                return (mode, scalars.GetName(), data.GetMTime())
+        return ('none', data.GetMTime())
 
     def _auto_reset_lower_changed(self, value):
         if len(self.inputs) == 0:
@@ -272,9 +310,43 @@ class Threshold(Filter):
         self.configure_connection(fil, self.inputs[0].outputs[0])
         fil.threshold_between(self.lower_threshold,
                               self.upper_threshold)
-        fil.update()
-        self._set_outputs([fil])
+        self._update_outputs()
 
     def _threshold_filter_edited(self):
-        self.threshold_filter.update()
+        fil = self._get_output_filter()
+        if fil is not self.threshold_filter:
+            # The settings are only read when the filter executes.
+            fil.modified()
+        fil.update()
         self.data_changed = True
+
+    def _indexed_changed(self):
+        if len(self.inputs) == 0:
+            return
+        self._update_outputs()
+
+    def _update_outputs(self):
+        fil = self._get_output_filter()
+        fil.update()
+        self._set_outputs([fil])
+
+    def _get_output_filter(self):
+        """Returns the filter producing the output, the indexed threshold
+        when it can be used."""
+        fil = self.threshold_filter
+        if not self.indexed or self.filter_type != 'cells' or \
+                len(self.inputs) == 0:
+            return fil
+        input = self.inputs[0].get_output_dataset()
+        if input is None or not input.is_a('vtkDataSet'):
+            # Composite datasets are left to vtkThreshold.
+            return fil
+        indexed = self._indexed_threshold
+        if indexed is None:
+            indexed = tvtk.to_tvtk(IndexedThreshold())
+            tvtk.to_vtk(indexed).settings = tvtk.to_vtk(self._threshold)
+            self._indexed_threshold = indexed
+        self.configure_connection(indexed, self.inputs[0])
+        tvtk.to_vtk(indexed).set_range(self.lower_threshold,
+                                       self.upper_threshold)
+        return indexed
@@ -0,0 +1,171 @@
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+# Enthought library imports.
+from traits.api import Instance, Int, Bool, Tuple, Any
+from traitsui.api import View, Group, Item
+from tvtk.api import tvtk
+
+# Local imports
+from mayavi.core.filter import Filter
+from mayavi.core.pipeline_info import PipelineInfo
+from mayavi.core.lod import BackgroundWorker, cluster_polydata
+
+
+######################################################################
+# `VertexClustering` class.
+######################################################################
+class VertexClustering(Filter):
+
+    """Quickly simplifies very large meshes to about a given number of
+    triangles by clustering their points in a uniform grid (using
+    tvtk.QuadricClustering).
+
+    This is meant for previews of huge surfaces: it is much faster and
+    uses much less memory than the DecimatePro and QuadricDecimation
+    filters but the point data of the input is not kept.  When a GUI
+    event loop is running the simplification runs in a background
+    thread by default and the output is replaced when it is done, the
+    output is empty until the first result is ready.
+    """
+
+    # The version of this class.  Used for persistence.
+    __version__ = 0
+
+    # The number of triangles to aim for.
+    target_triangles = Int(200000, enter_set=True, auto_set=False,
+                           desc='the approximate number of triangles of '
+                           'the output')
+
+    # Simplify in a background thread.  The results are delivered by
+    # the GUI event loop so this defaults to whether one is running.
+    background = Bool(desc='if the mesh is simplified in a '
+                      'background thread')
+
+    # The number of divisions of the clustering grid used for the
+    # current output, (0, 0, 0) if the input was passed unchanged.
+    number_of_divisions = Tuple(Int, Int, Int)
+
+    # The number of triangles of the current output.
+    number_of_triangles = Int
+
+    # True while the mesh is being simplified in the background.
+    busy = Bool(False)
+
+    input_info = PipelineInfo(datasets=['poly_data'],
+                              attribute_types=['any'],
+                              attributes=['any'])
+
+    output_info = PipelineInfo(datasets=['poly_data'],
+                               attribute_types=['any'],
+                               attributes=['any'])
+
+    ########################################
+    # Private traits.
+
+    # The output of the filter, the results are copied into it.
+    _output = Instance(tvtk.PolyData, args=())
+
+    # The worker running the simplification.
+    _worker = Any
+
+    ########################################
+    # View related traits.
+
+    view = View(Group(Item(name='target_triangles'),
+                      Item(name='background'),
+                      Item(name='number_of_divisions', style='readonly'),
+                      Item(name='number_of_triangles', style='readonly'),
+                      Item(name='busy', style='readonly'),
+                      ),
+                resizable=True)
+
+    ######################################################################
+    # `object` interface.
+    ######################################################################
+    def __get_pure_state__(self):
+        d = super(VertexClustering, self).__get_pure_state__()
+        for name in ('_output', '_worker', 'number_of_divisions',
+                     'number_of_triangles', 'busy'):
+            d.pop(name, None)
+        return d
+
+    ######################################################################
+    # `Filter` interface.
+    ######################################################################
+    def setup_pipeline(self):
+        """Creates the pipeline."""
+        self._worker = BackgroundWorker(callback=self._on_result_ready)
+
+    def update_pipeline(self):
+        """Connect and update the pipeline."""
+        if len(self.inputs) == 0:
+            return
+        self._set_outputs([self._output])
+        self._simplify()
+
+    def update_data(self):
+        """Simplifies the new input, the `data_changed` event is fired
+        once the output is updated.
+        """
+        if len(self.inputs) == 0:
+            return
+        self._simplify()
+
+    def stop(self):
+        """Invoked when this object is removed from the mayavi
+        pipeline.
+        """
+        self._worker.cancel()
+        self.busy = False
+        super(VertexClustering, self).stop()
+
+    ######################################################################
+    # Non-public interface.
+    ######################################################################
+    def _simplify(self):
+        input = self.inputs[0].get_output_dataset()
+        # The worker thread uses a copy of the data, the sources may edit
+        # the arrays of their data in place.
+        data = tvtk.to_vtk(input).NewInstance()
+        data.DeepCopy(tvtk.to_vtk(input))
+        if self.background:
+            self.busy = True
+            self._worker.submit(cluster_polydata, data,
+                                self.target_triangles)
+        else:
+            self._worker.cancel()
+            self.busy = False
+            self._install_result(cluster_polydata(data,
+                                                  self.target_triangles))
+
+    def _on_result_ready(self):
+        # Called in the worker thread.
+        from pyface.api import GUI
+        GUI.invoke_later(self._install_pending_result)
+
+    def _install_pending_result(self):
+        result = self._worker.get_result()
+        if result is None or not self.running:
+            return
+        self.busy = False
+        self._install_result(result)
+
+    def _install_result(self, result):
+        data, divisions = result
+        tvtk.to_vtk(self._output).ShallowCopy(data)
+        self.trait_set(number_of_divisions=divisions,
+                       number_of_triangles=data.GetNumberOfCells())
+        self.data_changed = True
+        self.render()
+
+    def _background_default(self):
+        # `is_ui_running` is also True off screen where the results would
+        # never be delivered.
+        from mayavi.tools.engine_manager import options
+        from mayavi.tools.show import is_ui_running
+        return is_ui_running() and not options.offscreen
+
+    def _target_triangles_changed(self):
+        if self.running and len(self.inputs) > 0:
+            self._simplify()
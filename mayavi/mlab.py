@@ -20,6 +20,7 @@ from mayavi.tools.engine_manager import get_engine, show_pipeline, \
         options, set_engine
 from mayavi.tools.show import show
 from mayavi.tools.animator import animate
+from mayavi.tools.batch import render_batch
 
 
 def show_engine():
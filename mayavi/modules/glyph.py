@@ -87,7 +87,8 @@ class Glyph(Module):
 
         self.glyph.inputs = [mm.source]
 
-        # Set the LUT for the mapper.
+        # Set the mapper and its LUT.
+        self.glyph.update_actor_mapper(self.actor)
         self._color_mode_changed(self.glyph.color_mode)
 
         self.pipeline_changed = True
@@ -118,19 +119,29 @@ class Glyph(Module):
             actor.set_lut(lut_mgr.lut)
         elif value == 'color_by_vector':
             lut_mgr = self.module_manager.vector_lut_manager
-            actor.set_lut(lut_mgr.lut)
+            actor.set_lut(self.glyph.get_lookup_table(lut_mgr.lut))
         else:
             actor.mapper.scalar_visibility = 0
 
         self.render()
 
+    def _instanced_changed(self):
+        # This is a listener for the glyph component's instanced trait.
+        if self.module_manager is None:
+            return
+        self.glyph.update_instancing(self.actor)
+        self._color_mode_changed(self.glyph.color_mode)
+
     def _glyph_changed(self, old, new):
         # Hookup a callback to set the lut appropriately.
         if old is not None:
             old.on_trait_change(self._color_mode_changed,
                                 'color_mode',
                                 remove=True)
+            old.on_trait_change(self._instanced_changed, 'instanced',
+                                remove=True)
         new.on_trait_change(self._color_mode_changed, 'color_mode')
+        new.on_trait_change(self._instanced_changed, 'instanced')
 
         # Set the glyph's module attribute -- this is important!
         new.module = self
@@ -13,9 +13,10 @@ from math import sqrt
 
 # Enthought library imports.
 from traits.api import Instance, Bool, TraitPrefixList, Trait, \
-                             Delegate, Button
+                             Delegate, Button, Int, Range, Any, List
 from traitsui.api import View, Group, Item, InstanceEditor
 from tvtk.api import tvtk
+from tvtk.common import is_old_pipeline
 
 # Local imports
 from mayavi.core.module import Module
@@ -23,6 +24,8 @@ from mayavi.core.pipeline_info import PipelineInfo
 from mayavi.components.actor import Actor
 from mayavi.components.source_widget import SourceWidget
 from mayavi.core.utils import DataSetHelper
+from mayavi.core.parallel_tracer import ParallelStreamTracer
+
 
 ######################################################################
 # `Streamline` class.
@@ -64,6 +67,38 @@ class Streamline(Module):
     # The actor component that represents the visualization.
     actor = Instance(Actor, allow_none=False, record=True)
 
+    # Integrate the streamlines in batches of seeds with a pool of
+    # threads instead of with `stream_tracer`, whose settings are still
+    # used.  The streamlines are integrated again when the seeds or the
+    # data change.  In scripts without a GUI event loop fire
+    # `update_streamlines` after moving the seeds.  The threads only
+    # use several cores if VTK was built with
+    # VTK_PYTHON_FULL_THREADSAFE, which releases the GIL in VTK calls.
+    parallel = Bool(False, desc='if the streamlines are integrated in '
+                    'batches of seeds by a pool of threads (on several '
+                    'cores with a VTK built with '
+                    'VTK_PYTHON_FULL_THREADSAFE)')
+
+    # The number of seeds integrated together in parallel mode.
+    seed_batch_size = Range(1, 1000000, 500, enter_set=True,
+                            auto_set=False,
+                            desc='the number of seeds integrated '
+                            'together in parallel mode')
+
+    # The number of threads used in parallel mode, one per CPU if zero.
+    number_of_threads = Int(0, desc='the number of threads used in '
+                            'parallel mode')
+
+    # In parallel mode, integrate without blocking the UI, the
+    # streamlines appear as the batches are done.  The results are
+    # delivered by the GUI event loop so this defaults to whether one is
+    # running.
+    background = Bool(desc='if the streamlines are integrated '
+                      'without blocking in parallel mode')
+
+    # True while streamlines are being integrated in the background.
+    busy = Bool(False)
+
     input_info = PipelineInfo(datasets=['any'],
                               attribute_types=['any'],
                               attributes=['vectors'])
@@ -73,6 +108,20 @@ class Streamline(Module):
 
     _first = Bool(True)
 
+    # The tracer, the filter collecting its results and the raw
+    # vtkPolyData of the results in parallel mode.
+    _tracer = Any
+    _lines = Instance(tvtk.AppendPolyData, args=())
+    _pieces = List
+
+    # True if the current lines are dropped when the next result
+    # arrives and if a new integration is scheduled.
+    _stale_lines = Bool(False)
+    _trace_scheduled = Bool(False)
+
+    # The observer of the seeds in parallel mode.
+    _seed_observer = Any
+
     ########################################
     # View related code.
 
@@ -112,6 +161,15 @@ class Streamline(Module):
                             ),
                       label='Streamline'
                       ),
+                Group(Item(name='parallel'),
+                      Item(name='background', enabled_when='parallel'),
+                      Item(name='seed_batch_size', enabled_when='parallel'),
+                      Item(name='number_of_threads',
+                           enabled_when='parallel'),
+                      Item(name='busy', style='readonly',
+                           visible_when='parallel'),
+                      label='Parallel',
+                      ),
                 Group(Item(name='seed', style='custom', resizable=True),
                       label='Seed',
                       show_labels=False),
@@ -124,6 +182,16 @@ class Streamline(Module):
                 resizable=True
                 )
 
+    ######################################################################
+    # `object` interface
+    ######################################################################
+    def __get_pure_state__(self):
+        d = super(Streamline, self).__get_pure_state__()
+        for name in ('_tracer', '_lines', '_pieces', '_stale_lines',
+                     '_trace_scheduled', '_seed_observer', 'busy'):
+            d.pop(name, None)
+        return d
+
     ######################################################################
     # `Module` interface
     ######################################################################
@@ -180,6 +248,7 @@ class Streamline(Module):
             self.tube_filter.radius = length*0.0075
             self._first = False
 
+        self._setup_parallel()
         self._streamline_type_changed(self.streamline_type)
         # Set the LUT for the mapper.
         self.actor.set_lut(mm.scalar_lut_manager.lut)
@@ -195,15 +264,27 @@ class Streamline(Module):
         """
         # Just set data_changed, the components should do the rest if
         # they are connected.
+        if self.parallel:
+            self._trace()
         self.data_changed = True
 
+    def stop(self):
+        """Invoked when this object is removed from the mayavi
+        pipeline.
+        """
+        self._shutdown_tracer()
+        super(Streamline, self).stop()
+
     ######################################################################
     # Non-public methods.
     ######################################################################
     def _streamline_type_changed(self, value):
         if self.module_manager is None:
             return
-        st = self.stream_tracer
+        if self.parallel:
+            st = self._lines
+        else:
+            st = self.stream_tracer
         rf = self.ribbon_filter
         tf = self.tube_filter
         if value == 'line':
@@ -222,16 +303,134 @@ class Streamline(Module):
 
     def _update_streamlines_fired(self):
         self.seed.update_poly_data()
-        self.stream_tracer.update()
+        if self.parallel:
+            self._trace()
+        else:
+            self.stream_tracer.update()
+        self.render()
+
+    def _setup_parallel(self):
+        """Observes the seeds and integrates the streamlines in parallel
+        mode, stops the threads otherwise.
+        """
+        seeds = tvtk.to_vtk(self.seed.poly_data)
+        if self._seed_observer is not None:
+            self._seed_observer[0].RemoveObserver(self._seed_observer[1])
+            self._seed_observer = None
+        if not self.parallel:
+            self._shutdown_tracer()
+            return
+        if len(self._pieces) == 0:
+            # No streamlines until the first batch is done.
+            self._set_lines([])
+        self._seed_observer = (
+            seeds, seeds.AddObserver('ModifiedEvent', self._schedule_trace)
+        )
+        self._trace()
+
+    def _trace(self):
+        """Integrates the streamlines in parallel mode."""
+        self._trace_scheduled = False
+        mm = self.module_manager
+        if mm is None or not self.parallel:
+            return
+        tracer = self._tracer
+        if tracer is None:
+            tracer = self._tracer = ParallelStreamTracer(
+                self.number_of_threads, callback=self._on_result_ready
+            )
+        tracer.batch_size = self.seed_batch_size
+        data = tvtk.to_vtk(mm.source.get_output_dataset())
+        seeds = tvtk.to_vtk(self.seed.poly_data)
+        settings = tvtk.to_vtk(self.stream_tracer)
+        if self.background:
+            self.busy = True
+            self._stale_lines = True
+            tracer.submit(data, seeds, settings)
+        else:
+            tracer.cancel()
+            self.busy = False
+            self._set_lines([tracer.trace(data, seeds, settings)])
+
+    def _schedule_trace(self, *args):
+        # Called when the seeds or the settings change, several changes
+        # in a row are integrated once.
+        if self._trace_scheduled or not self.parallel:
+            return
+        self._trace_scheduled = True
+        from pyface.api import GUI
+        GUI.invoke_later(self._trace)
+
+    def _on_result_ready(self):
+        # Called in a worker thread.
+        from pyface.api import GUI
+        GUI.invoke_later(self._install_results)
+
+    def _install_results(self):
+        tracer = self._tracer
+        if tracer is None or not self.running:
+            return
+        results, done = tracer.get_results()
+        self.busy = not done
+        if len(results) > 0:
+            if self._stale_lines:
+                self._stale_lines = False
+                self._set_lines(results)
+            else:
+                self._set_lines(self._pieces + results)
+
+    def _set_lines(self, pieces):
+        self._pieces = pieces
+        append = self._lines
+        append.remove_all_inputs()
+        # An empty input avoids errors when there are no streamlines.
+        for piece in [tvtk.to_tvtk(x) for x in pieces] or [tvtk.PolyData()]:
+            if is_old_pipeline():
+                append.add_input(piece)
+            else:
+                append.add_input_data(piece)
+        append.update()
+        self.data_changed = True
         self.render()
 
+    def _shutdown_tracer(self):
+        if self._tracer is not None:
+            self._tracer.shutdown()
+            self._tracer = None
+        self.busy = False
+
+    def _background_default(self):
+        # `is_ui_running` is also True off screen where the results would
+        # never be delivered.
+        from mayavi.tools.engine_manager import options
+        from mayavi.tools.show import is_ui_running
+        return is_ui_running() and not options.offscreen
+
+    def _parallel_changed(self):
+        if self.module_manager is None:
+            return
+        self._setup_parallel()
+        self._streamline_type_changed(self.streamline_type)
+
+    def _seed_batch_size_changed(self):
+        self._schedule_trace()
+
+    def _number_of_threads_changed(self):
+        # The threads are started again with the new number.
+        if self._tracer is not None:
+            self._shutdown_tracer()
+            self._trace()
+
     def _stream_tracer_changed(self, old, new):
         if old is not None:
             old.on_trait_change(self.render, remove=True)
+            old.on_trait_change(self._schedule_trace, remove=True)
         seed = self.seed
         if seed is not None:
             self.configure_source_data(new, seed.poly_data)
         new.on_trait_change(self.render)
+        # The settings are also used in parallel mode.
+        new.on_trait_change(self._schedule_trace)
         mm = self.module_manager
         if mm is not None:
             src = mm.source
@@ -102,7 +102,8 @@ class VectorCutPlane(Module):
 
         self.implicit_plane.inputs = [mm.source]
 
-        # Set the LUT for the mapper.
+        # Set the mapper and its LUT.
+        self.glyph.update_actor_mapper(self.actor)
         self._color_mode_changed(self.glyph.color_mode)
 
         self.pipeline_changed = True
@@ -131,12 +132,19 @@ class VectorCutPlane(Module):
             actor.set_lut(lut_mgr.lut)
         elif value == 'color_by_vector':
             lut_mgr = self.module_manager.vector_lut_manager
-            actor.set_lut(lut_mgr.lut)
+            actor.set_lut(self.glyph.get_lookup_table(lut_mgr.lut))
         else:
             actor.mapper.scalar_visibility = 0
 
         self.render()
 
+    def _instanced_changed(self):
+        # This is a listener for the glyph component's instanced trait.
+        if self.module_manager is None:
+            return
+        self.glyph.update_instancing(self.actor)
+        self._color_mode_changed(self.glyph.color_mode)
+
     def _implicit_plane_changed(self, old, new):
         cutter = self.cutter
         if cutter is not None:
@@ -159,12 +167,15 @@ class VectorCutPlane(Module):
             old.on_trait_change(self._color_mode_changed,
                                 'color_mode',
                                 remove=True)
+            old.on_trait_change(self._instanced_changed, 'instanced',
+                                remove=True)
         new.module = self
         cutter = self.cutter
         if cutter:
             new.inputs = [cutter]
         new.on_trait_change(self._color_mode_changed,
                             'color_mode')
+        new.on_trait_change(self._instanced_changed, 'instanced')
         self._change_components(old, new)
 
     def _actor_changed(self, old, new):
@@ -4,18 +4,23 @@ UnstructuredGrid data.  It also supports the FixedPointRenderer for
 ImageData.  However, the performance is slow so your best bet is
 probably with the ImageData based renderers.
 
+Large ImageData volumes are rendered from a downsampled copy while the
+scene is being interacted with, the full resolution volume is rendered
+again when the interaction stops.
+
 """
 # Author: Prabhu Ramachandran <prabhu@aero.iitb.ac.in>
 # Copyright (c) 2006-2018, Enthought, Inc.
 # License: BSD Style.
 
 # Standard imports
+import time
 from math import cos, sqrt, pi
 from vtk.util import vtkConstants
 
 # Enthought library imports.
 from traits.api import Instance, Property, List, ReadOnly, \
-     Str, Button, Tuple, Dict
+     Str, Button, Tuple, Dict, Bool, Int, Float, Any
 from traitsui.api import View, Group, Item, InstanceEditor
 from tvtk.api import tvtk
 from tvtk.common import suppress_vtk_warnings
@@ -211,6 +216,22 @@ class Volume(Module):
     lut_manager = Instance(VolumeLUTManager, args=(), allow_none=False,
                            record=True)
 
+    # Render a downsampled copy of large ImageData while the scene is
+    # being interacted with.
+    interactive_downsample = Bool(True, desc='if a downsampled copy of '
+                                  'large volumes is rendered during '
+                                  'interaction')
+
+    # The largest number of voxels rendered during interaction.
+    interactive_max_voxels = Int(128**3, desc='the largest number of '
+                                 'voxels rendered during interaction')
+
+    # The time taken by the last render of the scene, in seconds.
+    render_time = Float(0.0)
+
+    # True while the downsampled copy is rendered.
+    downsampled = Bool(False)
+
     input_info = PipelineInfo(datasets=['image_data',
                                         'unstructured_grid'],
                               attribute_types=['any'],
@@ -233,6 +254,10 @@ class Volume(Module):
                                  resizable=True),
                             show_labels=False
                             ),
+                      Item(name='interactive_downsample'),
+                      Item(name='interactive_max_voxels',
+                           enabled_when='interactive_downsample'),
+                      Item(name='render_time', style='readonly'),
                       Item(name='ray_cast_function_type'),
                       Group(Item(name='_ray_cast_function',
                                  enabled_when='len(_ray_cast_functions) > 0',
@@ -279,13 +304,23 @@ class Volume(Module):
     # A cache for the mappers, a dict keyed by class.
     _mapper_cache = Dict
 
+    # Downsamples the input during interaction.
+    _resample = Instance(tvtk.ImageResample, args=(),
+                         kw={'interpolation_mode': 'linear'})
+
+    # The observers of the scene's renderer and the time the current
+    # render started.
+    _observers = Any
+    _render_start = Float(0.0)
+
     ######################################################################
     # `object` interface
     ######################################################################
     def __get_pure_state__(self):
         d = super(Volume, self).__get_pure_state__()
         d['ctf_state'] = save_ctfs(self._volume_property)
-        for name in ('current_range', '_ctf', '_otf'):
+        for name in ('current_range', '_ctf', '_otf', 'render_time',
+                     'downsampled'):
             d.pop(name, None)
         return d
 
@@ -304,8 +339,11 @@ class Volume(Module):
     def start(self):
         super(Volume, self).start()
         self.lut_manager.start()
+        self._add_observers()
 
     def stop(self):
+        self._remove_observers()
+        self._end_interaction()
         super(Volume, self).stop()
         self.lut_manager.stop()
 
@@ -395,6 +433,8 @@ class Volume(Module):
     # Non-public methods.
     ######################################################################
     def _get_image_data_volume_mappers(self):
+        # The SmartVolumeMapper uses the GPU when there is one and falls
+        # back to fixed point ray casting otherwise.
         check = ('SmartVolumeMapper', 'GPUVolumeRayCastMapper',
                  'OpenGLGPUVolumeRayCastMapper')
         return [x for x in check
@@ -435,9 +475,11 @@ class Volume(Module):
                     error('Available volume mappers only work with '
                           'unsigned_char or unsigned_short datatypes')
             else:
+                # The texture and ray cast mappers were removed from VTK
+                # 7, they are only offered by older versions.
                 check = ['FixedPointVolumeRayCastMapper',
-                         'VolumeProMapper', 'TextureMapper2D', 'RayCastMapper',
-                         'TextureMapper3D'
+                         'VolumeProMapper', 'TextureMapper3D',
+                         'TextureMapper2D', 'RayCastMapper'
                          ]
                 for mapper in check:
                     if mapper in self._available_mapper_types:
@@ -549,11 +591,98 @@ class Volume(Module):
             self._volume_mapper = new_vm
             self._ray_cast_functions = ['']
 
+        # Let the mappers trade quality for speed to keep up with the
+        # interactor's desired update rate.
+        for name in ('auto_adjust_sample_distances',
+                     'interactive_adjust_sample_distances'):
+            if hasattr(new_vm, name):
+                setattr(new_vm, name, True)
+
+        self.downsampled = False
         src = mm.source
         self.configure_input(new_vm, src.outputs[0])
         self.volume.mapper = new_vm
         new_vm.on_trait_change(self.render)
 
+    def _get_downsample_factor(self):
+        """Returns the factor by which the input is to be downsampled
+        along each axis during interaction, 1.0 for no downsampling.
+        """
+        mm = self.module_manager
+        if not self.interactive_downsample or mm is None:
+            return 1.0
+        dataset = mm.source.get_output_dataset()
+        if not dataset.is_a('vtkImageData'):
+            return 1.0
+        n_voxels = float(dataset.number_of_points)
+        if n_voxels <= self.interactive_max_voxels:
+            return 1.0
+        n_dims = len([x for x in dataset.dimensions if x > 1])
+        return (self.interactive_max_voxels/n_voxels)**(1.0/n_dims)
+
+    def _start_interaction(self):
+        factor = self._get_downsample_factor()
+        vm = self._volume_mapper
+        if factor >= 1.0 or vm is None or self.downsampled:
+            return
+        resample = self._resample
+        dataset = self.module_manager.source.get_output_dataset()
+        for axis, dim in enumerate(dataset.dimensions):
+            resample.set_axis_magnification_factor(
+                axis, factor if dim > 1 else 1.0
+            )
+        self.configure_input(resample, self.module_manager.source.outputs[0])
+        # The resampled data is cached by the pipeline until the input
+        # changes.
+        self.configure_input(vm, resample)
+        self.downsampled = True
+
+    def _end_interaction(self):
+        if not self.downsampled:
+            return
+        self.downsampled = False
+        mm = self.module_manager
+        if mm is not None and self._volume_mapper is not None:
+            self.configure_input(self._volume_mapper, mm.source.outputs[0])
+
+    def _on_render_start(self, renderer, event):
+        # The interactor styles raise the render window's desired update
+        # rate above the still update rate while the user interacts and
+        # render once more at the still rate when the interaction stops.
+        render_window = renderer.GetRenderWindow()
+        interactor = render_window.GetInteractor()
+        if interactor is not None and render_window.GetDesiredUpdateRate() > \
+                interactor.GetStillUpdateRate():
+            self._start_interaction()
+        else:
+            self._end_interaction()
+        self._render_start = time.time()
+
+    def _on_render_end(self, *args):
+        self.render_time = time.time() - self._render_start
+
+    def _add_observers(self):
+        scene = self.scene
+        if self._observers is not None or scene is None:
+            return
+        observers = []
+        renderer = getattr(scene, 'renderer', None)
+        if renderer is not None:
+            renderer = tvtk.to_vtk(renderer)
+            observers.extend([
+                (renderer, renderer.AddObserver('StartEvent',
+                                                self._on_render_start)),
+                (renderer, renderer.AddObserver('EndEvent',
+                                                self._on_render_end)),
+            ])
+        self._observers = observers
+
+    def _remove_observers(self):
+        if self._observers is not None:
+            for obj, id in self._observers:
+                obj.RemoveObserver(id)
+            self._observers = None
+
     def _update_ctf_fired(self):
         set_lut(self.lut_manager.lut, self._volume_property)
         self.render()
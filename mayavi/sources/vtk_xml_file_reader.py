@@ -8,12 +8,16 @@
 from os.path import basename
 
 # Enthought library imports.
-from traits.api import Instance, List, Str, Bool, Button
+from traits.api import Any, Instance, List, Str, Bool, Button
 from traitsui.api import View, Group, Item, Include
 from tvtk.api import tvtk
+from tvtk import vtk_module as vtk
 
 # Local imports.
 from mayavi.core.common import error
+# The attribute helpers are imported here for backwards compatibility.
+from mayavi.core.dataset_manager import (get_array_type,
+        get_attribute_list, get_all_attributes)
 from mayavi.core.file_data_source import FileDataSource
 from mayavi.core.trait_defs import DEnum
 from mayavi.core.pipeline_info import (PipelineInfo,
@@ -32,63 +36,6 @@ def find_file_data_type(file_name):
         error("File %s is not a valid VTK XML file!"%(file_name))
 
 
-def get_array_type(arr):
-    """Returns if the array is a scalar ('scalars'), vector
-    ('vectors') or tensor ('tensors').  It looks at the number of
-    components to decide.  If it has a wierd number of components it
-    returns the empty string.
-    """
-    n = arr.number_of_components
-    ret = {1: 'scalars', 3: 'vectors', 4: 'scalars', 9:'tensors'}
-    return ret.get(n) or ''
-
-
-def get_attribute_list(data):
-    """ Gets scalar, vector and tensor information from the given data
-    (either cell or point data).
-    """
-    attr = {'scalars':[], 'vectors':[], 'tensors':[]}
-    if data is not None:
-        n = data.number_of_arrays
-        for i in range(n):
-            name = data.get_array_name(i)
-            arr = data.get_array(i)
-            if arr is not None:
-                # Some VTK datasets claim they have n arrays, but
-                # actually some of these are None (eg the output of a
-                # tvtk.GraphToPolyData())
-                t = get_array_type(arr)
-                if len(t) > 0 and name is not None:
-                    attr[t].extend([name])
-
-    def _mk_first(lst, value):
-        """Makes the specified `value` the first item in `lst`."""
-        lst.remove(value)
-        lst.insert(0, value)
-
-    attr1 = attr.copy()
-    for a in attr:
-        v = getattr(data, a)
-        if v is not None:
-            name = v.name
-            if name is not None:
-                try:
-                    _mk_first(attr[a], v.name)
-                except ValueError:
-                    # Sometimes we have a multi-component scalar.
-                    attr1[a].insert(0, name)
-    return attr1
-
-
-def get_all_attributes(obj):
-    """Gets the scalar, vector and tensor attributes that are
-    available in the given VTK data object.
-    """
-    point_attr = get_attribute_list(obj.point_data)
-    cell_attr = get_attribute_list(obj.cell_data)
-    return point_attr, cell_attr
-
-
 ######################################################################
 # `VTKXMLFileReader` class
 ######################################################################
@@ -175,12 +122,16 @@ class VTKXMLFileReader(FileDataSource):
     # Toggles if this is the first time this object has been used.
     _first = Bool(True)
 
+    # The dataset of the current timestep when it is obtained from the
+    # timestep cache instead of the reader.
+    _cached_output = Any
+
     ######################################################################
     # `object` interface
     ######################################################################
     def __get_pure_state__(self):
         d = super(VTKXMLFileReader, self).__get_pure_state__()
-        for name in ('_assign_attribute', '_first'):
+        for name in ('_assign_attribute', '_first', '_cached_output'):
             d.pop(name, None)
         # Pickle the 'point_scalars_name' etc. since these are
         # properties and not in __dict__.
@@ -233,15 +184,16 @@ class VTKXMLFileReader(FileDataSource):
     def update(self):
         if len(self.file_path.get()) == 0:
             return
-        reader = self.reader
-        reader.update()
+        if self._cached_output is None:
+            self.reader.update()
         self.render()
 
     def update_data(self):
         if len(self.file_path.get()) == 0:
             return
-        self.reader.update()
-        pnt_attr, cell_attr = get_all_attributes(self.reader.output)
+        if self._cached_output is None:
+            self.reader.update()
+        pnt_attr, cell_attr = get_all_attributes(self._get_reader_output())
 
         def _setup_data_traits(obj, attributes, d_type):
             """Given the object, the dict of the attributes from the
@@ -250,7 +202,7 @@ class VTKXMLFileReader(FileDataSource):
             """
             attrs = ['scalars', 'vectors', 'tensors']
             aa = obj._assign_attribute
-            data = getattr(obj.reader.output, '%s_data'%d_type)
+            data = getattr(obj._get_reader_output(), '%s_data'%d_type)
             for attr in attrs:
                 values = attributes[attr]
                 values.append('')
@@ -280,11 +232,37 @@ class VTKXMLFileReader(FileDataSource):
 
     def get_output_object(self):
         """ Return the reader output port."""
+        if self._cached_output is not None:
+            return self._assign_attribute.output_port
         return self.reader.output_port
 
     ######################################################################
     # Non-public interface
     ######################################################################
+    def _make_timestep_loader(self):
+        if self.reader is None:
+            return None
+        klass = getattr(vtk, tvtk.to_vtk(self.reader).GetClassName())
+
+        def _load(file_name):
+            # This runs in the prefetch threads so only plain VTK is
+            # used here.
+            reader = klass()
+            reader.SetFileName(file_name)
+            reader.Update()
+            output = reader.GetOutputDataObject(0)
+            data = output.NewInstance()
+            data.ShallowCopy(output)
+            return data
+
+        return _load
+
+    def _get_reader_output(self):
+        """Returns the dataset of the current timestep."""
+        if self._cached_output is not None:
+            return self._cached_output
+        return self.reader.output
+
     def _file_path_changed(self, fpath):
         value = fpath.get()
         if len(value) == 0:
@@ -294,10 +272,16 @@ class VTKXMLFileReader(FileDataSource):
                 d_type = find_file_data_type(fpath.get())
                 self.reader = eval('tvtk.XML%sReader()'%d_type)
             reader = self.reader
-            reader.file_name = value
-            reader.update()
             aa = self._assign_attribute
-            self.configure_input(aa, self.reader)
+            data = self._read_timestep(value)
+            if data is None:
+                self._cached_output = None
+                reader.file_name = value
+                reader.update()
+                self.configure_input(aa, self.reader)
+            else:
+                self._cached_output = tvtk.to_tvtk(data)
+                self.configure_input_data(aa, self._cached_output)
             self.update_data()
             aa.update()
             outputs = [aa]
@@ -312,7 +296,7 @@ class VTKXMLFileReader(FileDataSource):
         if value is None:
             return
 
-        reader_output = self.reader.output
+        reader_output = self._get_reader_output()
         if len(value) == 0:
             # If the value is empty then we deactivate that attribute.
             d = getattr(reader_output, attr_type + '_data')
@@ -366,5 +350,10 @@ class VTKXMLFileReader(FileDataSource):
         return ret
 
     def _refresh_fired(self):
+        if self._cached_output is not None:
+            # Re-read the file instead of using the cached dataset.
+            self._timestep_cache.discard(self.file_path.get())
+            self._file_path_changed(self.file_path)
+            return
         self.reader.modified()
         self.update_data()
@@ -0,0 +1,83 @@
+"""
+Tests for the decimated levels of detail of the Actor component.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import time
+import unittest
+
+import mock
+
+from tvtk.api import tvtk
+
+from mayavi.core.null_engine import NullEngine
+from mayavi.modules.surface import Surface
+from mayavi.sources.vtk_data_source import VTKDataSource
+from mayavi.tests.test_lod import make_sphere
+
+
+def get_lod_mappers(actor):
+    mappers = tvtk.to_vtk(actor.actor).GetLODMappers()
+    return [mappers.GetItemAsObject(i)
+            for i in range(mappers.GetNumberOfItems())]
+
+
+class TestActorLOD(unittest.TestCase):
+
+    def setUp(self):
+        e = NullEngine()
+        e.start()
+        e.new_scene()
+        self.e = e
+        e.add_source(VTKDataSource(data=tvtk.to_tvtk(make_sphere())))
+        surface = Surface()
+        e.add_module(surface)
+        surface.actor.trait_set(lod_min_cells=0, enable_lod=True)
+        self.actor = surface.actor
+
+    def tearDown(self):
+        self.e.stop()
+
+    def test_lod_mappers(self):
+        actor = self.actor
+        mapper = tvtk.to_vtk(actor.mapper)
+        # The full geometry is drawn until the decimated copy is built.
+        self.assertEqual(get_lod_mappers(actor), [mapper])
+
+        mapper.Update()
+        actor._on_render_end(None, None)
+        t0 = time.time()
+        while actor._lod_mapper is None and time.time() - t0 < 30:
+            actor._on_render_start(None, None)
+            time.sleep(0.01)
+        lod_mapper = actor._lod_mapper
+        self.assertIsNotNone(lod_mapper)
+        self.assertEqual(get_lod_mappers(actor), [lod_mapper])
+        self.assertLess(lod_mapper.GetInput().GetNumberOfCells(),
+                        mapper.GetInput().GetNumberOfCells())
+
+        # A change of the data drops the decimated copy.
+        actor.update_data()
+        self.assertEqual(get_lod_mappers(actor), [mapper])
+
+    def test_decimated_data_is_copied(self):
+        actor = self.actor
+        mapper = tvtk.to_vtk(actor.mapper)
+        mapper.Update()
+        submitted = []
+        with mock.patch.object(actor._lod_builder, 'submit',
+                               submitted.append):
+            actor._on_render_end(None, None)
+        self.assertEqual(len(submitted), 1)
+        data = mapper.GetInput()
+        copy = submitted[0]
+        self.assertEqual(copy.GetNumberOfCells(), data.GetNumberOfCells())
+        # The worker thread does not share the arrays of the input.
+        self.assertIsNot(copy.GetPoints().GetData(),
+                         data.GetPoints().GetData())
+        self.assertIsNot(copy.GetPolys(), data.GetPolys())
+
+
+if __name__ == '__main__':
+    unittest.main()
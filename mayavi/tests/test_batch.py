@@ -0,0 +1,73 @@
+"""
+Tests for the batch rendering of figures in worker processes.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mayavi.tools.batch import _Worker, _submit, render_batch
+
+
+def build(arg):
+    # Defined at the module level so it can be sent to the workers.
+    from mayavi import mlab
+    if arg == 'error':
+        raise ValueError('bad input')
+    elif arg == 'crash':
+        os._exit(1)
+    mlab.test_plot3d()
+
+
+class TestRenderBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+
+    def test_images_are_returned_in_order(self):
+        results = render_batch(build, [0, 1, 2], n_processes=2,
+                               size=(64, 48))
+        self.assertEqual([r.input for r in results], [0, 1, 2])
+        for r in results:
+            self.assertTrue(r.ok, r.error)
+            self.assertEqual(r.result.shape, (48, 64, 3))
+            self.assertGreater(r.build_time, 0.0)
+
+    def test_files_are_saved(self):
+        results = render_batch(build, [0, 1], n_processes=1,
+                               directory=self.root)
+        for i, r in enumerate(results):
+            self.assertEqual(r.result,
+                             os.path.join(self.root, 'image%05d.png' % i))
+            self.assertTrue(os.path.exists(r.result))
+
+    def test_failed_jobs_do_not_stop_the_batch(self):
+        results = render_batch(build, [0, 'error', 'crash', 1],
+                               n_processes=2, size=(64, 48))
+        self.assertEqual([r.ok for r in results],
+                         [True, False, False, True])
+        self.assertIn('bad input', results[1].error)
+        self.assertIn('died', results[2].error)
+
+    def test_dead_idle_worker_is_replaced(self):
+        worker = _Worker(build, (64, 48))
+        worker.process.terminate()
+        worker.process.join()
+        workers = [worker]
+        _submit(workers, 0, (0, 0, None), build, (64, 48))
+        self.assertIsNot(workers[0], worker)
+        index, result, error = workers[0].conn.recv()[:3]
+        self.assertIsNone(error)
+        self.assertEqual(result.shape, (48, 64, 3))
+        workers[0].job = None
+        workers[0].stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
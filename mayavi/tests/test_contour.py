@@ -117,6 +117,36 @@ class TestContour(unittest.TestCase):
         #from mayavi.tools.show import show
         #show()
 
+    def test_incremental_contours(self):
+        "Test if the cached contours give the same output"
+        ctr = self.iso.contour
+        ctr.contours = [3.0, 5.0]
+        n_cells = ctr.get_output_dataset().number_of_cells
+
+        ctr.incremental = True
+        self.assertEqual(ctr.get_output_dataset().number_of_cells, n_cells)
+        piece = ctr._pieces[5.0]
+        # Adding a value only computes that contour.
+        ctr.contours.append(4.0)
+        self.assertIs(ctr._pieces[5.0], piece)
+        self.assertEqual(sorted(ctr._pieces), [3.0, 4.0, 5.0])
+        self.assertGreater(ctr.get_output_dataset().number_of_cells,
+                           n_cells)
+        # Removing it drops the cached contour.
+        ctr.contours = [3.0, 5.0]
+        self.assertIs(ctr._pieces[5.0], piece)
+        self.assertEqual(ctr.get_output_dataset().number_of_cells, n_cells)
+        # The module is connected to the merged contours.
+        self.assertGreater(self.iso.actor.mapper.input.number_of_cells, 0)
+        # Changing the settings of the contour filter computes them again.
+        ctr.contour_filter.compute_scalars = False
+        self.assertIsNot(ctr._pieces[5.0], piece)
+        self.assertIsNone(ctr.get_output_dataset().point_data.scalars)
+        ctr.contour_filter.compute_scalars = True
+
+        ctr.incremental = False
+        self.assertEqual(ctr.get_output_dataset().number_of_cells, n_cells)
+
     def test_components_changed(self):
         """Test if the modules respond correctly when the components
            are changed."""
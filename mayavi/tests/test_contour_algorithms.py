@@ -0,0 +1,103 @@
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+# Standard library imports.
+import unittest
+
+import numpy as np
+
+# Local imports.
+from mayavi.core.null_engine import NullEngine
+from mayavi.modules.iso_surface import IsoSurface
+from mayavi.sources.array_source import ArraySource
+from mayavi.sources.vtk_data_source import VTKDataSource
+from mayavi.tests import datasets
+from tvtk.api import tvtk
+
+
+def make_field(n):
+    x, y, z = np.ogrid[-5:5:n*1j, -5:5:n*1j, -5:5:n*1j]
+    return np.sin(x*y*z)/(x*y*z + 1e-9) + 0.1*x*x + 0.1*y*y
+
+
+class TestContourAlgorithms(unittest.TestCase):
+
+    def setUp(self):
+        e = NullEngine()
+        e.start()
+        e.new_scene()
+        self.e = e
+
+    def tearDown(self):
+        self.e.stop()
+
+    def add_iso(self, data, **traits):
+        self.e.add_source(ArraySource(scalar_data=data))
+        iso = IsoSurface()
+        iso.contour.trait_set(**traits)
+        self.e.add_module(iso)
+        iso.contour.contours = [0.5, 1.0, 2.0]
+        return iso
+
+    def test_auto_algorithm(self):
+        iso = self.add_iso(make_field(32))
+        if hasattr(tvtk, 'FlyingEdges3D'):
+            self.assertEqual(iso.contour.algorithm_used, 'flying_edges')
+        else:
+            self.assertEqual(iso.contour.algorithm_used, 'generic')
+        self.assertGreater(iso.actor.mapper.input.number_of_cells, 0)
+
+    def test_override(self):
+        iso = self.add_iso(make_field(32))
+        n_cells = iso.contour.get_output_dataset().number_of_cells
+        iso.contour.algorithm = 'generic'
+        self.assertEqual(iso.contour.algorithm_used, 'generic')
+        self.assertTrue(iso.contour.contour_filter.is_a('vtkContourFilter'))
+        self.assertEqual(iso.contour.contour_filter.number_of_contours, 3)
+        self.assertEqual(iso.contour.get_output_dataset().number_of_cells,
+                         n_cells)
+
+    def test_unsupported_algorithm_falls_back(self):
+        src = VTKDataSource(data=datasets.generateStructuredGrid())
+        self.e.add_source(src)
+        iso = IsoSurface()
+        iso.contour.algorithm = 'flying_edges'
+        self.e.add_module(iso)
+        self.assertEqual(iso.contour.algorithm_used, 'generic')
+
+    def test_other_point_arrays_are_kept(self):
+        data = make_field(32)
+        img = tvtk.ImageData(dimensions=data.shape)
+        img.point_data.scalars = data.T.ravel()
+        img.point_data.scalars.name = 'scalars'
+        other = img.point_data.add_array(2*data.T.ravel())
+        img.point_data.get_array(other).name = 'other'
+        self.e.add_source(VTKDataSource(data=img))
+        iso = IsoSurface()
+        self.e.add_module(iso)
+        iso.contour.contours = [0.5]
+        for algorithm in ('generic', 'auto'):
+            iso.contour.algorithm = algorithm
+            output = iso.contour.get_output_dataset()
+            self.assertGreater(output.number_of_points, 0)
+            self.assertIsNotNone(output.point_data.get_array('other'))
+            self.assertIsNotNone(output.point_data.get_array('scalars'))
+
+    @unittest.skipUnless(hasattr(tvtk, 'FlyingEdges3D'),
+                         'Flying edges is not available.')
+    def test_same_cells(self):
+        # integrationtests/mayavi/bench_contour.py times the algorithms.
+        iso = self.add_iso(make_field(48), algorithm='generic')
+        contour = iso.contour
+        cells = {}
+        for algorithm in ('generic', 'flying_edges'):
+            contour.algorithm = algorithm
+            cf = contour.contour_filter
+            cf.modified()
+            cf.update()
+            cells[algorithm] = cf.output.number_of_cells
+        self.assertEqual(cells['generic'], cells['flying_edges'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,7 +9,8 @@ import unittest
 import numpy as N
 
 from tvtk.api import tvtk
-from mayavi.core.dataset_manager import DatasetManager
+from mayavi.core.dataset_manager import (DatasetManager,
+    get_attribute_inventory, get_all_attributes)
 
 
 def make_data():
@@ -217,5 +218,49 @@ class TestDataSetManager(unittest.TestCase):
         self.assertEqual(data.cell_data.scalars.name, 't')
 
 
+
+class TestAttributeInventory(unittest.TestCase):
+    def setUp(self):
+        self.data = make_data()
+
+    def test_inventory_lists_arrays_without_wrapping(self):
+        # When
+        inv = get_attribute_inventory(self.data.point_data)
+
+        # Then
+        self.assertEqual(sorted(inv['arrays']),
+                         [('p', 'scalars', 1), ('t', 'scalars', 1),
+                          ('ten', 'tensors', 9), ('v', 'vectors', 3)])
+        self.assertEqual(inv['active'],
+                         {'scalars': 't', 'vectors': 'v', 'tensors': 'ten'})
+
+    def test_inventory_is_cached_until_data_is_modified(self):
+        # Given
+        pd = self.data.point_data
+        inv = get_attribute_inventory(pd)
+
+        # When/Then
+        self.assertIs(get_attribute_inventory(pd), inv)
+
+        # When
+        a = tvtk.FloatArray(name='q')
+        a.from_array(N.random.randn(12))
+        pd.add_array(a)
+        inv1 = get_attribute_inventory(pd)
+
+        # Then
+        self.assertIsNot(inv1, inv)
+        self.assertIn(('q', 'scalars', 1), inv1['arrays'])
+
+    def test_all_attributes_puts_active_first(self):
+        # When
+        pnt_attr, cell_attr = get_all_attributes(self.data)
+
+        # Then
+        self.assertEqual(pnt_attr['scalars'], ['t', 'p'])
+        self.assertEqual(cell_attr['vectors'], ['v'])
+        self.assertEqual(cell_attr['tensors'], ['ten'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -1,9 +1,12 @@
 import os
+import json
 import unittest
 import tempfile
 import shutil
 import mock
 
+from mayavi.core.file_data_source import (get_file_list, get_file_series,
+                                          directory_index)
 from mayavi.core.null_engine import NullEngine
 from mayavi.sources.vtk_xml_file_reader import VTKXMLFileReader
 from mayavi.modules.outline import Outline
@@ -23,6 +26,96 @@ def make_mock_scene():
     return s
 
 
+class TestGetFileSeries(unittest.TestCase):
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        for name in ('abc_1.vti', 'abc_10.vti', 'abc_2.vti', 'abc_2s.vti',
+                     'def_1.vti'):
+            open(os.path.join(self.root, name), 'w').close()
+
+    def tearDown(self):
+        shutil.rmtree(self.root)
+        directory_index.invalidate()
+
+    def _path(self, name):
+        return os.path.join(self.root, name)
+
+    def test_files_are_sorted_by_index(self):
+        # When
+        files = get_file_list(self._path('abc_2.vti'))
+
+        # Then
+        expected = [self._path(x) for x in ('abc_1.vti', 'abc_2.vti',
+                                            'abc_10.vti')]
+        self.assertEqual(files, expected)
+
+    def test_invalidate_picks_up_new_files(self):
+        # Given
+        get_file_list(self._path('def_1.vti'))
+        open(self._path('def_2.vti'), 'w').close()
+
+        # When
+        directory_index.invalidate(self.root)
+        files = get_file_list(self._path('def_1.vti'))
+
+        # Then
+        self.assertEqual(files, [self._path('def_1.vti'),
+                                 self._path('def_2.vti')])
+
+    def test_series_manifest_gives_files_and_times(self):
+        # Given
+        data = {'file-series-version': '1.0',
+                'files': [{'name': 'def_1.vti', 'time': 0.5},
+                          {'name': 'abc_1.vti', 'time': 0.25}]}
+        with open(self._path('data.vti.series'), 'w') as fp:
+            json.dump(data, fp)
+        directory_index.invalidate(self.root)
+
+        # When
+        files, times = get_file_series(self._path('def_1.vti'))
+
+        # Then
+        self.assertEqual(files, [self._path('abc_1.vti'),
+                                 self._path('def_1.vti')])
+        self.assertEqual(times, [0.25, 0.5])
+
+    def test_pvd_manifest_gives_files_and_times(self):
+        # Given
+        with open(self._path('data.pvd'), 'w') as fp:
+            fp.write('<VTKFile type="Collection"><Collection>'
+                     '<DataSet timestep="2.0" file="abc_2.vti"/>'
+                     '<DataSet timestep="1.0" file="abc_1.vti"/>'
+                     '</Collection></VTKFile>')
+        directory_index.invalidate(self.root)
+
+        # When
+        files, times = get_file_series(self._path('abc_1.vti'))
+
+        # Then
+        self.assertEqual(files, [self._path('abc_1.vti'),
+                                 self._path('abc_2.vti')])
+        self.assertEqual(times, [1.0, 2.0])
+
+    def test_pvd_manifest_with_parts_gives_series_of_part(self):
+        # Given
+        with open(self._path('data.pvd'), 'w') as fp:
+            fp.write('<VTKFile type="Collection"><Collection>'
+                     '<DataSet timestep="1.0" part="0" file="abc_1.vti"/>'
+                     '<DataSet timestep="1.0" part="1" file="def_1.vti"/>'
+                     '<DataSet timestep="2.0" part="0" file="abc_2.vti"/>'
+                     '<DataSet timestep="2.0" part="1" file="def_2.vti"/>'
+                     '</Collection></VTKFile>')
+        directory_index.invalidate(self.root)
+
+        # When
+        files, times = get_file_series(self._path('def_1.vti'))
+
+        # Then
+        self.assertEqual(files, [self._path('def_1.vti'),
+                                 self._path('def_2.vti')])
+        self.assertEqual(times, [1.0, 2.0])
+
+
 class TestFileDataSourceTimestep(unittest.TestCase):
     def setUp(self):
 
@@ -136,6 +229,67 @@ class TestFileDataSourceTimestep(unittest.TestCase):
         self.assertEqual(r.timestep, 1)
         self.assertEqual(r.loop, False)
 
+    def test_real_time_play_skips_frames(self):
+        # Given
+        for i in range(3, 10):
+            shutil.copy(self.cube, os.path.join(self.root, 'abc_%d.vti'%i))
+        e = self.engine
+        r = VTKXMLFileReader()
+        r.initialize(self.abc1)
+        r.timestep = 0
+        e.add_source(r)
+        values = []
+        r.on_trait_change(values.append, 'timestep')
+
+        # When
+        r.play_mode = 'real time'
+        r.time_scale = 1e6
+        r.play = True
+
+        # Then
+        self.assertEqual(values, [8])
+        self.assertEqual(r.skipped_frames, 7)
+        self.assertTrue(r.load_time > 0.0)
+
+    def test_real_time_play_uses_file_times(self):
+        # Given
+        e = self.engine
+        r = VTKXMLFileReader()
+        r.initialize(self.abc1)
+        r.timestep = 0
+        e.add_source(r)
+        r.file_times = [0.0, 0.01]
+
+        # When
+        r.play_mode = 'real time'
+        r.play = True
+
+        # Then
+        self.assertEqual(r.timestep, 1)
+        self.assertEqual(r.skipped_frames, 0)
+
+    def test_real_time_play_follows_file_list_changes(self):
+        # Given
+        e = self.engine
+        r = VTKXMLFileReader()
+        r.initialize(self.abc1)
+        r.timestep = 0
+        e.add_source(r)
+        r.play_mode = 'real time'
+        r._get_next_timestep()
+
+        # When
+        shutil.copy(self.abc1, os.path.join(self.root, 'abc_3.vti'))
+        r.update_files = True
+        r.timestep = 1
+
+        # Then
+        self.assertEqual(r._play_times, None)
+        self.assertEqual(r._play_start, None)
+        pc, wait = r._get_next_timestep()
+        self.assertEqual(len(r._play_times), 3)
+        self.assertEqual(r._play_start[1], r._play_times[1])
+
     def test_play_calls_movie_maker_correctly(self):
         # Given
         e = self.engine
@@ -209,6 +363,34 @@ class TestFileDataSourceTimestep(unittest.TestCase):
         self.assertEqual(r2._max_timestep, 2)
         self.assertEqual(len(r2.file_list), 3)
 
+    def test_cached_timesteps_are_not_read_again(self):
+        # Given
+        e = self.engine
+        r = VTKXMLFileReader(cache_size=4)
+        r.initialize(self.abc1)
+        e.add_source(r)
+        o = Outline()
+        e.add_module(o)
+        bounds = o.outline_filter.output.bounds
+
+        # When
+        r.timestep = 1
+        r.timestep = 0
+
+        # Then
+        cache = r._timestep_cache
+        self.assertEqual(len(cache), 2)
+        self.assertTrue(cache.hits >= 1)
+        self.assertEqual(r._cached_output.number_of_points,
+                         r._assign_attribute.output.number_of_points)
+        self.assertEqual(o.outline_filter.output.bounds, bounds)
+
+        # When
+        r.stop()
+
+        # Then
+        self.assertIsNone(r._timestep_cache)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -157,6 +157,65 @@ class TestGlyph(unittest.TestCase):
         g.glyph.mask_input_points = True
         self.check(mask=True)
 
+    def test_mask_modes(self):
+        """Test the deterministic masking modes."""
+        g = self.g
+        g.glyph.mask_input_points = True
+        n_points = g.glyph.glyph.input.number_of_points
+        g.glyph.trait_set(mask_mode='budget', mask_max_glyphs=100)
+        self.assertEqual(g.glyph.glyph.input.number_of_points, 100)
+        # Every other point along each axis of the 10x10x10 grid.
+        g.glyph.trait_set(mask_mode='grid', mask_grid_divisions=5,
+                          mask_max_glyphs=0)
+        self.assertEqual(g.glyph.glyph.input.number_of_points, 125)
+        g.glyph.trait_set(mask_mode='blue_noise', mask_radius=2.5)
+        masked = g.glyph.glyph.input
+        self.assertGreater(masked.number_of_points, 0)
+        self.assertLess(masked.number_of_points, 125)
+        self.assertIsNotNone(masked.point_data.scalars)
+        g.glyph.mask_mode = 'mask_points'
+        self.assertNotEqual(g.glyph.glyph.input.number_of_points, n_points)
+
+    def test_instanced(self):
+        """Test if the instanced glyphs use the glyph mapper."""
+        g = self.g
+        glyph = g.glyph
+        n_points = self.scene.children[0].outputs[0].output.number_of_points
+        glyph.instanced = True
+        mapper = g.actor.mapper
+        self.assertIs(mapper, glyph.glyph_mapper)
+        self.assertIs(g.actor.actor.mapper, mapper)
+        self.assertEqual(mapper.input.number_of_points, n_points)
+        self.assertTrue(mapper.scaling)
+        self.assertEqual(mapper.scale_factor, 0.5)
+        self.assertEqual(mapper.range, glyph.glyph.range)
+        glyph.scale_mode = 'data_scaling_off'
+        self.assertFalse(mapper.scaling)
+
+        glyph.instanced = False
+        self.assertTrue(g.actor.mapper.is_a('vtkPolyDataMapper'))
+        self.assertEqual(g.actor.mapper.input.number_of_points,
+                         glyph.glyph.output.number_of_points)
+        self.check()
+
+    def test_instanced_lookup_table(self):
+        """Test if instanced glyphs leave the shared vector LUT alone."""
+        v = self.v
+        lut = v.module_manager.vector_lut_manager.lut
+        vector_mode = lut.vector_mode
+        v.glyph.instanced = True
+        glyph_lut = v.actor.mapper.lookup_table
+        self.assertIsNot(glyph_lut, lut)
+        self.assertEqual(glyph_lut.vector_mode, 'magnitude')
+        self.assertEqual(lut.vector_mode, vector_mode)
+        lut.table_range = (0.5, 2.0)
+        self.assertEqual(glyph_lut.table_range, (0.5, 2.0))
+
+        v.glyph.instanced = False
+        self.assertIs(v.actor.mapper.lookup_table, lut)
+        self.assertEqual(lut.vector_mode, vector_mode)
+        self.check()
+
     def test_components_changed(self):
         """"Test if the modules respond correctly when the components
             are changed."""
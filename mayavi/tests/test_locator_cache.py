@@ -0,0 +1,172 @@
+"""
+Tests for the cache of cell locators shared between filters.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import threading
+import unittest
+
+import numpy as np
+
+from tvtk import vtk_module as vtk
+from vtk.util.numpy_support import numpy_to_vtk
+
+from mayavi.core import locator_cache
+from mayavi.core.locator_cache import (LocatorCache, get_locator_size,
+                                       set_cell_locator)
+
+
+def make_grid(n=10):
+    src = vtk.vtkRTAnalyticSource()
+    src.SetWholeExtent(0, n - 1, 0, n - 1, 0, n - 1)
+    tetra = vtk.vtkDataSetTriangleFilter()
+    tetra.SetInputConnection(src.GetOutputPort())
+    tetra.Update()
+    return tetra.GetOutput()
+
+
+def make_points(n=50):
+    points = np.random.RandomState(0).uniform(0, 9, (n, 3))
+    vtk_points = vtk.vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(points, deep=True))
+    data = vtk.vtkPolyData()
+    data.SetPoints(vtk_points)
+    return data
+
+
+class TestLocatorCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LocatorCache()
+        self.data = make_grid()
+
+    def test_get(self):
+        cache = self.cache
+        locator = cache.get(self.data)
+        self.assertEqual(locator.GetDataSet(), self.data)
+        self.assertIn(self.data, cache)
+        self.assertEqual(cache.get(self.data), locator)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # The cached locator keeps its dataset alive.
+        self.assertEqual(cache.nbytes,
+                         get_locator_size(locator) +
+                         self.data.GetActualMemorySize()*1024)
+        # Structured data with implicit points need no locator.
+        self.assertIsNone(cache.get(vtk.vtkImageData()))
+        self.assertIsNone(cache.get(vtk.vtkUnstructuredGrid()))
+
+    def test_modified(self):
+        cache = self.cache
+        locator = cache.get(self.data)
+        self.assertEqual(cache.get(self.data), locator)
+        self.data.GetPoints().Modified()
+        other = cache.get(self.data)
+        self.assertNotEqual(other, locator)
+        # Points edited in place with only the dataset modified.
+        self.data.Modified()
+        self.assertNotEqual(cache.get(self.data), other)
+        self.assertEqual(len(cache), 1)
+
+    def test_eviction(self):
+        cache = self.cache
+        cache.max_items = 2
+        grids = [make_grid(n) for n in (4, 5, 6)]
+        for grid in grids:
+            cache.get(grid)
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn(grids[0], cache)
+        # The most recently used one is kept even if it is too large.
+        cache.max_bytes = 1
+        cache.get(grids[0])
+        self.assertEqual(len(cache), 1)
+        self.assertIn(grids[0], cache)
+        cache.discard(grids[0])
+        self.assertEqual(len(cache), 0)
+
+    def test_dataset_size(self):
+        cache = self.cache
+        locator = cache.get(self.data)
+        cache.max_bytes = get_locator_size(locator) + 1
+        cache.get(make_grid(4))
+        # The datasets do not fit together.
+        self.assertEqual(len(cache), 1)
+        self.assertNotIn(self.data, cache)
+
+    def test_owners(self):
+        class Owner(object):
+            pass
+        cache = self.cache
+        first, second = Owner(), Owner()
+        grid = make_grid(4)
+        cache.get(self.data, first)
+        cache.get(self.data, second)
+        cache.get(grid, first)
+        cache.discard_owner(first)
+        self.assertIn(self.data, cache)
+        self.assertNotIn(grid, cache)
+        cache.discard_owner(second)
+        self.assertEqual(len(cache), 0)
+
+    def test_built_once_without_lock(self):
+        cache = self.cache
+        other = make_grid(4)
+        started, release = threading.Event(), threading.Event()
+        built = []
+
+        class Locator(locator_cache._LOCATOR_CLASS):
+            def BuildLocator(self):
+                built.append(self.GetDataSet())
+                if self.GetDataSet() is not other:
+                    started.set()
+                    release.wait()
+                super(Locator, self).BuildLocator()
+
+        old = locator_cache._LOCATOR_CLASS
+        locator_cache._LOCATOR_CLASS = Locator
+        try:
+            results = []
+            threads = [threading.Thread(
+                target=lambda: results.append(cache.get(self.data)))
+                for i in range(2)]
+            threads[0].start()
+            started.wait()
+            threads[1].start()
+            # Other datasets are not blocked by the build.
+            self.assertIsNotNone(cache.get(other))
+            release.set()
+            for t in threads:
+                t.join()
+        finally:
+            locator_cache._LOCATOR_CLASS = old
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(built.count(self.data), 1)
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_set_cell_locator(self):
+        probe = vtk.vtkProbeFilter()
+        if not hasattr(probe, 'SetCellLocator'):
+            raise unittest.SkipTest('vtkProbeFilter has no cell locator')
+        probe.SetInputData(make_points())
+        probe.SetSourceData(self.data)
+        set_cell_locator(probe, self.data)
+        locator = probe.GetCellLocator()
+        self.assertEqual(locator.GetDataSet(), self.data)
+        probe.Update()
+        expected = vtk.vtkProbeFilter()
+        expected.SetInputData(make_points())
+        expected.SetSourceData(self.data)
+        expected.Update()
+        self.assertEqual(probe.GetValidPoints().GetNumberOfTuples(),
+                         expected.GetValidPoints().GetNumberOfTuples())
+        # Another probe of the same data shares the locator.  The first
+        # execution of the probe modified the dataset so it was built
+        # again.
+        other = vtk.vtkProbeFilter()
+        set_cell_locator(other, self.data)
+        set_cell_locator(probe, self.data)
+        self.assertEqual(other.GetCellLocator(), probe.GetCellLocator())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Tests for the background decimation used for the levels of detail.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import threading
+import time
+import unittest
+
+from tvtk import vtk_module as vtk
+
+from mayavi.core.lod import (BackgroundWorker, LODBuilder,
+                              cluster_polydata, decimate_polydata)
+
+
+def make_sphere(resolution=100):
+    sphere = vtk.vtkSphereSource()
+    sphere.SetThetaResolution(resolution)
+    sphere.SetPhiResolution(resolution)
+    elevation = vtk.vtkElevationFilter()
+    elevation.SetInputConnection(sphere.GetOutputPort())
+    elevation.Update()
+    return elevation.GetOutput()
+
+
+def wait_for_result(builder, timeout=30.0):
+    t0 = time.time()
+    while time.time() - t0 < timeout:
+        result = builder.get_result()
+        if result is not None:
+            return result
+        time.sleep(0.01)
+
+
+class TestLOD(unittest.TestCase):
+
+    def test_decimate_polydata(self):
+        data = make_sphere()
+        n_cells = data.GetNumberOfCells()
+        result = decimate_polydata(data, 0.9)
+        self.assertLess(result.GetNumberOfCells(), 0.2*n_cells)
+        self.assertGreater(result.GetNumberOfCells(), 0)
+        # The scalars of the remaining points are kept.
+        scalars = result.GetPointData().GetScalars()
+        self.assertIsNotNone(scalars)
+        self.assertEqual(scalars.GetNumberOfTuples(),
+                         result.GetNumberOfPoints())
+
+    def test_cluster_polydata(self):
+        data = make_sphere(400)
+        result, divisions = cluster_polydata(data, 5000)
+        n = result.GetNumberOfCells()
+        self.assertTrue(0.5*5000 < n <= 1.25*5000)
+        self.assertTrue(all(d > 1 for d in divisions))
+
+    def test_cluster_small_data_is_unchanged(self):
+        data = make_sphere(10)
+        result, divisions = cluster_polydata(data, 5000)
+        self.assertEqual(result.GetNumberOfCells(), data.GetNumberOfCells())
+        self.assertEqual(divisions, (0, 0, 0))
+
+    def test_worker_callback(self):
+        ready = threading.Event()
+        worker = BackgroundWorker(callback=ready.set)
+        worker.submit(pow, 2, 10)
+        self.assertTrue(ready.wait(30))
+        self.assertEqual(worker.get_result(), 1024)
+
+    def test_builder(self):
+        builder = LODBuilder(reduction=0.5)
+        data = make_sphere()
+        builder.submit(data)
+        result = wait_for_result(builder)
+        self.assertIsNotNone(result)
+        self.assertLess(result.GetNumberOfCells(), data.GetNumberOfCells())
+        # A result is only returned once.
+        self.assertIsNone(builder.get_result())
+
+    def test_cancel_drops_result(self):
+        builder = LODBuilder()
+        builder.submit(make_sphere(200))
+        builder.cancel()
+        time.sleep(0.5)
+        self.assertIsNone(builder.get_result())
+
+
+if __name__ == '__main__':
+    unittest.main()
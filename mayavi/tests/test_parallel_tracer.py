@@ -0,0 +1,130 @@
+"""
+Tests for the streamline integration in worker threads.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import threading
+import unittest
+
+import numpy as np
+
+from tvtk import vtk_module as vtk
+from vtk.util.numpy_support import numpy_to_vtk
+
+from mayavi.core.parallel_tracer import (ParallelStreamTracer,
+                                         copy_tracer_settings,
+                                         split_seeds)
+
+
+def make_field():
+    src = vtk.vtkRTAnalyticSource()
+    src.SetWholeExtent(-10, 10, -10, 10, -10, 10)
+    gradient = vtk.vtkImageGradient()
+    gradient.SetInputConnection(src.GetOutputPort())
+    gradient.SetDimensionality(3)
+    tetra = vtk.vtkDataSetTriangleFilter()
+    tetra.SetInputConnection(gradient.GetOutputPort())
+    tetra.Update()
+    data = tetra.GetOutput()
+    data.GetPointData().SetActiveVectors('RTDataGradient')
+    return data
+
+
+def make_seeds(n, seed=0):
+    points = np.random.RandomState(seed).uniform(-8, 8, (n, 3))
+    vtk_points = vtk.vtkPoints()
+    vtk_points.SetData(numpy_to_vtk(points, deep=True))
+    seeds = vtk.vtkPolyData()
+    seeds.SetPoints(vtk_points)
+    return seeds
+
+
+def make_settings():
+    settings = vtk.vtkStreamTracer()
+    settings.SetMaximumPropagation(10)
+    settings.SetIntegratorTypeToRungeKutta4()
+    settings.SetIntegrationDirectionToBoth()
+    return settings
+
+
+class TestParallelTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.data = make_field()
+
+    def test_split_seeds(self):
+        batches = split_seeds(make_seeds(25), 10)
+        self.assertEqual([b.GetNumberOfPoints() for b in batches],
+                         [10, 10, 5])
+        self.assertEqual(split_seeds(vtk.vtkPolyData(), 10), [])
+
+    def test_copy_settings(self):
+        tracer = vtk.vtkStreamTracer()
+        copy_tracer_settings(make_settings(), tracer)
+        self.assertEqual(tracer.GetMaximumPropagation(), 10)
+        self.assertEqual(tracer.GetIntegrationDirection(),
+                         make_settings().GetIntegrationDirection())
+
+    def test_trace(self):
+        seeds = make_seeds(200)
+        settings = make_settings()
+        serial = vtk.vtkStreamTracer()
+        copy_tracer_settings(settings, serial)
+        serial.SetInputData(self.data)
+        serial.SetSourceData(seeds)
+        serial.Update()
+
+        tracer = ParallelStreamTracer(number_of_threads=3, batch_size=32)
+        result = tracer.trace(self.data, seeds, settings)
+        self.assertEqual(result.GetNumberOfLines(),
+                         serial.GetOutput().GetNumberOfLines())
+        # The same input is used for new seeds.
+        input = tracer._input
+        tracer.trace(self.data, make_seeds(20, 1), settings)
+        self.assertIs(tracer._input, input)
+        tracer.shutdown()
+
+    def test_input_arrays_are_copied(self):
+        tracer = ParallelStreamTracer(number_of_threads=1)
+        tracer.trace(self.data, make_seeds(10), make_settings())
+        # Editing the data in place does not change the input of the
+        # threads.
+        vectors = self.data.GetPointData().GetVectors()
+        copy = tracer._input.GetPointData().GetVectors()
+        self.assertIsNot(copy, vectors)
+        self.assertIsNot(tracer._input.GetPoints().GetData(),
+                         self.data.GetPoints().GetData())
+        before = copy.GetTuple3(0)
+        vectors.SetTuple3(0, 1e3, 1e3, 1e3)
+        self.assertEqual(copy.GetTuple3(0), before)
+        tracer.shutdown()
+
+    def test_progressive_results(self):
+        done = threading.Event()
+        tracer = ParallelStreamTracer(number_of_threads=2, batch_size=10)
+
+        def callback():
+            if tracer._pending == 0:
+                done.set()
+        tracer.callback = callback
+        tracer.submit(self.data, make_seeds(50), make_settings())
+        self.assertTrue(done.wait(30))
+        results, finished = tracer.get_results()
+        self.assertTrue(finished)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(tracer.get_results(), ([], True))
+        tracer.shutdown()
+
+    def test_cancel(self):
+        tracer = ParallelStreamTracer(number_of_threads=1, batch_size=1)
+        tracer.submit(self.data, make_seeds(200), make_settings())
+        tracer.cancel()
+        results, finished = tracer.get_results()
+        self.assertTrue(finished)
+        self.assertEqual(results, [])
+        tracer.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
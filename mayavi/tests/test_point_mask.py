@@ -0,0 +1,127 @@
+"""
+Tests for the deterministic point masking used by the Glyph component.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import unittest
+
+import numpy as np
+
+from tvtk import vtk_module as vtk
+from vtk.util.numpy_support import numpy_to_vtk
+
+from mayavi.core.point_mask import (PointMaskFilter, blue_noise_sample,
+                                     budget_sample, get_coordinates,
+                                     grid_sample, sample_points)
+
+
+def make_image(n=20):
+    src = vtk.vtkRTAnalyticSource()
+    src.SetWholeExtent(0, n - 1, 0, n - 1, 0, n - 1)
+    gradient = vtk.vtkImageGradient()
+    gradient.SetInputConnection(src.GetOutputPort())
+    gradient.SetDimensionality(3)
+    gradient.Update()
+    return gradient.GetOutput()
+
+
+def min_distance(points):
+    d = ((points[:, None] - points[None])**2).sum(axis=-1)
+    np.fill_diagonal(d, np.inf)
+    return np.sqrt(d.min())
+
+
+class TestSampling(unittest.TestCase):
+
+    def setUp(self):
+        self.points = np.random.RandomState(1).rand(20000, 3)
+
+    def test_budget_sample(self):
+        indices = budget_sample(1000, 10)
+        self.assertEqual(len(indices), 10)
+        self.assertEqual(indices[0], 0)
+        self.assertEqual(indices[-1], 999)
+        self.assertEqual(len(budget_sample(5, 10)), 5)
+        self.assertEqual(len(budget_sample(5, 0)), 5)
+
+    def test_grid_sample(self):
+        grid = np.mgrid[0:10, 0:10, 0:10].reshape(3, -1).T.astype(float)
+        self.assertEqual(len(grid_sample(grid, 5)), 125)
+        self.assertEqual(len(grid_sample(grid, 10)), 1000)
+        indices = grid_sample(self.points, 10)
+        # One point per cell.
+        cells = np.floor(self.points[indices]*10).clip(0, 9)
+        self.assertEqual(len(np.unique(cells, axis=0)), len(indices))
+
+    def test_blue_noise_sample(self):
+        indices = blue_noise_sample(self.points, 0.1)
+        self.assertGreater(len(indices), 100)
+        self.assertGreaterEqual(min_distance(self.points[indices]), 0.1)
+        # The selection is reproducible.
+        self.assertTrue(np.array_equal(
+            indices, blue_noise_sample(self.points, 0.1)
+        ))
+
+    def test_max_points(self):
+        for mode in ('grid', 'blue_noise', 'budget'):
+            indices = sample_points(self.points, mode, max_points=500)
+            self.assertLessEqual(len(indices), 500)
+            self.assertGreater(len(indices), 250)
+        self.assertRaises(ValueError, sample_points, self.points, 'foo')
+
+    def test_get_coordinates(self):
+        image = make_image(5)
+        coords = get_coordinates(image)
+        self.assertEqual(coords.shape, (125, 3))
+        for i in (0, 1, 7, 124):
+            self.assertTrue(np.allclose(coords[i], image.GetPoint(i)))
+        grid = vtk.vtkRectilinearGrid()
+        grid.SetDimensions(3, 4, 2)
+        for axis, n in zip('XYZ', (3, 4, 2)):
+            getattr(grid, 'Set%sCoordinates' % axis)(
+                numpy_to_vtk(np.linspace(0, 1, n)**2, deep=True)
+            )
+        for data in (image, grid):
+            indices = np.array([23, 2, 0])
+            coords = get_coordinates(data, indices)
+            for i, xyz in zip(indices, coords):
+                self.assertTrue(np.allclose(xyz, data.GetPoint(i)))
+
+
+class TestPointMaskFilter(unittest.TestCase):
+
+    def test_filter(self):
+        image = make_image()
+        f = PointMaskFilter()
+        f.SetInputDataObject(image)
+        f.set_parameters('grid', 5, 0.0, 0)
+        f.Update()
+        output = f.GetOutputDataObject(0)
+        self.assertEqual(output.GetNumberOfPoints(), 125)
+        pd = output.GetPointData()
+        self.assertEqual(pd.GetNumberOfArrays(), 2)
+        self.assertEqual(pd.GetScalars().GetName(), 'RTDataGradient')
+        i = f.get_indices(image)[3]
+        self.assertTrue(np.allclose(output.GetPoint(3), image.GetPoint(i)))
+
+    def test_cache(self):
+        image = make_image()
+        f = PointMaskFilter()
+        f.SetInputDataObject(image)
+        f.set_parameters('blue_noise', 50, 0.0, 500)
+        f.Update()
+        indices = f._indices
+        f.Update()
+        self.assertIs(f._indices, indices)
+        # Any change of the input computes the selection again.
+        image.Modified()
+        f.Update()
+        self.assertIsNot(f._indices, indices)
+        f.set_parameters('budget', 50, 0.0, 100)
+        f.Update()
+        self.assertEqual(f.GetOutputDataObject(0).GetNumberOfPoints(), 100)
+
+
+if __name__ == '__main__':
+    unittest.main()
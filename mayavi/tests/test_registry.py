@@ -3,6 +3,8 @@
 # License: BSD Style.
 
 # Standard library imports.
+import os
+import tempfile
 import unittest
 
 # Enthought library imports
@@ -29,6 +31,22 @@ class DummyReader(PLOT3DReader):
         """
         return False
 
+    # Number of calls to `counting_check_read`.
+    n_checks = 0
+
+    @classmethod
+    def counting_check_read(cls, filename):
+        """ Callable which counts its calls and returns False
+        """
+        DummyReader.n_checks += 1
+        return False
+
+    @classmethod
+    def other_counting_check_read(cls, filename):
+        """ Another callable which counts its calls and returns False
+        """
+        return cls.counting_check_read(filename)
+
 
 class TestRegistry(unittest.TestCase):
 
@@ -149,5 +167,39 @@ class TestRegistry(unittest.TestCase):
         registry.sources.insert(index, poly)
         registry.sources.remove(open_dummy)
 
+    def test_can_read_test_results_are_cached(self):
+        """Test that the can_read_test is only called again when the
+        file changes."""
+        dummies = [
+            SourceMetadata(
+                id="DummyFile%d"%i,
+                class_name="mayavi.tests.test_registry.DummyReader",
+                extensions=['dmy'],
+                can_read_test='mayavi.tests.test_registry:DummyReader.%s'
+                              % test,
+            )
+            for i, test in enumerate(('counting_check_read',
+                                      'other_counting_check_read'))
+        ]
+        registry.sources.extend(dummies)
+        fd, fname = tempfile.mkstemp(suffix='.dmy')
+        os.close(fd)
+        DummyReader.n_checks = 0
+        try:
+            self.assertEqual(registry.get_file_reader(fname), None)
+            self.assertEqual(DummyReader.n_checks, 2)
+            self.assertEqual(registry.get_file_reader(fname), None)
+            self.assertEqual(DummyReader.n_checks, 2)
+
+            with open(fname, 'w') as fp:
+                fp.write('changed')
+            self.assertEqual(registry.get_file_reader(fname), None)
+            self.assertEqual(DummyReader.n_checks, 4)
+        finally:
+            os.remove(fname)
+            for src in dummies:
+                registry.sources.remove(src)
+        self.assertEqual(registry._get_extension_index().get('dmy', []), [])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,186 @@
+"""
+Tests for the adaptive streaming mode of the remote scenes.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import time
+import unittest
+
+import numpy as np
+
+from mayavi import mlab
+from mayavi.tools.remote.remote_scene import ImageEncoder, RemoteScene
+
+
+def make_frame(ny=40, nx=60):
+    return np.random.randint(0, 255, size=(ny, nx, 3)).astype(np.uint8)
+
+
+def poll_all(encoder, timeout=10.0):
+    """Polls the encoder until it is done and returns the results."""
+    results = []
+    end = time.time() + timeout
+    while time.time() < end:
+        result, busy = encoder.poll()
+        if result is not None:
+            results.append(result)
+        if not busy:
+            return results
+        time.sleep(0.001)
+    raise AssertionError('The frames were not encoded in time.')
+
+
+class TestImageEncoder(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = ImageEncoder(frame_budget=0.1, min_quality=20,
+                                    max_quality=80, max_step=3,
+                                    interactive_quality=60)
+
+    def test_encode(self):
+        encoder = self.encoder
+        frame = make_frame()
+        data, format = encoder.encode(frame)
+        self.assertEqual(format, 'PNG')
+        self.assertEqual(data[:8], b'\x89PNG\r\n\x1a\n')
+        encoder.interactive_step = 2
+        data, format = encoder.encode(frame, lossless=False)
+        self.assertEqual(format, 'JPEG')
+        self.assertEqual(data[:2], b'\xff\xd8')
+
+    def test_slow_frames_lower_quality_then_resolution(self):
+        encoder = self.encoder
+        qualities = []
+        for i in range(8):
+            encoder.update_timing(0.08, 0.04)
+            qualities.append((encoder.interactive_quality,
+                              encoder.interactive_step))
+        self.assertEqual(qualities, [(50, 1), (40, 1), (30, 1), (20, 1),
+                                     (20, 2), (20, 3), (20, 3), (20, 3)])
+
+    def test_fast_frames_raise_resolution_then_quality(self):
+        encoder = self.encoder
+        encoder.trait_set(interactive_quality=20, interactive_step=3)
+        qualities = []
+        for i in range(9):
+            encoder.update_timing(0.02, 0.01)
+            qualities.append((encoder.interactive_quality,
+                              encoder.interactive_step))
+        self.assertEqual(qualities, [(20, 2), (20, 1), (30, 1), (40, 1),
+                                     (50, 1), (60, 1), (70, 1), (80, 1),
+                                     (80, 1)])
+
+    def test_frames_within_budget_keep_settings(self):
+        encoder = self.encoder
+        encoder.interactive_step = 2
+        for total in (0.05, 0.07, 0.1):
+            encoder.update_timing(total/2, total/2)
+        self.assertEqual(encoder.interactive_quality, 60)
+        self.assertEqual(encoder.interactive_step, 2)
+
+    def test_poll_returns_frames_in_order(self):
+        encoder = self.encoder
+        widths = []
+        for nx in range(20, 60):
+            encoder.submit(make_frame(nx=nx))
+            result, busy = encoder.poll()
+            if result is not None:
+                widths.append(result[3][0])
+        widths.extend(result[3][0] for result in poll_all(encoder))
+        # Frames may be dropped but are never returned out of order or
+        # twice, and the last one is always encoded.
+        self.assertEqual(widths, sorted(set(widths)))
+        self.assertEqual(widths[-1], 59)
+        self.assertEqual(encoder.poll(), (None, False))
+
+    def test_poll_result(self):
+        encoder = self.encoder
+        encoder.submit(make_frame(), lossless=False)
+        results = poll_all(encoder)
+        self.assertEqual(len(results), 1)
+        data, format, encode_time, size = results[0]
+        self.assertEqual(format, 'JPEG')
+        self.assertGreaterEqual(encode_time, 0)
+        self.assertEqual(tuple(size), (60, 40))
+
+
+class TestRemoteSceneAdaptive(unittest.TestCase):
+
+    def setUp(self):
+        self.fig = mlab.figure(size=(64, 48))
+        mlab.points3d([0, 1], [0, 1], [0, 1])
+        self.calls = []
+        self.events = []
+        self.remote = RemoteScene(figure=self.fig,
+                                  call_later=self.call_later)
+        self.remote.image_encoder.adaptive = True
+        self.remote.on_trait_change(self.events.append, 'event')
+        # Drop the renders scheduled while the scene was set up.
+        del self.calls[:]
+
+    def tearDown(self):
+        mlab.close(self.fig)
+
+    def call_later(self, secs, func, *args, **kw):
+        self.calls.append((func, args, kw))
+
+    def run_calls(self, timeout=10.0):
+        end = time.time() + timeout
+        while self.calls and time.time() < end:
+            func, args, kw = self.calls.pop(0)
+            func(*args, **kw)
+            time.sleep(0.001)
+        self.assertEqual(self.calls, [])
+
+    def test_lossy_frame_is_encoded_in_background(self):
+        remote = self.remote
+        encoder = remote.image_encoder
+        encoder.interactive_step = 2
+        encoder.interacting = True
+        remote._send_adaptive_frame()
+        # The frame is collected later.
+        self.assertEqual(self.events, [])
+        self.assertEqual(len(self.calls), 1)
+        self.run_calls()
+        self.assertEqual(len(self.events), 1)
+        data = self.events[0].data
+        self.assertEqual(data['format'], 'JPEG')
+        self.assertEqual((data['width'], data['height']), (32, 24))
+        self.assertFalse(remote._collecting)
+
+        # An unchanged frame is not sent again.
+        remote._send_adaptive_frame()
+        self.run_calls()
+        self.assertEqual(len(self.events), 1)
+
+    def test_lossless_frame_after_interaction(self):
+        remote = self.remote
+        remote.call_later = None
+        encoder = remote.image_encoder
+        encoder.interacting = True
+        remote._send_adaptive_frame()
+        self.assertEqual(self.events[-1].data['format'], 'JPEG')
+        n_events = len(self.events)
+        remote.call_rwi('LeftButtonReleaseEvent')
+        self.assertFalse(encoder.interacting)
+        # The last lossy frame is replaced.
+        self.assertGreater(len(self.events), n_events)
+        data = self.events[-1].data
+        self.assertEqual(data['format'], 'PNG')
+        self.assertEqual((data['width'], data['height']), (64, 48))
+
+    def test_emit_frame_updates_timing(self):
+        remote = self.remote
+        encoder = remote.image_encoder
+        remote._time_to_render = 1.0
+        remote._emit_frame(b'png', 'PNG', 1.0, (64, 48))
+        self.assertEqual(encoder.interactive_quality, 60)
+        remote._emit_frame(b'jpeg', 'JPEG', 1.0, (64, 48))
+        self.assertEqual(encoder.interactive_quality, 50)
+        self.assertEqual(len(self.events), 2)
+        self.assertEqual(self.events[-1].data['time'], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
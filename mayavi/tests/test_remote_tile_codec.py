@@ -0,0 +1,224 @@
+"""
+Tests for the tile based frame transport of the remote scenes.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import base64
+import struct
+import unittest
+import zlib
+
+import numpy as np
+
+from mayavi.tools.remote.remote_widget import RemoteWidget
+from mayavi.tools.remote.tile_codec import (TileDecoder, TileEncoder,
+                                            frame_to_png, png_to_frame)
+
+try:
+    import ipywidgets  # noqa: F401
+    import ipyevents  # noqa: F401
+except ImportError:
+    has_ipywidgets = False
+else:
+    has_ipywidgets = True
+
+
+def make_frame(ny=100, nx=150):
+    return np.random.randint(0, 255, size=(ny, nx, 3)).astype(np.uint8)
+
+
+class TestTileCodec(unittest.TestCase):
+
+    def setUp(self):
+        self.encoder = TileEncoder(tile_size=32, keyframe_interval=3)
+        self.decoder = TileDecoder()
+
+    def test_first_frame_is_keyframe(self):
+        frame = make_frame()
+        data = self.encoder.encode(frame)
+        self.assertTrue(data['keyframe'])
+        # 4 rows and 5 columns of tiles.
+        self.assertEqual(len(data['tiles']), 20)
+        np.testing.assert_array_equal(self.decoder.decode(data), frame)
+
+    def test_only_changed_tiles_are_sent(self):
+        frame = make_frame()
+        self.decoder.decode(self.encoder.encode(frame))
+        self.assertIsNone(self.encoder.encode(frame.copy()))
+
+        frame[40, 70] = frame[40, 70] + 1
+        frame[99, 149] = frame[99, 149] + 1
+        data = self.encoder.encode(frame)
+        self.assertFalse(data['keyframe'])
+        self.assertEqual(sorted(t[:4] for t in data['tiles']),
+                         [(64, 32, 32, 32), (128, 96, 22, 4)])
+        np.testing.assert_array_equal(self.decoder.decode(data), frame)
+
+    def test_keyframes(self):
+        frame = make_frame()
+        keyframes = []
+        for i in range(5):
+            frame[0, 0] = i
+            keyframes.append(self.encoder.encode(frame)['keyframe'])
+        self.assertEqual(keyframes, [True, False, False, False, True])
+
+        # A new size needs a keyframe.
+        data = self.encoder.encode(make_frame(50, 60))
+        self.assertTrue(data['keyframe'])
+
+    def test_missed_frame_needs_keyframe(self):
+        frame = make_frame()
+        self.decoder.decode(self.encoder.encode(frame))
+        frame[0, 0] = frame[0, 0] + 1
+        self.encoder.encode(frame)
+        frame[0, 0] = frame[0, 0] + 1
+        self.assertIsNone(self.decoder.decode(self.encoder.encode(frame)))
+
+        self.encoder.reset()
+        data = self.encoder.encode(frame)
+        np.testing.assert_array_equal(self.decoder.decode(data), frame)
+
+    def test_frame_to_png(self):
+        frame = make_frame(10, 20)
+        png = frame_to_png(frame)
+        self.assertEqual(png[:8], b'\x89PNG\r\n\x1a\n')
+        width, height = struct.unpack('>II', png[16:24])
+        self.assertEqual((width, height), (20, 10))
+        length = struct.unpack('>I', png[33:37])[0]
+        rows = np.frombuffer(zlib.decompress(png[41:41 + length]),
+                             dtype=np.uint8).reshape(10, 61)
+        # The rows are stored from top to bottom.
+        np.testing.assert_array_equal(rows[:, 1:].reshape(10, 20, 3),
+                                      frame[::-1])
+
+    def test_png_to_frame(self):
+        frame = make_frame(10, 20)
+        np.testing.assert_array_equal(png_to_frame(frame_to_png(frame)),
+                                      frame)
+        gray = make_frame(7, 5)[:, :, :1]
+        np.testing.assert_array_equal(png_to_frame(frame_to_png(gray)),
+                                      gray)
+        with self.assertRaises(ValueError):
+            png_to_frame(b'GIF89a')
+
+    def test_tiles_are_png(self):
+        frame = make_frame()
+        data = self.encoder.encode(frame)
+        self.assertEqual(data['tile_size'], 32)
+        x, y, w, h, tile = data['tiles'][-1]
+        np.testing.assert_array_equal(
+            png_to_frame(base64.b64decode(tile)), frame[y:y + h, x:x + w]
+        )
+
+
+class DummySceneProxy(object):
+    def __init__(self, frame):
+        self.id = 1
+        self.frame = frame
+        self.keyframes = 0
+
+    def get_raw_image(self):
+        return frame_to_png(self.frame)
+
+    def request_keyframe(self):
+        self.keyframes += 1
+
+    def call_rwi(self, method, *args):
+        pass
+
+
+class DummyBridge(object):
+    def add_widget(self, scene_id, widget):
+        pass
+
+    def remove_widget(self, scene_id, widget):
+        pass
+
+
+class FrameWidget(RemoteWidget):
+    def __init__(self, *args, **kw):
+        super(FrameWidget, self).__init__(*args, **kw)
+        self.frames = []
+
+    def on_render_frame(self, frame):
+        self.frames.append(frame.copy())
+
+
+class TileWidgetTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = make_frame()
+        self.proxy = DummySceneProxy(self.frame)
+        self.encoder = TileEncoder(tile_size=32)
+
+    def send(self, widget, frame):
+        data = self.encoder.encode(frame)
+        widget.handle_vtk_event('vtkRenderWindow', 'RenderEvent', data)
+
+
+class TestRemoteWidgetTiles(TileWidgetTestCase):
+
+    def test_frames_are_rebuilt(self):
+        widget = FrameWidget(self.proxy, DummyBridge())
+        frame = self.frame
+        self.send(widget, frame)
+        frame[50, 50] = frame[50, 50] + 1
+        self.send(widget, frame)
+        self.assertEqual(len(widget.frames), 2)
+        np.testing.assert_array_equal(widget.frames[-1], frame)
+        self.assertEqual(self.proxy.keyframes, 0)
+
+    def test_missed_frame_requests_keyframe(self):
+        widget = FrameWidget(self.proxy, DummyBridge())
+        frame = self.frame
+        self.send(widget, frame)
+        frame[0, 0] = frame[0, 0] + 1
+        self.encoder.encode(frame)
+        frame[0, 0] = frame[0, 0] + 1
+        self.send(widget, frame)
+        self.assertEqual(len(widget.frames), 1)
+        self.assertEqual(self.proxy.keyframes, 1)
+
+
+@unittest.skipIf(not has_ipywidgets, 'ipywidgets and ipyevents are needed')
+class TestIPyRemoteWidgetTiles(TileWidgetTestCase):
+
+    def make_widget(self):
+        from mayavi.tools.remote.ipy_remote import IPyRemoteWidget
+        return IPyRemoteWidget(self.proxy, DummyBridge())
+
+    def test_only_changed_tiles_are_updated(self):
+        widget = self.make_widget()
+        frame = self.frame
+        self.send(widget, frame)
+        grid = widget.view.children[0]
+        # 4 rows and 5 columns of tiles, the top row first.
+        self.assertEqual(len(grid.children), 20)
+        self.assertEqual(grid.layout.grid_template_rows,
+                         '4px 32px 32px 32px')
+        tiles = widget._tiles
+        values = dict((k, v.value) for k, v in tiles.items())
+        self.assertEqual(png_to_frame(tiles[4, 3].value).tolist(),
+                         frame[96:, 128:].tolist())
+
+        frame[40, 70] = frame[40, 70] + 1
+        self.send(widget, frame)
+        changed = [k for k, v in tiles.items() if v.value != values[k]]
+        self.assertEqual(changed, [(2, 1)])
+        np.testing.assert_array_equal(png_to_frame(tiles[2, 1].value),
+                                      frame[32:64, 64:96])
+
+    def test_missed_frame_requests_keyframe(self):
+        widget = self.make_widget()
+        frame = self.frame
+        self.send(widget, frame)
+        frame[0, 0] = frame[0, 0] + 1
+        self.encoder.encode(frame)
+        frame[0, 0] = frame[0, 0] + 1
+        self.send(widget, frame)
+        self.assertEqual(self.proxy.keyframes, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -143,7 +143,25 @@ class TestStreamline(unittest.TestCase):
         st.stream_tracer = tracer
         self.check()
 
-
+    def test_parallel(self):
+        """Test if the streamlines integrated in batches are the same."""
+        st = self.scene.children[0].children[0].children[1]
+        st.stream_tracer.update()
+        n_lines = st.stream_tracer.output.number_of_lines
+        self.assertGreater(n_lines, 1)
+        st.trait_set(background=False, seed_batch_size=3,
+                     number_of_threads=2)
+        st.parallel = True
+        self.assertEqual(len(st._pieces),
+                         -(-st.seed.poly_data.number_of_points // 3))
+        self.assertEqual(st.actor.mapper.input.number_of_lines, n_lines)
+        # New seeds are integrated again.
+        st.seed.widget.phi_resolution = 8
+        st.update_streamlines = True
+        self.assertGreater(st.actor.mapper.input.number_of_lines, n_lines)
+        st.parallel = False
+        self.assertIsNone(st._tracer)
+        self.check()
 
     def test_save_and_restore(self):
         """Test if saving a visualization and restoring it works."""
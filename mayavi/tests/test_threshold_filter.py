@@ -138,6 +138,33 @@ class TestThresholdFilter(unittest.TestCase):
         self.assertTrue(output_range[0] >= 0.25)
         self.assertTrue(output_range[1] <= 0.75)
 
+    def test_indexed(self):
+        x, y, z = np.mgrid[-1:1:10j, -1:1:10j, -1:1:10j]
+        src = ArraySource(scalar_data=x*x + y*y + z*z)
+        self.e.add_source(src)
+        threshold = Threshold()
+        self.e.add_filter(threshold)
+        self.assertTrue(threshold.outputs[0].is_a('vtkPythonAlgorithm'))
+        threshold.trait_set(lower_threshold=0.25, upper_threshold=0.75)
+        n_cells = threshold.get_output_dataset().number_of_cells
+        self.assertGreater(n_cells, 0)
+        output_range = threshold.get_output_dataset().point_data.scalars.range
+        self.assertTrue(output_range[0] >= 0.25)
+        self.assertTrue(output_range[1] <= 0.75)
+
+        # The same cells are kept by the vtkThreshold.
+        threshold.indexed = False
+        self.assertIs(threshold.outputs[0], threshold.threshold_filter)
+        self.assertEqual(threshold.get_output_dataset().number_of_cells,
+                         n_cells)
+
+        # Settings not supported by the index are followed too.
+        threshold.threshold_filter.all_scalars = False
+        n_cells = threshold.get_output_dataset().number_of_cells
+        threshold.indexed = True
+        self.assertEqual(threshold.get_output_dataset().number_of_cells,
+                         n_cells)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,144 @@
+"""
+Tests for the indexed extraction of cells used by the Threshold filter.
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import unittest
+
+import numpy as np
+
+from tvtk import vtk_module as vtk
+from vtk.util.numpy_support import vtk_to_numpy
+
+from mayavi.core.threshold_index import (IndexedThreshold, ThresholdIndex,
+                                         get_cell_ranges,
+                                         set_threshold_range)
+
+
+def make_image(n=10):
+    src = vtk.vtkRTAnalyticSource()
+    src.SetWholeExtent(0, n - 1, 0, n - 1, 0, n - 1)
+    src.Update()
+    return src.GetOutput()
+
+
+def make_grid(n=10):
+    tetra = vtk.vtkDataSetTriangleFilter()
+    tetra.SetInputData(make_image(n))
+    tetra.Update()
+    return tetra.GetOutput()
+
+
+def threshold(data, lower, upper, settings=None):
+    fil = vtk.vtkThreshold()
+    if settings is not None:
+        fil.SetAllScalars(settings.GetAllScalars())
+    fil.SetInputData(data)
+    set_threshold_range(fil, lower, upper)
+    fil.Update()
+    return fil.GetOutput()
+
+
+class TestThresholdIndex(unittest.TestCase):
+
+    def test_query(self):
+        cell_min = np.array([0.0, 2.0, 1.0, np.nan, 3.0])
+        cell_max = np.array([1.0, 4.0, 5.0, np.nan, 3.5])
+        index = ThresholdIndex(cell_min, cell_max)
+        self.assertEqual(list(index.query(0.0, 4.0)), [0, 1, 4])
+        self.assertEqual(list(index.query(1.5, 10.0)), [1, 4])
+        self.assertEqual(list(index.query(3.0, 3.5)), [4])
+        self.assertEqual(list(index.query(4.0, 3.0)), [])
+        index = ThresholdIndex(cell_min, cell_min)
+        self.assertEqual(list(index.query(1.0, 2.0)), [1, 2])
+
+    def test_cell_ranges(self):
+        for data in (make_image(4), make_grid(4)):
+            values = vtk_to_numpy(data.GetPointData().GetScalars())
+            cell_min, cell_max = get_cell_ranges(data, values)
+            self.assertEqual(len(cell_min), data.GetNumberOfCells())
+            for i in (0, 5, data.GetNumberOfCells() - 1):
+                ids = vtk.vtkIdList()
+                data.GetCellPoints(i, ids)
+                cell = values[[ids.GetId(j)
+                               for j in range(ids.GetNumberOfIds())]]
+                self.assertEqual(cell_min[i], cell.min())
+                self.assertEqual(cell_max[i], cell.max())
+
+
+class TestIndexedThreshold(unittest.TestCase):
+
+    def check(self, data, lower, upper):
+        fil = IndexedThreshold()
+        fil.SetInputDataObject(data)
+        fil.set_range(lower, upper)
+        fil.Update()
+        output = fil.GetOutputDataObject(0)
+        expected = threshold(data, lower, upper, fil.settings)
+        self.assertEqual(output.GetNumberOfCells(),
+                         expected.GetNumberOfCells())
+        self.assertEqual(output.GetNumberOfPoints(),
+                         expected.GetNumberOfPoints())
+        self.assertEqual(output.GetPointData().GetNumberOfArrays(),
+                         expected.GetPointData().GetNumberOfArrays())
+        return fil
+
+    def test_threshold(self):
+        for data in (make_image(), make_grid()):
+            fil = self.check(data, 100, 200)
+            self.assertIsNotNone(fil._index)
+
+    def test_cell_scalars(self):
+        p2c = vtk.vtkPointDataToCellData()
+        p2c.SetInputData(make_grid())
+        p2c.Update()
+        data = p2c.GetOutput()
+        data.GetPointData().RemoveArray('RTData')
+        self.check(data, 150, 250)
+
+    def test_index_reused(self):
+        data = make_grid()
+        fil = self.check(data, 100, 200)
+        index = fil._index
+        fil.set_range(120, 180)
+        fil.Update()
+        self.assertIs(fil._index, index)
+        self.assertEqual(fil.GetOutputDataObject(0).GetNumberOfCells(),
+                         threshold(data, 120, 180).GetNumberOfCells())
+        data.GetPointData().GetScalars().Modified()
+        fil.Modified()
+        fil.Update()
+        self.assertIsNot(fil._index, index)
+
+    def test_modified_in_place(self):
+        data = make_image()
+        fil = self.check(data, 100, 200)
+        # Edit the scalars in place and only mark the dataset modified.
+        values = vtk_to_numpy(data.GetPointData().GetScalars())
+        values[:] = values.max() + 100
+        values[:len(values)//2] = 0
+        data.Modified()
+        fil.set_range(-10, 10)
+        fil.Update()
+        n_cells = threshold(data, -10, 10).GetNumberOfCells()
+        self.assertGreater(n_cells, 0)
+        self.assertEqual(fil.GetOutputDataObject(0).GetNumberOfCells(),
+                         n_cells)
+
+    def test_fallback(self):
+        data = make_grid()
+        fil = IndexedThreshold()
+        fil.settings.SetAllScalars(False)
+        fil.SetInputDataObject(data)
+        fil.set_range(100, 200)
+        fil.Update()
+        self.assertIsNone(fil._index)
+        self.assertEqual(
+            fil.GetOutputDataObject(0).GetNumberOfCells(),
+            threshold(data, 100, 200, fil.settings).GetNumberOfCells()
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
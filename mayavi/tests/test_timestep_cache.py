@@ -0,0 +1,116 @@
+import threading
+import unittest
+
+from mayavi.core.timestep_cache import TimestepCache
+
+
+class Data(object):
+    def __init__(self, name, size=1):
+        self.name = name
+        self.size = size
+
+    def GetActualMemorySize(self):
+        return self.size
+
+
+class TestTimestepCache(unittest.TestCase):
+    def setUp(self):
+        self.loaded = []
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        self.cache.shutdown()
+
+    def _loader(self, name):
+        with self.lock:
+            self.loaded.append(name)
+        return Data(name)
+
+    def test_get_reads_once_and_caches(self):
+        # Given
+        self.cache = cache = TimestepCache(self._loader, max_items=4)
+
+        # When
+        d1 = cache.get('a')
+        d2 = cache.get('a')
+
+        # Then
+        self.assertIs(d1, d2)
+        self.assertEqual(self.loaded, ['a'])
+        self.assertEqual(cache.hits, 1)
+        self.assertEqual(cache.misses, 1)
+
+    def test_least_recently_used_is_evicted(self):
+        # Given
+        self.cache = cache = TimestepCache(self._loader, max_items=2)
+
+        # When
+        cache.get('a')
+        cache.get('b')
+        cache.get('a')
+        cache.get('c')
+
+        # Then
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertIn('c', cache)
+
+    def test_memory_budget_evicts_but_keeps_latest(self):
+        # Given
+        loader = lambda name: Data(name, size=1024)
+        self.cache = cache = TimestepCache(loader, max_items=10,
+                                           max_bytes=1024*1024)
+
+        # When
+        cache.get('a')
+        cache.get('b')
+
+        # Then
+        self.assertEqual(len(cache), 1)
+        self.assertIn('b', cache)
+        self.assertEqual(cache.nbytes, 1024*1024)
+
+    def test_prefetched_data_is_not_read_again(self):
+        # Given
+        self.cache = cache = TimestepCache(self._loader, max_items=4)
+
+        # When
+        cache.prefetch(['a', 'b'])
+        a = cache.get('a')
+        b = cache.get('b')
+
+        # Then
+        self.assertEqual(a.name, 'a')
+        self.assertEqual(b.name, 'b')
+        self.assertEqual(sorted(self.loaded), ['a', 'b'])
+        self.assertEqual(cache.misses, 0)
+        self.assertEqual(cache.hits, 2)
+
+    def test_prefetch_more_than_cache_size(self):
+        # Given
+        self.cache = cache = TimestepCache(self._loader, max_items=2)
+        cache.get('a')
+
+        # When
+        cache.prefetch(['b', 'c', 'd'])
+        for key in 'bcd':
+            event = cache._pending.get(key)
+            if event is not None:
+                self.assertTrue(event.wait(10))
+
+        # Then the current and the next timesteps are kept.
+        self.assertEqual(sorted(self.loaded), ['a', 'b', 'c', 'd'])
+        self.assertIn('a', cache)
+        self.assertIn('b', cache)
+        self.assertEqual(len(cache), 2)
+
+        # When
+        b = cache.get('b')
+
+        # Then
+        self.assertEqual(b.name, 'b')
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
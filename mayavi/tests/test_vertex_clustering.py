@@ -0,0 +1,53 @@
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+# Standard library imports.
+import unittest
+
+# Local imports.
+from mayavi.core.null_engine import NullEngine
+
+# Enthought library imports
+from mayavi.filters.vertex_clustering import VertexClustering
+from mayavi.sources.vtk_data_source import VTKDataSource
+from tvtk.api import tvtk
+
+
+class TestVertexClustering(unittest.TestCase):
+
+    def setUp(self):
+        e = NullEngine()
+        e.start()
+        e.new_scene()
+        self.e = e
+
+        sphere = tvtk.SphereSource(theta_resolution=200,
+                                   phi_resolution=200)
+        sphere.update()
+        self.src = VTKDataSource(data=sphere.output)
+        e.add_source(self.src)
+
+    def tearDown(self):
+        self.e.stop()
+
+    def test_target_triangles(self):
+        f = VertexClustering(background=False, target_triangles=2000)
+        self.e.add_filter(f)
+        n = f.get_output_dataset().number_of_cells
+        self.assertTrue(1000 < n <= 2500)
+        self.assertEqual(f.number_of_triangles, n)
+
+        f.target_triangles = 10000
+        n = f.get_output_dataset().number_of_cells
+        self.assertTrue(5000 < n <= 12500)
+
+    def test_no_event_loop(self):
+        # Without an event loop the output is computed synchronously.
+        f = VertexClustering(target_triangles=2000)
+        self.assertFalse(f.background)
+        self.e.add_filter(f)
+        self.assertTrue(f.get_output_dataset().number_of_cells > 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,6 +26,27 @@ class TestVolumeWorksWithProbe(unittest.TestCase):
             np.allclose(vol.volume.center, (3.0, 3.0, 1.5)),True
         )
 
+    def test_downsample_during_interaction(self):
+        data = np.random.random((64, 64, 64))
+        vol = mlab.pipeline.volume(mlab.pipeline.scalar_field(data))
+        vol.interactive_max_voxels = 32**3
+        vm = vol.volume_mapper
+
+        vol._start_interaction()
+        self.assertTrue(vol.downsampled)
+        self.assertTrue(vm.get_input_algorithm().is_a('vtkImageResample'))
+        vm.get_input_algorithm().update()
+        self.assertEqual(tuple(vm.input.dimensions), (32, 32, 32))
+
+        vol._end_interaction()
+        self.assertFalse(vol.downsampled)
+        self.assertEqual(tuple(vm.input.dimensions), (64, 64, 64))
+
+    def test_small_volume_is_not_downsampled(self):
+        data = np.random.random((16, 16, 16))
+        vol = mlab.pipeline.volume(mlab.pipeline.scalar_field(data))
+        vol._start_interaction()
+        self.assertFalse(vol.downsampled)
 
 
 if __name__ == '__main__':
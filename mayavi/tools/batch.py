@@ -0,0 +1,263 @@
+"""
+Render many figures in parallel using a pool of off-screen worker
+processes.
+
+Every worker process starts one `OffScreenEngine` with a single figure
+that is reused for all the jobs it runs: the figure is cleared before
+each job and any other figure created by a job is closed after it.
+Jobs are distributed to the workers as they become free and the
+results are returned in the order of the inputs.  A worker that
+crashes (for example, because of a segmentation fault in VTK) or takes
+too long is replaced and only its current job fails.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+# Standard library imports.
+import os
+import time
+import traceback
+from collections import deque
+import multiprocessing
+
+
+######################################################################
+# `BatchResult` class.
+######################################################################
+class BatchResult(object):
+    """The result of one job of `render_batch`.
+
+    Attributes:
+
+    - `input`: the input the job was given.
+    - `result`: the rendered image as an array, the name of the saved
+      file or None if the job failed.
+    - `error`: the formatted traceback or a message if the job failed,
+      None otherwise.
+    - `build_time`, `render_time`: the time in seconds taken to build
+      the visualization and to render and save or grab it.
+    - `pid`: the process id of the worker that ran the job.
+    """
+
+    def __init__(self, input, result=None, error=None, build_time=0.0,
+                 render_time=0.0, pid=None):
+        self.input = input
+        self.result = result
+        self.error = error
+        self.build_time = build_time
+        self.render_time = render_time
+        self.pid = pid
+
+    @property
+    def ok(self):
+        return self.error is None
+
+    def __repr__(self):
+        status = 'ok' if self.ok else 'failed'
+        return '<BatchResult %s build=%.3fs render=%.3fs>' % (
+            status, self.build_time, self.render_time
+        )
+
+
+def _worker_main(conn, build, size):
+    """The main loop of a worker process."""
+    from mayavi import mlab
+    from mayavi.core.off_screen_engine import OffScreenEngine
+
+    engine = OffScreenEngine()
+    engine.start()
+    mlab.set_engine(engine)
+    fig = mlab.figure(size=size, engine=engine)
+    while True:
+        job = conn.recv()
+        if job is None:
+            break
+        index, arg, filename = job
+        t0 = time.time()
+        t1 = t0
+        try:
+            if fig not in engine.scenes:
+                fig = mlab.figure(size=size, engine=engine)
+            engine.current_scene = fig
+            mlab.clf(fig)
+            build(arg)
+            t1 = time.time()
+            # The job may have created its own figure.
+            current = mlab.gcf(engine)
+            if filename:
+                mlab.savefig(filename, figure=current)
+                result = filename
+            else:
+                result = mlab.screenshot(current)
+            t2 = time.time()
+            conn.send((index, result, None, t1 - t0, t2 - t1))
+        except Exception:
+            t2 = time.time()
+            conn.send((index, None, traceback.format_exc(), t1 - t0,
+                       t2 - t1))
+        for scene in list(engine.scenes):
+            if scene is not fig:
+                engine.close_scene(scene)
+    engine.stop()
+
+
+class _Worker(object):
+    """A worker process and the job it is currently running."""
+
+    def __init__(self, build, size):
+        self.conn, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_worker_main, args=(child, build, size)
+        )
+        self.process.daemon = True
+        self.process.start()
+        child.close()
+        self.job = None
+        self.started = 0.0
+
+    def submit(self, job):
+        self.job = job
+        self.started = time.time()
+        self.conn.send(job)
+
+    def stop(self):
+        try:
+            self.conn.send(None)
+        except (IOError, OSError):
+            pass
+        self.process.join(5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+    def kill(self):
+        self.process.terminate()
+        self.process.join()
+        self.conn.close()
+
+
+def _submit(workers, i, job, build, size):
+    """Submits the job to the i-th worker.  The worker is replaced first
+    if its process died while it was idle, sending to it then fails.
+    """
+    try:
+        workers[i].submit(job)
+    except (IOError, OSError):
+        workers[i].kill()
+        workers[i] = _Worker(build, size)
+        workers[i].submit(job)
+
+
+def render_batch(build, inputs, n_processes=None, size=(400, 350),
+                 directory=None, file_pattern='image%05d.png',
+                 timeout=None, callback=None):
+    """Renders one figure per input in parallel worker processes.
+
+    **Parameters**
+
+    :build: a function called with one input that builds the
+            visualization using mlab in the current figure, or in a
+            new figure which is then the one saved.  It must be
+            picklable, i.e. defined at the top level of a module.
+
+    :inputs: a sequence of inputs, one per figure to render.
+
+    :n_processes: the number of worker processes, defaults to the
+                  number of CPUs.
+
+    :size: the size of the figures.
+
+    :directory: if given the figures are saved in this directory with
+                names given by `file_pattern` % index and the results
+                are the file names.  Otherwise the images are returned
+                as arrays (see `mlab.screenshot`).
+
+    :timeout: the maximum time in seconds for one job.  The worker
+              running a job that takes longer is killed and replaced.
+
+    :callback: called with the index and the `BatchResult` of every
+               job as it finishes.
+
+    **Returns**
+
+    A list of `BatchResult` objects in the order of the inputs.
+    Failed jobs have their `error` attribute set instead of raising.
+
+    **Example**
+
+    ::
+
+        def build(phase):
+            x, y = np.mgrid[-3:3:100j, -3:3:100j]
+            mlab.surf(x, y, np.sin(x*y + phase))
+
+        results = render_batch(build, np.linspace(0, 2*np.pi, 100),
+                               directory='frames')
+    """
+    inputs = list(inputs)
+    n_jobs = len(inputs)
+    if n_processes is None:
+        n_processes = multiprocessing.cpu_count()
+    n_processes = max(1, min(n_processes, n_jobs))
+    if directory is not None and not os.path.exists(directory):
+        os.makedirs(directory)
+
+    pending = deque()
+    for index, arg in enumerate(inputs):
+        if directory is not None:
+            filename = os.path.join(directory, file_pattern % index)
+        else:
+            filename = None
+        pending.append((index, arg, filename))
+
+    results = [None]*n_jobs
+
+    def _finish(index, result):
+        results[index] = result
+        if callback is not None:
+            callback(index, result)
+
+    workers = [_Worker(build, size) for i in range(n_processes)]
+    try:
+        while pending or any(w.job is not None for w in workers):
+            for i, worker in enumerate(workers):
+                if worker.job is None:
+                    if pending:
+                        _submit(workers, i, pending.popleft(), build, size)
+                    continue
+                index, arg = worker.job[:2]
+                if worker.conn.poll(0.01):
+                    try:
+                        msg = worker.conn.recv()
+                    except EOFError:
+                        msg = None
+                    if msg is not None:
+                        index, result, error, t_build, t_render = msg
+                        _finish(index, BatchResult(
+                            arg, result, error, t_build, t_render,
+                            worker.process.pid
+                        ))
+                        worker.job = None
+                        continue
+                elapsed = time.time() - worker.started
+                crashed = not worker.process.is_alive()
+                timed_out = timeout is not None and elapsed > timeout
+                if crashed or timed_out:
+                    if crashed:
+                        error = 'Worker process died with exit code %s' % \
+                            worker.process.exitcode
+                    else:
+                        error = 'Job timed out after %.1f seconds' % elapsed
+                    _finish(index, BatchResult(
+                        arg, None, error, pid=worker.process.pid
+                    ))
+                    worker.kill()
+                    workers[i] = _Worker(build, size)
+    finally:
+        for worker in workers:
+            if worker.job is None:
+                worker.stop()
+            else:
+                worker.kill()
+    return results
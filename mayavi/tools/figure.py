@@ -11,6 +11,7 @@ Functions related to creating the engine or the figures.
 import gc
 import warnings
 import copy
+import weakref
 
 import numpy as np
 
@@ -30,6 +31,9 @@ from .engine_manager import get_engine, options, set_engine
 # A list to store the allocated scene numbers
 __scene_number_list = set((0,))
 
+# The VTK arrays reused by `screenshot` for each figure.
+_screenshot_buffers = weakref.WeakKeyDictionary()
+
 
 def figure(figure=None, bgcolor=None, fgcolor=None, engine=None,
            size=(400, 350)):
@@ -190,11 +194,12 @@ def draw(figure=None):
     """
     if figure is None:
         figure = gcf()
-    figure.render()
+    if figure.scene is not None:
+        figure.scene.render(now=True)
 
 
 def savefig(filename, size=None, figure=None, magnification='auto',
-            **kwargs):
+            tiled=False, **kwargs):
     """ Save the current scene.
         The output format are deduced by the extension to filename.
         Possibilities are png, jpg, bmp, tiff, ps, eps, pdf, rib (renderman),
@@ -216,6 +221,13 @@ def savefig(filename, size=None, figure=None, magnification='auto',
                         Mayavi will use the given size as a screen size,
                         and the file size will be 'magnification * size'.
 
+        :tiled: render the image in window sized tiles without resizing
+                the window and stream them to the file.  This keeps the
+                memory used bounded and allows for very large images.
+                Only raster image formats are supported and `size` is
+                the size of the saved image.  2D actors such as text
+                and color bars are repeated in every tile.
+
         **Notes**
 
         If the size specified is larger than the window size, and no
@@ -230,6 +242,14 @@ def savefig(filename, size=None, figure=None, magnification='auto',
     """
     if figure is None:
         figure = gcf()
+    if tiled:
+        from tvtk.pyface.tiled_renderer import save_tiled
+        if size is None:
+            mag = 1 if magnification == 'auto' else int(magnification)
+            x, y = tuple(figure.scene.render_window.size)
+            size = (x*mag, y*mag)
+        save_tiled(figure.scene, filename, size)
+        return
     current_mag = figure.scene.magnification
     try:
         if size is not None:
@@ -259,23 +279,36 @@ def sync_camera(reference_figure, target_figure):
         'active_camera', target_figure.scene._renderer
     )
     target_figure.scene._renderer.active_camera.on_trait_change(
-            lambda: do_later(target_figure.scene.render)
+            lambda: do_later(target_figure.scene.render, now=True)
     )
 
 
-def screenshot(figure=None, mode='rgb', antialiased=False):
+def screenshot(figure=None, mode='rgb', antialiased=False, out=None,
+               reuse_buffer=False):
     """ Return the current figure pixmap as an array.
 
         **Parameters**
 
         :figure: a figure instance or None, optional
             If specified, the figure instance to capture the view of.
-        :mode: {'rgb', 'rgba'}
-            The color mode of the array captured.
+        :mode: {'rgb', 'rgba', 'rgba_uint8', 'depth'}
+            The color mode of the array captured.  'rgb' and
+            'rgba_uint8' give uint8 arrays, 'rgba' gives floats between
+            0 and 1 and 'depth' gives the (y, x) float depth buffer.
         :antialiased: {True, False}
             Use anti-aliasing for rendering the screenshot.
             Uses the number of aa frames set by
             figure.scene.anti_aliasing_frames
+        :out: array, optional
+            An array of the right shape and dtype, uint8 for 'rgb' and
+            'rgba_uint8' and float32 for 'rgba' and 'depth', to store the
+            result in.  No new array is allocated in this case and `out`
+            is returned.
+        :reuse_buffer: {False, True}
+            Reuse the buffer of the previous screenshot of this figure
+            with the same mode.  The returned array is then overwritten
+            by the next such call.  This is useful when grabbing many
+            frames, especially combined with `out`.
 
         **Notes**
 
@@ -284,6 +317,10 @@ def screenshot(figure=None, mode='rgb', antialiased=False):
         will capture the other window. This limitation is due to the
         heavy use of the hardware graphics system.
 
+        The returned array is a vertically flipped view of the grabbed
+        pixels, use `numpy.ascontiguousarray` if a contiguous array is
+        needed.
+
         **Examples**
 
         This function can be useful for integrating 3D plotting with
@@ -306,49 +343,84 @@ def screenshot(figure=None, mode='rgb', antialiased=False):
 
     # Try to lift the window
     figure.scene._lift()
+    render_window = figure.scene.render_window
     if mode == 'rgb':
-        out = tvtk.UnsignedCharArray()
         shape = (y, x, 3)
-        pixel_getter = figure.scene.render_window.get_pixel_data
-        if vtk_major_version > 7:
-            pg_args = (0, 0, x - 1, y - 1, 1, out, 0)
-        else:
-            pg_args = (0, 0, x - 1, y - 1, 1, out)
-
+        pixel_getter = render_window.get_pixel_data
     elif mode == 'rgba':
-        out = tvtk.FloatArray()
         shape = (y, x, 4)
-        pixel_getter = figure.scene.render_window.get_rgba_pixel_data
-        if vtk_major_version > 7:
-            pg_args = (0, 0, x - 1, y - 1, 1, out, 0)
-        else:
-            pg_args = (0, 0, x - 1, y - 1, 1, out)
-
+        pixel_getter = render_window.get_rgba_pixel_data
+    elif mode == 'rgba_uint8':
+        shape = (y, x, 4)
+        pixel_getter = render_window.get_rgba_char_pixel_data
+    elif mode == 'depth':
+        shape = (y, x)
+        pixel_getter = render_window.get_zbuffer_data
     else:
         raise ValueError('mode type not understood')
 
+    buf = _get_screenshot_buffer(figure, mode, reuse_buffer)
+    if mode == 'depth':
+        pg_args = (0, 0, x - 1, y - 1, buf)
+    elif vtk_major_version > 7:
+        pg_args = (0, 0, x - 1, y - 1, 1, buf, 0)
+    else:
+        pg_args = (0, 0, x - 1, y - 1, 1, buf)
+
     if antialiased:
         # save the current aa value to restore it later
-        render_window = figure.scene.render_window
         if hasattr(render_window, 'aa_frames'):
             old_aa = render_window.aa_frames
             render_window.aa_frames = figure.scene.anti_aliasing_frames
         else:
             old_aa = render_window.multi_samples
             render_window.multi_samples = figure.scene.anti_aliasing_frames
-        figure.scene.render()
+        figure.scene.render(now=True)
         pixel_getter(*pg_args)
         if hasattr(render_window, 'aa_frames'):
             render_window.aa_frames = old_aa
         else:
             render_window.multi_samples = old_aa
-        figure.scene.render()
+        figure.scene.render(now=True)
 
     else:
+        if figure.scene.coalesce_render:
+            # Do the deferred render, if any, before grabbing the pixels.
+            figure.scene.render(now=True)
         pixel_getter(*pg_args)
 
-    # Return the array in a way that pylab.imshow plots it right:
-    out = out.to_array()
-    out.shape = shape
-    out = np.flipud(out)
-    return out
+    # Return the array in a way that pylab.imshow plots it right.  This
+    # is a view of the VTK array, no copy is made.
+    result = buf.to_array()
+    result.shape = shape
+    result = result[::-1]
+    if out is not None:
+        if out.shape != shape:
+            raise ValueError('out has shape %s, expected %s' %
+                             (out.shape, shape))
+        if out.dtype != result.dtype:
+            raise ValueError('out has dtype %s, expected %s' %
+                             (out.dtype, result.dtype))
+        out[...] = result
+        return out
+    return result
+
+
+def _get_screenshot_buffer(figure, mode, reuse):
+    """Returns the VTK array to grab the pixels of the given figure in.
+    When `reuse` is True the array is cached per figure and mode.  VTK
+    only reallocates it when the size of the window changes.
+    """
+    if mode in ('rgba', 'depth'):
+        klass = tvtk.FloatArray
+    else:
+        klass = tvtk.UnsignedCharArray
+    if not reuse:
+        return klass()
+    buffers = _screenshot_buffers.get(figure)
+    if buffers is None:
+        buffers = _screenshot_buffers[figure] = {}
+    buf = buffers.get(mode)
+    if buf is None:
+        buf = buffers[mode] = klass()
+    return buf
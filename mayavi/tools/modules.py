@@ -173,6 +173,11 @@ class ContourModuleFactory(DataModuleFactory):
                     contours. Specifying a list of values will only
                     give the requested contours asked for.""")
 
+    contour_algorithm = Enum('auto', 'generic', 'flying_edges',
+                        'linear_grid', adapts='contour.algorithm',
+                        desc="""the contouring algorithm, by default the
+                        fastest one available for the input data""")
+
     def _contours_changed(self):
         contour_list = True
         try:
@@ -256,6 +261,11 @@ class VectorsFactory(DataModuleFactory):
                         "to reduce the number of points displayed "
                         "on large datasets")
 
+    instanced = Bool(False, adapts='glyph.instanced',
+                    desc="if the glyphs are drawn by instancing the glyph "
+                    "on the GPU instead of copying it for every point. "
+                    "This uses much less memory for many points.")
+
     def _resolution_changed(self):
         glyph = self._target.glyph.glyph_source.glyph_source
         if hasattr(glyph, 'theta_resolution'):
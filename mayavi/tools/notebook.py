@@ -4,6 +4,8 @@ from __future__ import print_function
 
 import base64
 from itertools import count
+from os.path import dirname, exists, join
+import warnings
 
 from tvtk.api import tvtk
 from tvtk.common import configure_input
@@ -13,22 +15,26 @@ _backend = 'ipy'
 _width = None
 _height = None
 _local = True
+_embed = True
 _widget_manager = None
 _counter = count()
 
 
-def init(backend='ipy', width=None, height=None, local=True):
+def init(backend='ipy', width=None, height=None, local=True, embed=True):
     """Initialize a suitable backend for Jupyter notebooks.
 
     **Parameters**
 
-    backend :str: one of ('png', 'x3d', 'ipy')
+    backend :str: one of ('png', 'x3d', 'gltf', 'ipy')
     width :int: suggested default width of the element
     height :int: suggested default height of the element
-    local :bool: Use local copy of x3dom.js instead of online version.
+    local :bool: Use local copy of x3dom.js, or of model-viewer.min.js
+                 for the 'gltf' backend, instead of online version.
+    embed :bool: Embed the binary glTF scenes in the notebook instead of
+                 saving them to files next to it.
     """
-    global _backend, _width, _height, _local, _widget_manager
-    backends = ('png', 'x3d', 'ipy')
+    global _backend, _width, _height, _local, _embed, _widget_manager
+    backends = ('png', 'x3d', 'gltf', 'ipy')
     error_msg = "Backend must be one of %r, got %s" % (backends, backend)
     assert backend in backends, error_msg
     from mayavi import mlab
@@ -36,6 +42,7 @@ def init(backend='ipy', width=None, height=None, local=True):
     _backend = backend
     _width, _height = width, height
     _local = local
+    _embed = embed
     if backend == 'ipy':
         _setup_widget_manager()
     _monkey_patch_for_ipython()
@@ -70,6 +77,8 @@ def _ipython_display_(self):
         return idisplay(HTML(scene_to_png(scene)))
     elif _backend == 'x3d':
         return idisplay(HTML(scene_to_x3d(scene)))
+    elif _backend == 'gltf':
+        return idisplay(HTML(scene_to_gltf(scene)))
     elif _backend == 'ipy':
         return idisplay(scene_to_ipy(scene))
 
@@ -132,6 +141,56 @@ def scene_to_x3d(scene):
     return html
 
 
+def scene_to_gltf(scene):
+    """Returns the HTML to show the scene as a binary glTF model with
+    the positions and normals quantized to integers.  This is much more
+    compact than the X3D text.  The model is embedded in the HTML unless
+    `init` was called with `embed=False` in which case it is saved in
+    the current directory.
+    """
+    from tvtk.pyface.gltf_exporter import scene_to_glb
+    data = scene_to_glb(scene)
+    if _embed:
+        src = 'data:model/gltf-binary;base64,%s' % (
+            base64.b64encode(data).decode('ascii')
+        )
+    else:
+        src = 'mayavi_scene_%d.glb' % next(_counter)
+        with open(src, 'wb') as fp:
+            fp.write(data)
+    style = 'background-color: rgb(%d, %d, %d);' % tuple(
+        int(255*c) for c in scene.background
+    )
+    if _width is not None:
+        style += ' width: %dpx;' % _width
+    if _height is not None:
+        style += ' height: %dpx;' % _height
+    url_base = "https://unpkg.com/@google/model-viewer/dist"
+    if _local:
+        static = join(dirname(__file__), 'static', 'gltf',
+                      'model-viewer.min.js')
+        if exists(static):
+            url_base = "nbextensions/mayavi/gltf"
+        else:
+            warnings.warn(
+                'No local copy of model-viewer.min.js in %s, using the '
+                'online version.' % dirname(static)
+            )
+    html = '''
+    <script type="text/javascript">
+    if (document.getElementById("model-viewer-js") === null) {
+        var s = document.createElement("script");
+        s.setAttribute("type", "module");
+        s.setAttribute("src", require.toUrl("%s/model-viewer.min.js"));
+        s.setAttribute("id", "model-viewer-js");
+        document.head.appendChild(s);
+    }
+    </script>
+    <model-viewer src="%s" camera-controls style="%s"></model-viewer>
+    ''' % (url_base, src, style)
+    return html
+
+
 def scene_to_png(scene):
     w2if = tvtk.WindowToImageFilter()
     w2if.input = scene.render_window
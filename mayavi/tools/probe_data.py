@@ -8,6 +8,7 @@ import numpy as np
 from tvtk.api import tvtk
 from . import tools
 import tvtk.common as tvtk_common
+from mayavi.core.locator_cache import set_cell_locator
 
 def probe_data(mayavi_object, x, y, z, type='scalars', location='points'):
     """ Retrieve the data from a described by Mayavi visualization object
@@ -51,6 +52,9 @@ def probe_data(mayavi_object, x, y, z, type='scalars', location='points'):
     probe = tvtk.ProbeFilter()
     tvtk_common.configure_input_data(probe, probe_data)
     tvtk_common.configure_source_data(probe, dataset)
+    # Repeated probes of a large mesh share the same cell locator.
+    set_cell_locator(probe, dataset,
+                     owner=getattr(mayavi_object, 'scene', None))
     probe.update()
 
     if location == 'points':
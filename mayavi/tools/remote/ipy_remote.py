@@ -1,6 +1,6 @@
 import base64
 from IPython.display import display
-from ipywidgets import Image
+from ipywidgets import Box, GridBox, Image, Layout
 from ipyevents import Event
 
 from .bridge import LocalBridge
@@ -20,8 +20,15 @@ class IPyRemoteWidget(RemoteWidget):
     def __init__(self, scene_proxy, bridge, *args, **kw):
         super(IPyRemoteWidget, self).__init__(scene_proxy, bridge, *args, **kw)
         self.image = Image(format='PNG')
+        # The image widgets of the tiles, keyed on the column and row of
+        # the tile counted from the bottom, when the 'tiles' transport is
+        # used.
+        self._tiles = None
+        self._tile_shape = None
+        self._tile_frame = None
+        self.view = Box(children=[self.image])
         self.event = Event(
-            source=self.image,
+            source=self.view,
             watched_events=[
                 'dragstart', 'mouseenter', 'mouseleave',
                 'mousedown', 'mouseup', 'mousemove', 'wheel',
@@ -33,7 +40,7 @@ class IPyRemoteWidget(RemoteWidget):
         self._update_image()
 
     def _ipython_display_(self):
-        display(self.image)
+        display(self.view)
 
     # ###### Public protocol ##############
 
@@ -41,14 +48,35 @@ class IPyRemoteWidget(RemoteWidget):
         pass
 
     def show_image(self, data, format='PNG'):
+        if self._tiles is not None:
+            self._tiles = None
+            self.view.children = [self.image]
         self.image.format = format
         self.image.value = data
 
     # ##### VTK Event handling ##########
     def on_render(self, data):
+        if 'width' in data:
+            # Downsampled frames are stretched to the size of the scene.
+            self.image.width = str(data['width'])
+            self.image.height = str(data['height'])
         self.show_image(base64_to_bytes(data['data']),
                         format=data.get('format', 'PNG'))
 
+    def on_render_tiles(self, data):
+        # Every tile is shown in its own image widget so only the changed
+        # tiles are sent to the browser, which decodes them.
+        if data['keyframe']:
+            self._setup_tiles(data)
+        elif self._tiles is None or data['frame'] != self._tile_frame + 1:
+            self.scene_proxy.request_keyframe()
+            return
+        self._tile_frame = data['frame']
+        ts = data['tile_size']
+        tiles = self._tiles
+        for x, y, w, h, tile in data['tiles']:
+            tiles[x//ts, y//ts].value = base64_to_bytes(tile)
+
     def on_cursor_changed(self, data):
         # self.setCursor(cursor)
         pass
@@ -93,9 +121,41 @@ class IPyRemoteWidget(RemoteWidget):
             key_sym = key
             self.on_key_release(ctrl, shift, key)
 
+    # #### Private protocol ############
+
+    def _setup_tiles(self, data):
+        nx, ny, ts = data['width'], data['height'], data['tile_size']
+        if self._tiles is not None and self._tile_shape == (nx, ny, ts):
+            return
+        widths = [min(ts, nx - x) for x in range(0, nx, ts)]
+        heights = [min(ts, ny - y) for y in range(0, ny, ts)]
+        tiles = {}
+        children = []
+        # The rows of the frame are from the bottom to the top.
+        for j in reversed(range(len(heights))):
+            for i, w in enumerate(widths):
+                image = Image(
+                    format='PNG',
+                    layout=Layout(width='%dpx' % w,
+                                  height='%dpx' % heights[j])
+                )
+                tiles[i, j] = image
+                children.append(image)
+        columns = ' '.join('%dpx' % w for w in widths)
+        rows = ' '.join('%dpx' % h for h in reversed(heights))
+        grid = GridBox(children=children, layout=Layout(
+            grid_template_columns=columns, grid_template_rows=rows,
+            grid_gap='0px'
+        ))
+        self._tiles = tiles
+        self._tile_shape = (nx, ny, ts)
+        self.view.children = [grid]
+
 
 class WidgetManager(object):
-    def __init__(self):
+    def __init__(self, frame_transport='image'):
+        # The `RemoteScene.frame_transport` of the scenes shown.
+        self.frame_transport = frame_transport
         self.sm = SceneManager()
         # FIXME: we need a way to set the SceneManager.call_later.
         # not sure what sort of event loop we can rely on with IPython.
@@ -113,6 +173,7 @@ class WidgetManager(object):
             return self.widgets[sid]
         else:
             scene = sm.scenes[sid]
+            scene.frame_transport = self.frame_transport
             w = IPyRemoteWidget(scene, self.bridge)
             self.widgets[sid] = w
             return w
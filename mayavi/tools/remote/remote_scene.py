@@ -1,15 +1,21 @@
 from __future__ import print_function
 import base64
 from collections import namedtuple
+import threading
 import time
+import zlib
 
-from traits.api import (Any, Bool, Dict, Enum, Event, HasTraits,
+import numpy as np
+from traits.api import (Any, Bool, Dict, Enum, Event, Float, HasTraits,
                         Instance, Int, List, Callable)
 import vtk
+from vtk.util.numpy_support import vtk_to_numpy
 
 from tvtk.api import tvtk
+from tvtk.pyface.frame_writer import frame_to_image, _set_input_data
 from ..figure import figure, gcf
 from ..engine_manager import options
+from .tile_codec import TileEncoder
 from tvtk.tvtk_base import global_disable_update
 
 options.offscreen = True
@@ -34,10 +40,48 @@ class ImageEncoder(HasTraits):
     quality = Int(60)
     compress = Bool(False)
 
+    #: Use the adaptive streaming mode.  While the user interacts, frames
+    # are sent as downsampled JPEG images whose quality is chosen so that
+    # rendering and encoding a frame takes about `frame_budget` seconds.
+    # A lossless frame is sent when the interaction ends.
+    adaptive = Bool(False)
+
+    #: True while the user is interacting with the scene.
+    interacting = Bool(False)
+
+    #: The time in seconds that rendering and encoding a frame should take
+    # during interaction.
+    frame_budget = Float(0.05)
+
+    #: The range of the JPEG quality used during interaction.
+    min_quality = Int(20)
+    max_quality = Int(85)
+
+    #: The largest downsampling step used during interaction.
+    max_step = Int(4)
+
+    #: The current JPEG quality and downsampling step used during
+    # interaction.
+    interactive_quality = Int(60)
+    interactive_step = Int(1)
+
     _png_writer = Instance(tvtk.ImageWriter)
     _jpg_writer = Instance(tvtk.ImageWriter)
 
     # ---- Public protocol -------
+    def __init__(self, **traits):
+        super(ImageEncoder, self).__init__(**traits)
+        # The raw VTK writers of each thread encoding frames.
+        self._local = threading.local()
+        # The frame waiting to be encoded, the last result and the state
+        # of the worker thread.
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._next_frame = None
+        self._result = None
+        self._busy = False
+        self._thread = None
+
     def get_raw_image(self):
         '''Returns the raw bytes of the image.
         '''
@@ -45,7 +89,92 @@ class ImageEncoder(HasTraits):
         w = self.writer
         w.update()
         w.write()
-        return w.result.to_array().tostring()
+        return w.result.to_array().tobytes()
+
+    def grab_frame(self):
+        '''Returns a copy of the pixels of the scene as a (ny, nx, 3) uint8
+        array with the rows from bottom to top.
+        '''
+        w2if = self.w2if
+        w2if.modified()
+        w2if.update()
+        out = tvtk.to_vtk(w2if.output)
+        nx, ny = out.GetDimensions()[:2]
+        data = vtk_to_numpy(out.GetPointData().GetScalars())
+        return data.reshape(ny, nx, -1).copy()
+
+    def encode(self, frame, lossless=True):
+        '''Encodes a frame from `grab_frame` and returns the tuple
+        `(data, format)`.  Lossless frames are encoded as PNG, others are
+        downsampled by `interactive_step` and encoded as JPEG with the
+        `interactive_quality`.  This may be called from any thread.
+        '''
+        writers = self._local.__dict__
+        if lossless:
+            format = 'PNG'
+        else:
+            format = 'JPEG'
+            step = self.interactive_step
+            if step > 1:
+                frame = np.ascontiguousarray(frame[::step, ::step])
+        writer = writers.get(format)
+        if writer is None:
+            if lossless:
+                writer = vtk.vtkPNGWriter()
+            else:
+                writer = vtk.vtkJPEGWriter()
+            writer.SetWriteToMemory(1)
+            writers[format] = writer
+        if not lossless:
+            writer.SetQuality(self.interactive_quality)
+        _set_input_data(writer, frame_to_image(frame))
+        writer.Write()
+        return vtk_to_numpy(writer.GetResult()).tobytes(), format
+
+    def submit(self, frame, lossless=True):
+        '''Encodes the frame on a worker thread.  The result is obtained
+        with `poll`.  A frame still waiting to be encoded when a new one is
+        submitted is dropped.
+        '''
+        with self._lock:
+            self._next_frame = (frame, lossless)
+            self._busy = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker)
+                self._thread.daemon = True
+                self._thread.start()
+        self._wakeup.set()
+
+    def poll(self):
+        '''Returns `(result, busy)` where result is None or a tuple
+        `(data, format, encode_time, size)` of the last frame encoded by
+        the worker thread and `busy` is True if frames are still being
+        encoded.  The result is only returned once.
+        '''
+        with self._lock:
+            result, self._result = self._result, None
+            return result, self._busy
+
+    def update_timing(self, time_to_render, time_for_image):
+        '''Adapts the quality and downsampling of the interactive frames to
+        the measured times of the last frame.
+        '''
+        total = time_to_render + time_for_image
+        if total > self.frame_budget:
+            # Too slow: first lower the quality, then the resolution.
+            if self.interactive_quality > self.min_quality:
+                self.interactive_quality = max(
+                    self.interactive_quality - 10, self.min_quality
+                )
+            elif self.interactive_step < self.max_step:
+                self.interactive_step += 1
+        elif total < 0.5*self.frame_budget:
+            if self.interactive_step > 1:
+                self.interactive_step -= 1
+            elif self.interactive_quality < self.max_quality:
+                self.interactive_quality = min(
+                    self.interactive_quality + 10, self.max_quality
+                )
 
     # ---- Private protocol -------
     def _w2if_default(self):
@@ -88,6 +217,27 @@ class ImageEncoder(HasTraits):
         else:
             self.image_type = 'png'
 
+    def _worker(self):
+        while True:
+            self._wakeup.wait()
+            with self._lock:
+                self._wakeup.clear()
+                job, self._next_frame = self._next_frame, None
+                if job is None:
+                    self._busy = False
+                    continue
+            frame, lossless = job
+            start = time.time()
+            try:
+                data, format = self.encode(frame, lossless)
+                result = (data, format, time.time() - start,
+                          frame.shape[1::-1])
+            except Exception:
+                result = None
+            with self._lock:
+                self._result = result
+                self._busy = self._next_frame is not None
+
 
 class RemoteScene(HasTraits):
 
@@ -103,6 +253,14 @@ class RemoteScene(HasTraits):
     #: The image encoder which converts the scene to a suitable image.
     image_encoder = Instance(ImageEncoder)
 
+    #: How the frames are sent.  With 'tiles' only the tiles of the frame
+    # that changed are sent (see `tile_codec`), otherwise the whole frame
+    # is sent as an image.
+    frame_transport = Enum('image', 'tiles')
+
+    #: The encoder used for the 'tiles' transport.
+    tile_encoder = Instance(TileEncoder, ())
+
     def __init__(self, figure=None, **traits):
         super(RemoteScene, self).__init__(**traits)
         if figure is None:
@@ -123,6 +281,11 @@ class RemoteScene(HasTraits):
         self._pending_render = False
         self._doing_render = False
         self._timer_enabled = True
+        # State of the adaptive streaming mode.
+        self._last_frame_key = None
+        self._last_frame_lossless = True
+        self._grab_time = 0
+        self._collecting = False
         self._setup_scene()
 
     # ## Public protocol ####
@@ -138,6 +301,13 @@ class RemoteScene(HasTraits):
         data = self.get_raw_image()
         return encode_func(data).decode('ascii')
 
+    def request_keyframe(self):
+        '''Sends all the tiles of the current frame.  Called by the widgets
+        when they cannot decode a frame.
+        '''
+        self.tile_encoder.reset()
+        self._send_tiles()
+
     def call_rwi(self, method, *args):
         if method == 'SetSize':
             # This is an issue with the way TVTK is setup and how VTK resizes
@@ -155,13 +325,24 @@ class RemoteScene(HasTraits):
                 self.trw.size = args
                 self.trw.render()
 
-        if 'PressEvent' in method:
-            self.image_encoder.compress = True
-        if 'ReleaseEvent' in method:
-            self.image_encoder.compress = False
+        encoder = self.image_encoder
+        if encoder.adaptive:
+            if 'PressEvent' in method:
+                encoder.interacting = True
+        else:
+            if 'PressEvent' in method:
+                encoder.compress = True
+            if 'ReleaseEvent' in method:
+                encoder.compress = False
 
         getattr(self.rwi, method)(*args)
 
+        if encoder.adaptive and 'ReleaseEvent' in method:
+            encoder.interacting = False
+            if not self._last_frame_lossless:
+                # The scene is idle, replace the last lossy frame.
+                self._send_adaptive_frame(lossless=True)
+
     # ## Private protocol ####
 
     def _send_pending_render(self):
@@ -208,6 +389,12 @@ class RemoteScene(HasTraits):
             self._pending_render = True
 
     def _send_render_event(self):
+        if self.frame_transport == 'tiles':
+            self._send_tiles()
+            return
+        if self.image_encoder.adaptive:
+            self._send_adaptive_frame()
+            return
         self._pending_render = False
         event = 'RenderEvent'
         start = time.time()
@@ -228,6 +415,86 @@ class RemoteScene(HasTraits):
                 self.id, self.rw.GetClassName(), event, data
             )
 
+    def _send_adaptive_frame(self, lossless=None):
+        self._pending_render = False
+        encoder = self.image_encoder
+        if lossless is None:
+            lossless = not encoder.interacting
+        start = time.time()
+        self._doing_render = True
+        try:
+            frame = encoder.grab_frame()
+        finally:
+            self._doing_render = False
+        self._grab_time = time.time() - start
+        self._time_to_render = self.ren.GetLastRenderTimeInSeconds()
+        key = (zlib.adler32(frame.data), frame.shape, lossless)
+        if key == self._last_frame_key:
+            # Nothing changed since the last frame that was sent.
+            self._last_render = time.time()
+            return
+        self._last_frame_key = key
+        self._last_frame_lossless = lossless
+        if self.call_later:
+            # Encode in the background, the UI thread only grabs the
+            # pixels.
+            encoder.submit(frame, lossless)
+            if not self._collecting:
+                self._collecting = True
+                self.call_later(0.005, self._collect_frame)
+        else:
+            data, format = encoder.encode(frame, lossless)
+            self._emit_frame(data, format, time.time() - start,
+                             frame.shape[1::-1])
+
+    def _collect_frame(self):
+        result, busy = self.image_encoder.poll()
+        if result is not None:
+            data, format, encode_time, size = result
+            self._emit_frame(data, format, self._grab_time + encode_time,
+                             size)
+        if busy:
+            self.call_later(0.005, self._collect_frame)
+        else:
+            self._collecting = False
+
+    def _emit_frame(self, data, format, time_for_image, size):
+        img = encode_func(data).decode('ascii')
+        self._render_size = len(img)
+        self._last_render = time.time()
+        self._time_for_image = time_for_image
+        encoder = self.image_encoder
+        if format == 'JPEG':
+            encoder.update_timing(self._time_to_render, time_for_image)
+        data = dict(data=img, type='image', format=format,
+                    time=time_for_image, render_time=self._time_to_render,
+                    width=int(size[0]), height=int(size[1]))
+        self._last_image = img
+        self.event = EventInfo(
+            self.id, self.rw.GetClassName(), 'RenderEvent', data
+        )
+
+    def _send_tiles(self):
+        self._pending_render = False
+        start = time.time()
+        self._doing_render = True
+        try:
+            frame = self.image_encoder.grab_frame()
+        finally:
+            self._doing_render = False
+        data = self.tile_encoder.encode(frame)
+        self._last_render = time.time()
+        self._time_for_image = self._last_render - start
+        self._time_to_render = self.ren.GetLastRenderTimeInSeconds()
+        if data is None:
+            return
+        self._render_size = sum(len(tile[-1]) for tile in data['tiles'])
+        data.update(time=self._time_for_image,
+                    render_time=self._time_to_render)
+        self.event = EventInfo(
+            self.id, self.rw.GetClassName(), 'RenderEvent', data
+        )
+
     def _setup_scene(self):
         self.trwi.interactor_style.set_current_style_to_trackball_camera()
         self.rwi.AddObserver('CreateTimerEvent', self._on_create_timer)
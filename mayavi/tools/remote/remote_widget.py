@@ -1,5 +1,7 @@
 import imghdr
 
+from .tile_codec import TileDecoder, frame_to_png
+
 
 class RemoteWidget(object):
     """An abstract remote widget which talks to the bridge but has no toolkit
@@ -26,6 +28,7 @@ class RemoteWidget(object):
         self._wheelDelta = 0
         self._is_resizing = False
         self._move_count = 0
+        self._tile_decoder = TileDecoder()
 
         # Note that since this is just a raw image sent by the server we do
         # not need to worry about the pixel ratio for this case unlike
@@ -35,7 +38,11 @@ class RemoteWidget(object):
 
     def handle_vtk_event(self, obj_name, vtk_event, data):
         if vtk_event == 'RenderEvent':
-            if not self._is_resizing:
+            if self._is_resizing:
+                pass
+            elif data.get('type') == 'tiles':
+                self.on_render_tiles(data)
+            else:
                 self.on_render(data)
         elif vtk_event == 'CursorChangedEvent':
             self.on_cursor_changed(data)
@@ -57,6 +64,25 @@ class RemoteWidget(object):
     def on_render(self, data):
         pass
 
+    def on_render_tiles(self, data):
+        '''Called with the changed tiles of a frame sent with the 'tiles'
+        transport.  By default the frame is rebuilt and `on_render_frame`
+        called, toolkits which can draw the tiles separately override
+        this.
+        '''
+        frame = self._tile_decoder.decode(data)
+        if frame is None:
+            self.scene_proxy.request_keyframe()
+        else:
+            self.on_render_frame(frame)
+
+    def on_render_frame(self, frame):
+        '''Called with the frame rebuilt from the changed tiles as a
+        (ny, nx, n_components) uint8 array with the rows from bottom to top.
+        Override this to draw the array directly.
+        '''
+        self.show_image(frame_to_png(frame), format='PNG')
+
     def on_cursor_changed(self, data):
         pass
 
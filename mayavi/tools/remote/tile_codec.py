@@ -0,0 +1,193 @@
+"""Encode frames as the tiles that changed since the previous frame.
+
+The `TileEncoder` is used by the `RemoteScene` to send only the parts of
+the window that changed, with a full keyframe from time to time and
+whenever the size of the window changes.  The tiles are PNG images so
+that a browser can draw them as they are, the `IPyRemoteWidget` shows
+every tile in its own image widget and only the changed tiles are sent
+to the notebook.  The `TileDecoder` is used by the other remote widgets
+to rebuild the frames.  Only numpy and the standard library are needed
+so the widget side does not need VTK.
+
+A frame is a (ny, nx, n_components) uint8 array with the rows from
+bottom to top as grabbed from a VTK render window.  An encoded frame is
+a dictionary with the keys:
+
+- `type`: always 'tiles'.
+- `frame`: the number of the frame, consecutive since the keyframe.
+- `keyframe`: True if all the tiles of the frame are included.
+- `width`, `height`, `components`: the shape of the frame.
+- `tile_size`: the size of the tiles, those of the last row and column
+  may be smaller.
+- `tiles`: a list of `(x, y, w, h, data)` tuples with the position and
+  size of the tile, counted from the bottom left corner, and the tile as
+  a base64 encoded PNG image.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import base64
+import struct
+import zlib
+
+import numpy as np
+
+
+_PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+_COLOR_TYPES = {1: 0, 3: 2, 4: 6}
+
+
+def frame_to_png(frame, compression=6):
+    """Returns the bytes of a PNG image of a frame with the rows from
+    bottom to top.
+    """
+    ny, nx, nc = frame.shape
+    color_type = _COLOR_TYPES[nc]
+    data = np.empty((ny, nx*nc + 1), dtype=np.uint8)
+    # Filter type 0 (none) for every row.
+    data[:, 0] = 0
+    data[:, 1:] = frame[::-1].reshape(ny, nx*nc)
+
+    def chunk(tag, body):
+        return (struct.pack('>I', len(body)) + tag + body +
+                struct.pack('>I', zlib.crc32(tag + body) & 0xffffffff))
+
+    return (_PNG_SIGNATURE +
+            chunk(b'IHDR', struct.pack('>IIBBBBB', nx, ny, 8, color_type,
+                                       0, 0, 0)) +
+            chunk(b'IDAT', zlib.compress(data.tobytes(), compression)) +
+            chunk(b'IEND', b''))
+
+
+def png_to_frame(png):
+    """Returns the frame, with the rows from bottom to top, of a PNG image
+    written by `frame_to_png`.  Only 8 bit images without row filters are
+    supported.
+    """
+    if png[:8] != _PNG_SIGNATURE:
+        raise ValueError('Not a PNG image')
+    pos = 8
+    header = None
+    idat = []
+    while pos < len(png):
+        length, = struct.unpack('>I', png[pos:pos + 4])
+        tag = png[pos + 4:pos + 8]
+        body = png[pos + 8:pos + 8 + length]
+        if tag == b'IHDR':
+            header = struct.unpack('>IIBBBBB', body)
+        elif tag == b'IDAT':
+            idat.append(body)
+        elif tag == b'IEND':
+            break
+        pos += length + 12
+    if header is None:
+        raise ValueError('PNG image without a header')
+    nx, ny, depth, color_type, _, _, interlace = header
+    components = dict((v, k) for k, v in _COLOR_TYPES.items())
+    if depth != 8 or interlace != 0 or color_type not in components:
+        raise ValueError('Unsupported PNG image')
+    nc = components[color_type]
+    data = np.frombuffer(zlib.decompress(b''.join(idat)), dtype=np.uint8)
+    data = data.reshape(ny, nx*nc + 1)
+    if data[:, 0].any():
+        raise ValueError('PNG images with row filters are not supported')
+    return data[::-1, 1:].reshape(ny, nx, nc)
+
+
+######################################################################
+# `TileEncoder` class.
+######################################################################
+class TileEncoder(object):
+    """Splits frames into square tiles of `tile_size` pixels and encodes
+    the tiles that differ from the previous frame.  Every
+    `keyframe_interval` frames all the tiles are sent.
+    """
+
+    def __init__(self, tile_size=64, keyframe_interval=100,
+                 compression=1):
+        self.tile_size = tile_size
+        self.keyframe_interval = keyframe_interval
+        # The zlib compression level of the PNG tiles.
+        self.compression = compression
+        self.reset()
+
+    def reset(self):
+        """Forgets the previous frame so the next one is a keyframe."""
+        self._previous = None
+        self._count = 0
+
+    def encode(self, frame):
+        """Returns the encoded frame or None if nothing changed."""
+        ny, nx, nc = frame.shape
+        ts = self.tile_size
+        previous = self._previous
+        keyframe = (previous is None or previous.shape != frame.shape or
+                    self._count >= self.keyframe_interval)
+        if keyframe:
+            changed = np.ones(((ny + ts - 1)//ts, (nx + ts - 1)//ts),
+                              dtype=bool)
+            self._count = 0
+        else:
+            changed = self._changed_tiles(previous, frame)
+            if not changed.any():
+                return None
+            self._count += 1
+
+        tiles = []
+        compression = self.compression
+        for j, i in zip(*np.nonzero(changed)):
+            x, y = i*ts, j*ts
+            tile = frame[y:y + ts, x:x + ts]
+            h, w = tile.shape[:2]
+            data = frame_to_png(tile, compression)
+            tiles.append((int(x), int(y), int(w), int(h),
+                          base64.b64encode(data).decode('ascii')))
+        self._previous = frame.copy()
+        return dict(type='tiles', frame=self._count, keyframe=keyframe,
+                    width=nx, height=ny, components=nc, tile_size=ts,
+                    tiles=tiles)
+
+    def _changed_tiles(self, previous, frame):
+        """Returns a boolean array of the tiles that changed, with the
+        tile rows along the first axis.
+        """
+        ny, nx = frame.shape[:2]
+        ts = self.tile_size
+        diff = (previous != frame).any(axis=2)
+        # Pad to a whole number of tiles so the tiles are a reshape.
+        pad_y, pad_x = -ny % ts, -nx % ts
+        if pad_y or pad_x:
+            diff = np.pad(diff, ((0, pad_y), (0, pad_x)), 'constant')
+        n_y, n_x = diff.shape[0]//ts, diff.shape[1]//ts
+        return diff.reshape(n_y, ts, n_x, ts).any(axis=(1, 3))
+
+
+######################################################################
+# `TileDecoder` class.
+######################################################################
+class TileDecoder(object):
+    """Rebuilds the frames encoded by a `TileEncoder`."""
+
+    def __init__(self):
+        self.frame = None
+        self._count = None
+
+    def decode(self, data):
+        """Applies an encoded frame and returns the current frame.  None is
+        returned when the frame cannot be decoded since a previous one
+        was missed, a keyframe is then needed.
+        """
+        shape = (data['height'], data['width'], data['components'])
+        if data['keyframe']:
+            self.frame = np.zeros(shape, dtype=np.uint8)
+        elif (self.frame is None or self.frame.shape != shape or
+              data['frame'] != self._count + 1):
+            self.frame = None
+            return None
+        self._count = data['frame']
+        frame = self.frame
+        for x, y, w, h, tile in data['tiles']:
+            frame[y:y + h, x:x + w] = png_to_frame(base64.b64decode(tile))
+        return frame
@@ -0,0 +1,302 @@
+"""Helpers to grab the pixels of a render window and to encode and write
+them as images or as a movie on background threads.
+
+The grabbing must happen on the thread that renders but the encoding and
+disk I/O, which usually dominate the time taken to save a frame, are
+done by worker threads.  The VTK objects used are created once and
+reused for every frame.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import os
+import shlex
+import subprocess
+import threading
+
+try:
+    from queue import Queue
+except ImportError:
+    from Queue import Queue
+
+import numpy as np
+
+from tvtk import vtk_module as vtk
+from tvtk.api import tvtk
+
+
+# The raw VTK image writers used for the supported image formats.
+IMAGE_WRITERS = {'.png': 'vtkPNGWriter', '.jpg': 'vtkJPEGWriter',
+                 '.jpeg': 'vtkJPEGWriter', '.bmp': 'vtkBMPWriter',
+                 '.tiff': 'vtkTIFFWriter', '.tif': 'vtkTIFFWriter',
+                 '.ps': 'vtkPostScriptWriter'}
+
+
+def _set_input_data(obj, data):
+    if hasattr(obj, 'SetInputData'):
+        obj.SetInputData(data)
+    else:
+        obj.SetInput(data)
+
+
+def frame_to_image(frame):
+    """Wraps a (ny, nx, n_components) uint8 array in VTK's bottom-up
+    row order as a vtkImageData without copying it.  The array must be
+    kept alive as long as the image is used.
+    """
+    from vtk.util.numpy_support import numpy_to_vtk
+    ny, nx, nc = frame.shape
+    img = vtk.vtkImageData()
+    img.SetDimensions(nx, ny, 1)
+    arr = numpy_to_vtk(frame.reshape(nx*ny, nc), deep=False,
+                       array_type=vtk.VTK_UNSIGNED_CHAR)
+    img.GetPointData().SetScalars(arr)
+    return img
+
+
+######################################################################
+# `FrameGrabber` class.
+######################################################################
+class FrameGrabber(object):
+    """Grabs the pixels of a scene's render window into numpy arrays.
+
+    A single WindowToImageFilter is reused for all the frames and is
+    only rebuilt if the render window of the scene changes.
+    """
+
+    def __init__(self, scene):
+        self.scene = scene
+        self._renwin = None
+        self._w2if = None
+
+    def grab(self, anti_alias=True, alpha=False):
+        """Renders the scene and returns a copy of its pixels as a
+        (ny, nx, 3) (or 4 with `alpha`) uint8 array in VTK's bottom-up
+        row order.  If `anti_alias` is None the render window's current
+        anti-aliasing setting is used.
+        """
+        scene = self.scene
+        rw = tvtk.to_vtk(scene.render_window)
+        if hasattr(rw, 'GetAAFrames'):
+            get_aa, set_aa = rw.GetAAFrames, rw.SetAAFrames
+        else:
+            get_aa, set_aa = rw.GetMultiSamples, rw.SetMultiSamples
+        orig = get_aa()
+        if anti_alias is None:
+            aa = orig
+        else:
+            aa = scene.anti_aliasing_frames if anti_alias else 0
+        if orig != aa:
+            set_aa(aa)
+        try:
+            rw.Render()
+            w2if = self._get_filter(rw)
+            if alpha:
+                w2if.SetInputBufferTypeToRGBA()
+            else:
+                w2if.SetInputBufferTypeToRGB()
+            w2if.Modified()
+            w2if.Update()
+        finally:
+            if orig != aa:
+                set_aa(orig)
+                rw.Render()
+        from vtk.util.numpy_support import vtk_to_numpy
+        out = w2if.GetOutput()
+        nx, ny = out.GetDimensions()[:2]
+        data = vtk_to_numpy(out.GetPointData().GetScalars())
+        # The filter's output buffer is reused for the next frame.
+        return data.reshape(ny, nx, -1).copy()
+
+    def _get_filter(self, rw):
+        if self._w2if is None or self._renwin is not rw:
+            w2if = vtk.vtkWindowToImageFilter()
+            w2if.SetInput(rw)
+            w2if.SetReadFrontBuffer(not self.scene.off_screen_rendering)
+            self._w2if, self._renwin = w2if, rw
+        mag = self.scene.magnification
+        if hasattr(self._w2if, 'SetScale'):
+            self._w2if.SetScale(mag, mag)
+        else:
+            self._w2if.SetMagnification(mag)
+        return self._w2if
+
+
+######################################################################
+# `ImageFrameWriter` class.
+######################################################################
+class ImageFrameWriter(object):
+    """Encodes and writes frames to image files using a pool of worker
+    threads.  `write` blocks when more than `queue_size` frames are
+    waiting so memory use stays bounded.  Every worker thread reuses one
+    VTK writer per image format.
+    """
+
+    def __init__(self, n_workers=2, queue_size=8, jpeg_quality=95):
+        self.jpeg_quality = jpeg_quality
+        self._queue = Queue(maxsize=max(queue_size, 1))
+        self._error = None
+        self._threads = []
+        for i in range(max(n_workers, 1)):
+            t = threading.Thread(target=self._worker)
+            t.daemon = True
+            t.start()
+            self._threads.append(t)
+
+    @staticmethod
+    def can_write(file_name):
+        """Returns True if the file type is supported."""
+        ext = os.path.splitext(file_name)[1].lower()
+        return ext in IMAGE_WRITERS
+
+    def write(self, frame, file_name):
+        """Queues the frame (see `FrameGrabber.grab`) to be written to
+        the given file.
+        """
+        self._check_error()
+        self._queue.put((frame, file_name))
+
+    def flush(self):
+        """Waits until all the queued frames are written.  Raises the
+        first error that occurred in the workers, if any.
+        """
+        self._queue.join()
+        self._check_error()
+
+    def close(self):
+        """Flushes the queue and stops the worker threads."""
+        try:
+            self.flush()
+        finally:
+            for t in self._threads:
+                self._queue.put(None)
+            self._threads = []
+
+    def _check_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _worker(self):
+        writers = {}
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    break
+                frame, file_name = item
+                ext = os.path.splitext(file_name)[1].lower()
+                writer = writers.get(ext)
+                if writer is None:
+                    writer = getattr(vtk, IMAGE_WRITERS[ext])()
+                    if ext in ('.jpg', '.jpeg'):
+                        writer.SetQuality(self.jpeg_quality)
+                    writers[ext] = writer
+                _set_input_data(writer, frame_to_image(frame))
+                writer.SetFileName(file_name)
+                writer.Write()
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+            finally:
+                self._queue.task_done()
+
+
+######################################################################
+# `FFmpegFrameWriter` class.
+######################################################################
+class FFmpegFrameWriter(object):
+    """Pipes the frames as raw video to an external encoder (ffmpeg by
+    default) on a background thread.  The encoder is started with the
+    first frame since the frame size is needed.
+    """
+
+    def __init__(self, file_name, frame_rate=25, options='',
+                 command='ffmpeg', queue_size=8):
+        self.file_name = file_name
+        self.frame_rate = frame_rate
+        self.options = options
+        self.command = command
+        self._queue = Queue(maxsize=max(queue_size, 1))
+        self._process = None
+        self._shape = None
+        self._error = None
+        self._thread = threading.Thread(target=self._worker)
+        self._thread.daemon = True
+        self._thread.start()
+
+    @staticmethod
+    def can_write(file_name):
+        return True
+
+    def write(self, frame, file_name=None):
+        """Queues a frame, the file name is ignored."""
+        self._check_error()
+        if self._process is None:
+            self._start(frame.shape)
+        elif frame.shape != self._shape:
+            raise ValueError(
+                'Frame size %s differs from the first frame %s' %
+                (frame.shape[:2], self._shape[:2])
+            )
+        self._queue.put(frame)
+
+    def flush(self):
+        self._queue.join()
+        self._check_error()
+
+    def close(self):
+        """Writes the remaining frames and waits for the encoder."""
+        try:
+            self.flush()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            if self._process is not None:
+                self._process.stdin.close()
+                code = self._process.wait()
+                self._process = None
+                if code != 0 and self._error is None:
+                    self._error = RuntimeError(
+                        '%s exited with status %d' % (self.command, code)
+                    )
+        self._check_error()
+
+    def get_command(self, shape):
+        """Returns the encoder's command line for the given frame
+        shape.
+        """
+        ny, nx, nc = shape
+        pix_fmt = 'rgba' if nc == 4 else 'rgb24'
+        return ([self.command, '-y', '-loglevel', 'error',
+                 '-f', 'rawvideo', '-pix_fmt', pix_fmt,
+                 '-s', '%dx%d' % (nx, ny), '-r', str(self.frame_rate),
+                 '-i', '-'] + shlex.split(self.options) +
+                [self.file_name])
+
+    def _start(self, shape):
+        self._shape = shape
+        self._process = subprocess.Popen(self.get_command(shape),
+                                         stdin=subprocess.PIPE)
+
+    def _check_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _worker(self):
+        while True:
+            frame = self._queue.get()
+            try:
+                if frame is None:
+                    break
+                # Video rows go from top to bottom.
+                self._process.stdin.write(
+                    np.ascontiguousarray(frame[::-1]).tobytes()
+                )
+            except Exception as e:
+                if self._error is None:
+                    self._error = e
+            finally:
+                self._queue.task_done()
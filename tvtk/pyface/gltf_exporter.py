@@ -0,0 +1,391 @@
+"""Export the actors of a scene as a binary glTF (GLB) file.
+
+Unlike the X3D and VRML exporters, which print every coordinate as
+decimal text, the geometry is stored in binary buffers.  By default the
+positions are quantized to 16 bit integers and the normals to 8 bit
+integers using the KHR_mesh_quantization extension, which is about a
+quarter of the size of the float data and an order of magnitude smaller
+than the equivalent X3D text.
+
+Only the polygons and lines of the visible actors are exported with
+their point colors (as mapped by their mappers) or the color and
+opacity of their property.  The glyphs drawn by a vtkGlyph3DMapper are
+computed with a vtkGlyph3D and exported as a mesh.  Textures, volumes
+and 2D actors are ignored.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import json
+import struct
+
+import numpy as np
+
+from tvtk import vtk_module as vtk
+from tvtk.api import tvtk
+
+# glTF constants.
+_BYTE, _UNSIGNED_BYTE, _UNSIGNED_SHORT = 5120, 5121, 5123
+_UNSIGNED_INT, _FLOAT = 5125, 5126
+_ARRAY_BUFFER, _ELEMENT_ARRAY_BUFFER = 34962, 34963
+_LINES, _TRIANGLES = 1, 4
+
+
+def _to_numpy(arr):
+    from vtk.util.numpy_support import vtk_to_numpy
+    return vtk_to_numpy(arr)
+
+
+def _set_input_data(obj, data):
+    if hasattr(obj, 'SetInputData'):
+        obj.SetInputData(data)
+    else:
+        obj.SetInput(data)
+
+
+def _get_cells(cell_array, size):
+    """Returns the point ids of a vtkCellArray of cells with `size` points
+    each as a (n, size) array.
+    """
+    n = cell_array.GetNumberOfCells()
+    if n == 0:
+        return np.empty((0, size), dtype=np.uint32)
+    if hasattr(cell_array, 'GetConnectivityArray'):
+        data = _to_numpy(cell_array.GetConnectivityArray())
+        return data.reshape(n, size).astype(np.uint32)
+    data = _to_numpy(cell_array.GetData()).reshape(n, size + 1)
+    return data[:, 1:].astype(np.uint32)
+
+
+def _get_point_array(info, data):
+    """Returns the point data array of the data selected by the input
+    array information of an algorithm, or None.
+    """
+    pd = data.GetPointData()
+    if info.Has(vtk.vtkDataObject.FIELD_NAME()):
+        return pd.GetArray(info.Get(vtk.vtkDataObject.FIELD_NAME()))
+    if info.Has(vtk.vtkDataObject.FIELD_ATTRIBUTE_TYPE()):
+        return pd.GetAttribute(
+            info.Get(vtk.vtkDataObject.FIELD_ATTRIBUTE_TYPE())
+        )
+    return None
+
+
+######################################################################
+# `GLBBuilder` class.
+######################################################################
+class GLBBuilder(object):
+    """Collects the meshes of VTK actors and writes them as a GLB file.
+    """
+
+    def __init__(self, quantize=True):
+        self.quantize = quantize
+        self._gltf = dict(
+            asset=dict(version='2.0', generator='Mayavi'),
+            scene=0, scenes=[dict(nodes=[])], nodes=[], meshes=[],
+            materials=[], accessors=[], bufferViews=[],
+            buffers=[dict(byteLength=0)]
+        )
+        self._chunks = []
+        self._length = 0
+        if quantize:
+            self._gltf['extensionsUsed'] = ['KHR_mesh_quantization']
+            self._gltf['extensionsRequired'] = ['KHR_mesh_quantization']
+
+    ######################################################################
+    # `GLBBuilder` interface
+    ######################################################################
+    def add_actor(self, actor):
+        """Adds the polygons and lines of a raw VTK actor."""
+        mapper = actor.GetMapper()
+        if mapper is None:
+            return
+        mapper.Update()
+        data = mapper.GetInput()
+        if data is None or data.GetNumberOfPoints() == 0:
+            return
+        data = self._add_colors(mapper, data)
+        if mapper.IsA('vtkGlyph3DMapper'):
+            data = self._get_glyphs(mapper, data)
+        data = self._get_triangles(data)
+        if data.GetNumberOfPoints() == 0:
+            return
+
+        points = _to_numpy(data.GetPoints().GetData())
+        pd = data.GetPointData()
+        attributes = {}
+        attributes['POSITION'], transform = self._add_positions(points)
+        normals = pd.GetNormals()
+        if normals is not None:
+            attributes['NORMAL'] = self._add_normals(_to_numpy(normals))
+        colors = pd.GetArray('__glb_colors')
+        if colors is not None:
+            attributes['COLOR_0'] = self._add_vertex_attribute(
+                _to_numpy(colors).astype(np.uint8), _UNSIGNED_BYTE,
+                normalized=True
+            )
+
+        prop = actor.GetProperty()
+        material = self._add_material(prop, colors is not None)
+        primitives = []
+        triangles = _get_cells(data.GetPolys(), 3)
+        if len(triangles) > 0:
+            primitives.append(dict(attributes=attributes, material=material,
+                                   mode=_TRIANGLES,
+                                   indices=self._add_indices(triangles)))
+        lines = _get_cells(data.GetLines(), 2)
+        if len(lines) > 0:
+            primitives.append(dict(attributes=attributes, material=material,
+                                   mode=_LINES,
+                                   indices=self._add_indices(lines)))
+        if not primitives:
+            return
+
+        gltf = self._gltf
+        matrix = np.array([actor.GetMatrix().GetElement(i, j)
+                           for i in range(4) for j in range(4)])
+        matrix = np.dot(matrix.reshape(4, 4), transform)
+        gltf['meshes'].append(dict(primitives=primitives))
+        node = dict(mesh=len(gltf['meshes']) - 1)
+        if not np.allclose(matrix, np.identity(4)):
+            # glTF matrices are column major.
+            node['matrix'] = [float(x) for x in matrix.T.ravel()]
+        gltf['nodes'].append(node)
+        gltf['scenes'][0]['nodes'].append(len(gltf['nodes']) - 1)
+
+    def add_renderer(self, renderer):
+        """Adds the visible actors of a raw VTK renderer."""
+        actors = renderer.GetActors()
+        actors.InitTraversal()
+        for i in range(actors.GetNumberOfItems()):
+            actor = actors.GetNextActor()
+            if actor.GetVisibility():
+                self.add_actor(actor)
+
+    def to_bytes(self):
+        """Returns the contents of the GLB file."""
+        gltf = self._gltf
+        gltf['buffers'][0]['byteLength'] = self._length
+        for key in ('meshes', 'materials', 'accessors', 'bufferViews'):
+            if not gltf[key]:
+                del gltf[key]
+        if self._length == 0:
+            del gltf['buffers']
+        text = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+        text += b' '*(-len(text) % 4)
+        binary = b''.join(self._chunks)
+        length = 12 + 8 + len(text)
+        if binary:
+            length += 8 + len(binary)
+        parts = [struct.pack('<4sII', b'glTF', 2, length),
+                 struct.pack('<I4s', len(text), b'JSON'), text]
+        if binary:
+            parts += [struct.pack('<I4s', len(binary), b'BIN\x00'), binary]
+        return b''.join(parts)
+
+    ######################################################################
+    # Non-public interface
+    ######################################################################
+    def _add_colors(self, mapper, data):
+        """Returns a shallow copy of the data with the point colors
+        mapped by the mapper, if any, in the '__glb_colors' array.
+        """
+        copy = data.NewInstance()
+        copy.ShallowCopy(data)
+        data = copy
+        if mapper.GetScalarVisibility():
+            colors = self._map_colors(mapper, data)
+            if colors is not None:
+                colors.SetName('__glb_colors')
+                data.GetPointData().AddArray(colors)
+        return data
+
+    def _get_glyphs(self, mapper, data):
+        """Returns the glyphs a vtkGlyph3DMapper draws at the points of
+        the data as vtkPolyData, computed by a vtkGlyph3D with the same
+        scaling and orientation.  The point colors of the data are
+        copied to the points of their glyph.
+        """
+        glyph = vtk.vtkGlyph3D()
+        _set_input_data(glyph, data)
+        glyph.SetSourceData(mapper.GetSource())
+        # vtkGlyph3D orients and scales by vectors with its array 1 and
+        # scales by scalars with its array 0.
+        glyph.SetInputArrayToProcess(
+            1, mapper.GetInputArrayInformation(mapper.ORIENTATION)
+        )
+        glyph.SetOrient(mapper.GetOrient())
+        scale_mode = mapper.GetScaleMode()
+        scale_array = _get_point_array(
+            mapper.GetInputArrayInformation(mapper.SCALE), data
+        )
+        if not mapper.GetScaling() or scale_array is None or \
+                scale_mode == mapper.NO_DATA_SCALING:
+            glyph.SetScaleModeToDataScalingOff()
+        elif scale_mode == mapper.SCALE_BY_COMPONENTS:
+            glyph.SetScaleModeToScaleByVectorComponents()
+        elif scale_array.GetNumberOfComponents() == 1:
+            glyph.SetScaleModeToScaleByScalar()
+            glyph.SetInputArrayToProcess(
+                0, mapper.GetInputArrayInformation(mapper.SCALE)
+            )
+        else:
+            glyph.SetScaleModeToScaleByVector()
+        glyph.SetScaleFactor(mapper.GetScaleFactor())
+        glyph.SetRange(mapper.GetRange())
+        glyph.SetClamping(mapper.GetClamping())
+        glyph.Update()
+        return glyph.GetOutput()
+
+    def _get_triangles(self, data):
+        """Returns the surface of the data as vtkPolyData with triangles,
+        line segments, point normals and the point colors.
+        """
+        if not isinstance(data, vtk.vtkPolyData):
+            geometry = vtk.vtkGeometryFilter()
+            _set_input_data(geometry, data)
+            geometry.Update()
+            data = geometry.GetOutput()
+        triangles = vtk.vtkTriangleFilter()
+        triangles.PassVertsOff()
+        _set_input_data(triangles, data)
+        triangles.Update()
+        data = triangles.GetOutput()
+        if data.GetPolys().GetNumberOfCells() > 0 and \
+                data.GetPointData().GetNormals() is None:
+            normals = vtk.vtkPolyDataNormals()
+            normals.SplittingOff()
+            normals.ConsistencyOff()
+            _set_input_data(normals, data)
+            normals.Update()
+            data = normals.GetOutput()
+        return data
+
+    def _map_colors(self, mapper, data):
+        """Returns the RGBA point colors of the mapper or None if the
+        scalars are not point data.
+        """
+        try:
+            colors = mapper.MapScalars(data, 1.0)
+        except TypeError:
+            colors = mapper.MapScalars(1.0)
+        if colors is None or \
+                colors.GetNumberOfTuples() != data.GetNumberOfPoints():
+            return None
+        result = vtk.vtkUnsignedCharArray()
+        result.DeepCopy(colors)
+        return result
+
+    def _add_buffer_view(self, array, target, stride=None):
+        data = np.ascontiguousarray(array).tobytes()
+        view = dict(buffer=0, byteOffset=self._length,
+                    byteLength=len(data), target=target)
+        if stride is not None:
+            view['byteStride'] = stride
+        # Keep every view aligned to 4 bytes.
+        data += b'\x00'*(-len(data) % 4)
+        self._chunks.append(data)
+        self._length += len(data)
+        views = self._gltf['bufferViews']
+        views.append(view)
+        return len(views) - 1
+
+    def _add_accessor(self, view, component_type, count, type,
+                      normalized=False, min=None, max=None):
+        accessor = dict(bufferView=view, componentType=component_type,
+                        count=int(count), type=type)
+        if normalized:
+            accessor['normalized'] = True
+        if min is not None:
+            accessor['min'] = [float(x) for x in min]
+            accessor['max'] = [float(x) for x in max]
+        accessors = self._gltf['accessors']
+        accessors.append(accessor)
+        return len(accessors) - 1
+
+    def _add_vertex_attribute(self, array, component_type, normalized=False,
+                              min=None, max=None):
+        n, nc = array.shape
+        type = 'VEC%d' % nc
+        itemsize = array.dtype.itemsize
+        stride = None
+        if (nc*itemsize) % 4 != 0:
+            # Vertex attributes must be aligned to 4 bytes, pad them.
+            padded = np.zeros((n, nc + (-nc*itemsize % 4)//itemsize),
+                              dtype=array.dtype)
+            padded[:, :nc] = array
+            array = padded
+            stride = array.shape[1]*itemsize
+        view = self._add_buffer_view(array, _ARRAY_BUFFER, stride)
+        return self._add_accessor(view, component_type, n, type,
+                                  normalized=normalized, min=min, max=max)
+
+    def _add_positions(self, points):
+        """Adds the positions and returns the accessor and the 4x4
+        transform to apply to them.
+        """
+        transform = np.identity(4)
+        lo, hi = points.min(axis=0), points.max(axis=0)
+        if not self.quantize:
+            array = points.astype(np.float32)
+            accessor = self._add_vertex_attribute(array, _FLOAT,
+                                                  min=array.min(axis=0),
+                                                  max=array.max(axis=0))
+            return accessor, transform
+        # The same scale is used on every axis, the normals are
+        # transformed with the inverse transpose of the node matrix and
+        # would be skewed otherwise.
+        scale = (hi - lo).max()/65535.0
+        if scale == 0:
+            scale = 1.0
+        q = np.round((points - lo)/scale).astype(np.uint16)
+        transform[:3, :3] = np.identity(3)*scale
+        transform[:3, 3] = lo
+        accessor = self._add_vertex_attribute(q, _UNSIGNED_SHORT,
+                                              min=q.min(axis=0),
+                                              max=q.max(axis=0))
+        return accessor, transform
+
+    def _add_normals(self, normals):
+        if not self.quantize:
+            return self._add_vertex_attribute(normals.astype(np.float32),
+                                              _FLOAT)
+        q = np.round(np.clip(normals, -1.0, 1.0)*127).astype(np.int8)
+        return self._add_vertex_attribute(q, _BYTE, normalized=True)
+
+    def _add_indices(self, cells):
+        if cells.max() < 65535:
+            array, component_type = cells.astype(np.uint16), _UNSIGNED_SHORT
+        else:
+            array, component_type = cells, _UNSIGNED_INT
+        view = self._add_buffer_view(array.ravel(), _ELEMENT_ARRAY_BUFFER)
+        return self._add_accessor(view, component_type, array.size, 'SCALAR')
+
+    def _add_material(self, prop, vertex_colors):
+        opacity = prop.GetOpacity()
+        if vertex_colors:
+            color = [1.0, 1.0, 1.0]
+        else:
+            color = list(prop.GetColor())
+        material = dict(
+            pbrMetallicRoughness=dict(baseColorFactor=color + [opacity],
+                                      metallicFactor=0.0,
+                                      roughnessFactor=1.0),
+            doubleSided=True
+        )
+        if opacity < 1.0:
+            material['alphaMode'] = 'BLEND'
+        materials = self._gltf['materials']
+        materials.append(material)
+        return len(materials) - 1
+
+
+def scene_to_glb(scene, quantize=True):
+    """Returns the contents of a binary glTF file of the visible actors of
+    the given TVTK scene.  With `quantize` the positions and normals are
+    stored as integers.
+    """
+    builder = GLBBuilder(quantize=quantize)
+    builder.add_renderer(tvtk.to_vtk(scene.renderer))
+    return builder.to_bytes()
@@ -2,7 +2,8 @@ import os
 from glob import glob
 from contextlib import contextmanager
 
-from traits.api import Bool, Directory, HasTraits, Instance, Int, Str
+from traits.api import (Any, Bool, Directory, Enum, HasTraits, Instance,
+                        Int, Str)
 from traits.util.home_directory import get_home_directory
 
 
@@ -13,10 +14,32 @@ class MovieMaker(HasTraits):
     filename = Str('anim%05d.png')
     anti_alias = Bool(True, desc='if the saved images should be anti-aliased')
 
+    # Write separate images or pipe the frames to ffmpeg to produce a
+    # single movie file.
+    encoder = Enum('images', 'ffmpeg',
+                   desc='if images or a movie (using ffmpeg) is written')
+
+    # The number of threads encoding and writing the images.  The frames
+    # are grabbed on the rendering thread.  If zero the scene's `save`
+    # method is used synchronously.
+    n_workers = Int(2, desc='the number of threads writing images')
+
+    # The maximum number of grabbed frames waiting to be written.
+    queue_size = Int(8, desc='the number of frames queued for writing')
+
+    # The name of the movie written by ffmpeg, the frame rate and any
+    # additional options for the encoder.
+    movie_name = Str('movie.mp4')
+    frame_rate = Int(25, desc='the frame rate of the movie')
+    ffmpeg_options = Str('-vcodec libx264 -pix_fmt yuv420p',
+                         desc='the additional ffmpeg options')
+
     ##################
     # Private traits
     _subdir = Str
     _count = Int(0)
+    _grabber = Any
+    _writer = Any
 
     def default_traits_view(self):
         from traitsui.api import Item, View
@@ -25,6 +48,11 @@ class MovieMaker(HasTraits):
             Item('anti_alias'),
             Item('filename'),
             Item('directory'),
+            Item('encoder'),
+            Item('n_workers'),
+            Item('movie_name', enabled_when='encoder == "ffmpeg"'),
+            Item('frame_rate', enabled_when='encoder == "ffmpeg"'),
+            Item('ffmpeg_options', enabled_when='encoder == "ffmpeg"'),
         )
         return view
 
@@ -40,7 +68,11 @@ class MovieMaker(HasTraits):
             self._save_scene(self._count)
 
     def animation_stop(self):
-        pass
+        """Waits for the frames to be written."""
+        writer = self._writer
+        if writer is not None:
+            self._writer = None
+            writer.close()
 
     @contextmanager
     def record_movie(self):
@@ -72,12 +104,44 @@ class MovieMaker(HasTraits):
             os.makedirs(dir)
 
         fname = os.path.join(dir, self.filename%count)
+        writer = self._get_writer(dir)
+        if writer is not None and writer.can_write(fname):
+            frame = self._grabber.grab(anti_alias=self.anti_alias)
+            writer.write(frame, fname)
+            return
+
         if not self.anti_alias:
             orig_aa = self.scene.anti_aliasing_frames
         self.scene.save(fname)
         if not self.anti_alias:
             self.scene.anti_aliasing_frames = orig_aa
 
+    def _get_writer(self, dir):
+        """Returns the background frame writer for this recording or
+        None if frames should be saved synchronously.
+        """
+        if self._writer is None:
+            if self.encoder == 'images' and self.n_workers < 1:
+                return None
+            from tvtk.pyface.frame_writer import (
+                FFmpegFrameWriter, FrameGrabber, ImageFrameWriter
+            )
+            if self._grabber is None or self._grabber.scene is not self.scene:
+                self._grabber = FrameGrabber(self.scene)
+            if self.encoder == 'ffmpeg':
+                self._writer = FFmpegFrameWriter(
+                    os.path.join(dir, self.movie_name),
+                    frame_rate=self.frame_rate,
+                    options=self.ffmpeg_options,
+                    queue_size=self.queue_size
+                )
+            else:
+                self._writer = ImageFrameWriter(
+                    n_workers=self.n_workers, queue_size=self.queue_size,
+                    jpeg_quality=self.scene.jpeg_quality
+                )
+        return self._writer
+
     def _directory_default(self):
         home = get_home_directory()
         return os.path.join(home, 'Documents', 'mayavi_movies')
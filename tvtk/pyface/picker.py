@@ -223,6 +223,12 @@ class Picker(HasTraits):
     # Raise the GUI on pick ?
     auto_raise = Bool(True, desc = "whether to raise the picker GUI on pick")
 
+    # A callable that is given a TVTK dataset and returns a built raw
+    # VTK cell locator for it or None.  This lets the picker share the
+    # locators of large datasets with other filters instead of searching
+    # all the cells on every pick.
+    cell_locator_factory = Any
+
     default_view = View(Group(Group(Item(name='pick_type'),
                                     Item(name='tolerance'), show_border=True),
                               Group(Item(name='pick_handler', style='custom'),
@@ -267,7 +273,8 @@ class Picker(HasTraits):
 
     def __get_pure_state__(self):
         d = self.__dict__.copy()
-        for x in ['renwin', 'ui', 'pick_handler', '__sync_trait__', '__traits_listener__']:
+        for x in ['renwin', 'ui', 'pick_handler', 'cell_locator_factory',
+                  '__sync_trait__', '__traits_listener__']:
             d.pop(x, None)
         return d
 
@@ -358,6 +365,8 @@ class Picker(HasTraits):
         if id > -1:
             data = cp.mapper.input.cell_data
             bounds = cp.mapper.input.bounds
+            # Subsequent picks of the same data use the locator.
+            self._set_cell_picker_locator(cp.mapper.input)
 
             picked_data.valid = 1
             picked_data.cell_id = id
@@ -393,6 +402,8 @@ class Picker(HasTraits):
             # Need to create the probe each time because otherwise it
             # does not seem to work properly.
             probe = tvtk.ProbeFilter()
+            if hasattr(probe, 'cell_locator'):
+                probe.cell_locator = self._get_cell_locator(data)
             if vtk_major_version >= 6:
                 probe.set_source_data(data)
                 probe.set_input_data(self.probe_data)
@@ -425,6 +436,27 @@ class Picker(HasTraits):
     #################################################################
     # Non-public interface.
     #################################################################
+    def _get_cell_locator(self, data):
+        """Returns the TVTK cell locator given by the
+        `cell_locator_factory` for the data or None."""
+        factory = self.cell_locator_factory
+        if factory is None or data is None:
+            return None
+        locator = factory(data)
+        if locator is None:
+            return None
+        return tvtk.to_tvtk(locator)
+
+    def _set_cell_picker_locator(self, data):
+        """Makes the cell picker use the locator of the data."""
+        cp = self.cellpicker
+        if not hasattr(cp, 'add_locator'):
+            return
+        locator = self._get_cell_locator(data)
+        cp.remove_all_locators()
+        if locator is not None:
+            cp.add_locator(locator)
+
     def _tolerance_changed(self, val):
         """ Trait handler for the tolerance trait."""
         self.pointpicker.tolerance = val
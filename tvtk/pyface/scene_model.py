@@ -113,7 +113,7 @@ class SceneModel(TVTKScene):
     ######################################################################
     # TVTKScene API.
     ######################################################################
-    def render(self):
+    def render(self, now=False):
         """ Force the scene to be rendered. Nothing is done if the
         `disable_render` trait is set to True."""
 
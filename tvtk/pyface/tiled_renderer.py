@@ -0,0 +1,186 @@
+"""Render images larger than the render window in tiles.
+
+The scene is rendered once per window-sized tile with the camera's
+frustum restricted to that tile, so the render window is never resized
+and the GPU never has to allocate more than one window's worth of
+pixels.  The tiles are either copied into a (possibly preallocated)
+array or streamed, one band of rows at a time, into a PNG file so that
+even very large images take a bounded amount of memory.
+
+Note that 2D actors (text, scalar bars, orientation axes etc.) are
+rendered in every tile rather than once for the whole image.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import math
+import struct
+import zlib
+
+import numpy as np
+
+from tvtk.api import tvtk
+
+
+def iter_tiles(scene, size):
+    """Renders the scene in tiles for an image of the given (width,
+    height) and yields `(x0, y0, pixels)` for every tile, where `x0, y0`
+    is the bottom left corner of the tile in the image and `pixels` is a
+    (ny, nx, 3) uint8 array in VTK's bottom-up row order, cropped to the
+    image.  Tiles are generated from the top row of tiles downwards and
+    from left to right.  The pixels are only valid until the next tile
+    is generated.
+    """
+    from tvtk.pyface.frame_writer import FrameGrabber
+
+    width, height = int(size[0]), int(size[1])
+    tile_x, tile_y = tuple(scene.render_window.size)
+    grabber = FrameGrabber(scene)
+    camera = tvtk.to_vtk(scene.camera)
+    view_angle = camera.GetViewAngle()
+    window_center = camera.GetWindowCenter()
+    parallel_scale = camera.GetParallelScale()
+    if camera.GetUseHorizontalViewAngle():
+        fraction = float(tile_x)/width
+    else:
+        fraction = float(tile_y)/height
+    half_angle = math.atan(math.tan(math.radians(view_angle*0.5))*fraction)
+    magnification = scene.magnification
+    scene.magnification = 1
+    try:
+        camera.SetViewAngle(2.0*math.degrees(half_angle))
+        camera.SetParallelScale(parallel_scale*fraction)
+        n_rows = int(math.ceil(float(height)/tile_y))
+        for row in range(n_rows - 1, -1, -1):
+            y0 = row*tile_y
+            for x0 in range(0, width, tile_x):
+                # The tile's center in normalized image coordinates,
+                # expressed in units of the tile's half size.
+                u = 2.0*(x0 + 0.5*tile_x)/width - 1.0
+                v = 2.0*(y0 + 0.5*tile_y)/height - 1.0
+                camera.SetWindowCenter(u*width/tile_x, v*height/tile_y)
+                pixels = grabber.grab(anti_alias=None)
+                yield (x0, y0,
+                       pixels[:min(tile_y, height - y0),
+                              :min(tile_x, width - x0)])
+    finally:
+        camera.SetViewAngle(view_angle)
+        camera.SetWindowCenter(*window_center)
+        camera.SetParallelScale(parallel_scale)
+        scene.magnification = magnification
+        scene.render(now=True)
+
+
+def render_tiled(scene, size, out=None):
+    """Renders the scene in tiles into a (height, width, 3) uint8 array
+    with the rows from top to bottom (as returned by `mlab.screenshot`).
+    If `out` is given the result is written into it and it is returned.
+    """
+    width, height = int(size[0]), int(size[1])
+    shape = (height, width, 3)
+    if out is None:
+        out = np.empty(shape, dtype=np.uint8)
+    elif out.shape != shape:
+        raise ValueError('out has shape %s, expected %s' % (out.shape, shape))
+    for x0, y0, pixels in iter_tiles(scene, size):
+        ny, nx = pixels.shape[:2]
+        top = height - y0 - ny
+        out[top:top + ny, x0:x0 + nx] = pixels[::-1, :, :3]
+    return out
+
+
+######################################################################
+# `StripedPNGWriter` class.
+######################################################################
+class StripedPNGWriter(object):
+    """Writes an RGB PNG image a band of rows at a time so the whole
+    image never needs to be in memory.
+    """
+
+    def __init__(self, file_name, size, compression=6):
+        self.width, self.height = int(size[0]), int(size[1])
+        self._rows = 0
+        self._compressor = zlib.compressobj(compression)
+        self._fp = open(file_name, 'wb')
+        self._fp.write(b'\x89PNG\r\n\x1a\n')
+        # 8 bit RGB, no interlacing.
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', self.width,
+                                               self.height, 8, 2, 0, 0, 0))
+
+    def write_rows(self, rows):
+        """Writes a (n, width, 3) uint8 array of rows, top row first."""
+        n = rows.shape[0]
+        if self._rows + n > self.height:
+            raise ValueError('More rows than the image height were written')
+        data = np.empty((n, self.width*3 + 1), dtype=np.uint8)
+        # Filter type 0 (none) for every row.
+        data[:, 0] = 0
+        data[:, 1:] = rows.reshape(n, self.width*3)
+        compressed = self._compressor.compress(data.tobytes())
+        if compressed:
+            self._write_chunk(b'IDAT', compressed)
+        self._rows += n
+
+    def abort(self):
+        """Closes the file without completing the image."""
+        self._fp.close()
+
+    def close(self):
+        try:
+            if self._rows != self.height:
+                raise ValueError('Only %d of %d rows were written' %
+                                 (self._rows, self.height))
+            self._write_chunk(b'IDAT', self._compressor.flush())
+            self._write_chunk(b'IEND', b'')
+        finally:
+            self._fp.close()
+
+    def _write_chunk(self, tag, data):
+        fp = self._fp
+        fp.write(struct.pack('>I', len(data)))
+        fp.write(tag)
+        fp.write(data)
+        fp.write(struct.pack('>I', zlib.crc32(tag + data) & 0xffffffff))
+
+
+def save_tiled_png(scene, file_name, size, compression=6):
+    """Renders the scene in tiles and streams them into a PNG file of
+    the given (width, height).  Only one band of tiles is held in
+    memory at a time.
+    """
+    width, height = int(size[0]), int(size[1])
+    writer = StripedPNGWriter(file_name, size, compression=compression)
+    band = None
+    try:
+        for x0, y0, pixels in iter_tiles(scene, size):
+            ny, nx = pixels.shape[:2]
+            if x0 == 0:
+                band = np.empty((ny, width, 3), dtype=np.uint8)
+            band[:, x0:x0 + nx] = pixels[::-1, :, :3]
+            if x0 + nx >= width:
+                writer.write_rows(band)
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+
+
+def save_tiled(scene, file_name, size):
+    """Renders the scene in tiles and saves an image of the given
+    (width, height).  PNG files are streamed, the other raster formats
+    supported by `tvtk.pyface.frame_writer` are rendered into an array
+    first.
+    """
+    from tvtk.pyface.frame_writer import ImageFrameWriter
+    if file_name.lower().endswith('.png'):
+        save_tiled_png(scene, file_name, size)
+        return
+    if not ImageFrameWriter.can_write(file_name):
+        raise ValueError(
+            'Tiled rendering only supports raster image formats.'
+        )
+    image = render_tiled(scene, size)
+    writer = ImageFrameWriter(n_workers=1, jpeg_quality=scene.jpeg_quality)
+    writer.write(np.ascontiguousarray(image[::-1]), file_name)
+    writer.close()
@@ -23,7 +23,8 @@ from tvtk.tvtk_base import vtk_color_trait
 from tvtk.common import configure_input
 
 from traits.api import HasPrivateTraits, HasTraits, Any, Int, \
-     Property, Instance, Event, Range, Bool, Trait, Str
+     Property, Instance, Event, Range, Bool, Trait, Str, Dict, \
+     on_trait_change
 
 from tvtk.pyface import light_manager
 
@@ -100,6 +101,17 @@ class TVTKScene(HasPrivateTraits):
     # Disable rendering.
     disable_render = Bool(False, desc='if rendering is to be disabled')
 
+    # Coalesce renders.  When enabled `render()` only marks the scene as
+    # needing a render and a single render is done the next time the UI
+    # event loop is idle, however many times `render()` was called.  Use
+    # `render(now=True)` to render immediately.  This requires a running
+    # UI event loop.
+    coalesce_render = Bool(False,
+                           desc='if renders are deferred until the UI is idle')
+
+    # The number of renders actually done.
+    render_count = Int(0, record=False)
+
     # Enable off-screen rendering.  This allows a user to render the
     # scene to an image without the need to have the window active.
     # For example, the application can be minimized and the saved
@@ -207,6 +219,15 @@ class TVTKScene(HasPrivateTraits):
     _interactor = Instance(tvtk.RenderWindowInteractor)
     _camera = Instance(tvtk.Camera)
     _busy_count = Int(0)
+    # True when a coalesced render is scheduled.
+    _render_pending = Bool(False)
+
+    # The image writers and exporters used by the save methods, keyed
+    # on their class name.  They are created on first use and reused
+    # until the render window changes.
+    _save_objects = Dict(transient=True)
+    # True while `save_many` is saving a sequence of files.
+    _saving_many = Bool(False, transient=True)
 
     ###########################################################################
     # 'object' interface.
@@ -230,8 +251,9 @@ class TVTKScene(HasPrivateTraits):
         for x in ['control', '_renwin', '_interactor', '_camera',
                   '_busy_count', '__sync_trait__', 'recorder',
                   '_last_camera_state', '_camera_observer_id',
-                  '_saved_light_manager_state',
-                  '_script_id', '__traits_listener__']:
+                  '_saved_light_manager_state', '_save_objects',
+                  '_saving_many', 'render_count',
+                  '_render_pending', '_script_id', '__traits_listener__']:
             d.pop(x, None)
         # Additionally pickle these.
         d['camera'] = self.camera
@@ -259,11 +281,22 @@ class TVTKScene(HasPrivateTraits):
     ###########################################################################
     # 'Scene' interface.
     ###########################################################################
-    def render(self):
+    def render(self, now=False):
         """ Force the scene to be rendered. Nothing is done if the
-        `disable_render` trait is set to True."""
-        if not self.disable_render:
-            self._renwin.render()
+        `disable_render` trait is set to True.  If `coalesce_render` is
+        set the render is deferred until the UI is idle, unless `now` is
+        True."""
+        if self.disable_render:
+            return
+        if self.coalesce_render and not now:
+            if not self._render_pending:
+                self._render_pending = True
+                from pyface.api import GUI
+                GUI.invoke_later(self._render_if_pending)
+            return
+        self._render_pending = False
+        self.render_count += 1
+        self._do_render()
 
     def add_actors(self, actors):
         """ Adds a single actor or a tuple or list of actors to the
@@ -350,6 +383,8 @@ class TVTKScene(HasPrivateTraits):
         # Disconnect the interactor from the renderwindow.
         self._interactor.render_window = None
         # Remove the reference to the render window.
+        self._save_objects.clear()
+        self._render_pending = False
         del self._renwin
         # Fire the "closed" event.
         self.closed = True
@@ -410,18 +445,7 @@ class TVTKScene(HasPrivateTraits):
         Any extra keyword arguments are passed along to the respective
         image format's save method.
         """
-        ext = os.path.splitext(file_name)[1]
-        meth_map = {'.ps': 'ps', '.bmp': 'bmp', '.tiff': 'tiff',
-                    '.png': 'png', '.jpg': 'jpg', '.jpeg': 'jpg',
-                    '.iv': 'iv', '.wrl': 'vrml', '.vrml':'vrml',
-                    '.oogl': 'oogl', '.rib': 'rib', '.obj': 'wavefront',
-                    '.eps': 'gl2ps', '.pdf':'gl2ps', '.tex': 'gl2ps',
-                    '.x3d': 'x3d', '.pov': 'povray'}
-        if ext.lower() not in meth_map:
-            raise ValueError(
-                'Unable to find suitable image type for given file extension.'
-            )
-        meth = getattr(self, 'save_' + meth_map[ext.lower()])
+        meth = self._get_save_method(file_name)
         if size is not None:
             orig_size = self.get_size()
             self.set_size(size)
@@ -432,41 +456,68 @@ class TVTKScene(HasPrivateTraits):
             meth(file_name, **kw_args)
             self._record_methods('save(%r)'%(file_name))
 
+    def save_many(self, file_names, callback=None, size=None, **kw_args):
+        """Saves the scene to each of the given files, one after the
+        other.
+
+        This is faster than calling `save` for every file since the
+        window is resized (if `size` is given) and the anti-aliasing is
+        set up only once for the whole sequence and the scene is
+        rendered once per file.  If `callback` is given it is called
+        with the index of each file before it is saved so it can update
+        the scene to produce a sequence of frames.
+
+        Any extra keyword arguments are passed along to the respective
+        image format's save method.
+        """
+        file_names = [f for f in file_names if len(f) != 0]
+        methods = [self._get_save_method(f) for f in file_names]
+        if size is not None:
+            orig_size = self.get_size()
+            self.set_size(size)
+        aa_frames = self._set_anti_aliasing(self.anti_aliasing_frames)
+        self._saving_many = True
+        try:
+            for i, (file_name, meth) in enumerate(zip(file_names, methods)):
+                if callback is not None:
+                    callback(i)
+                meth(file_name, **kw_args)
+        finally:
+            self._saving_many = False
+            self._set_anti_aliasing(aa_frames)
+            if size is not None:
+                self.set_size(orig_size)
+            self.render_window.render()
+        if callback is None:
+            self._record_methods('save_many(%r)'%(file_names,))
+
     def save_ps(self, file_name):
         """Saves the rendered scene to a rasterized PostScript image.
         For vector graphics use the save_gl2ps method."""
         if len(file_name) != 0:
-            w2if = self._get_window_to_image()
-            ex = tvtk.PostScriptWriter()
+            ex = self._get_image_writer('PostScriptWriter')
             ex.file_name = file_name
-            configure_input(ex, w2if)
             self._exporter_write(ex)
 
     def save_bmp(self, file_name):
         """Save to a BMP image file."""
         if len(file_name) != 0:
-            w2if = self._get_window_to_image()
-            ex = tvtk.BMPWriter()
+            ex = self._get_image_writer('BMPWriter')
             ex.file_name = file_name
-            configure_input(ex, w2if)
             self._exporter_write(ex)
 
     def save_tiff(self, file_name):
         """Save to a TIFF image file."""
         if len(file_name) != 0:
-            w2if = self._get_window_to_image()
-            ex = tvtk.TIFFWriter()
+            ex = self._get_image_writer('TIFFWriter')
             ex.file_name = file_name
-            configure_input(ex, w2if)
             self._exporter_write(ex)
 
     def save_png(self, file_name):
         """Save to a PNG image file."""
         if len(file_name) != 0:
-            w2if = self._get_window_to_image()
-            ex = tvtk.PNGWriter()
+            ex = self._get_image_writer('PNGWriter')
             ex.file_name = file_name
-            configure_input(ex, w2if)
             self._exporter_write(ex)
 
     def save_jpg(self, file_name, quality=None, progressive=None):
@@ -476,29 +527,23 @@ class TVTKScene(HasPrivateTraits):
         if len(file_name) != 0:
             if not quality and not progressive:
                 quality, progressive = self.jpeg_quality, self.jpeg_progressive
-            w2if = self._get_window_to_image()
-            ex = tvtk.JPEGWriter()
+            ex = self._get_image_writer('JPEGWriter')
             ex.quality = quality
             ex.progressive = progressive
             ex.file_name = file_name
-            configure_input(ex, w2if)
             self._exporter_write(ex)
 
     def save_iv(self, file_name):
         """Save to an OpenInventor file."""
         if len(file_name) != 0:
-            ex = tvtk.IVExporter()
-            self._lift()
-            ex.input = self._renwin
+            ex = self._get_exporter('IVExporter')
             ex.file_name = file_name
             self._exporter_write(ex)
 
     def save_vrml(self, file_name):
         """Save to a VRML file."""
         if len(file_name) != 0:
-            ex = tvtk.VRMLExporter()
-            self._lift()
-            ex.input = self._renwin
+            ex = self._get_exporter('VRMLExporter')
             ex.file_name = file_name
             self._exporter_write(ex)
 
@@ -506,9 +551,7 @@ class TVTKScene(HasPrivateTraits):
         """Saves the scene to a Geomview OOGL file. Requires VTK 4 to
         work."""
         if len(file_name) != 0:
-            ex = tvtk.OOGLExporter()
-            self._lift()
-            ex.input = self._renwin
+            ex = self._get_exporter('OOGLExporter')
             ex.file_name = file_name
             self._exporter_write(ex)
 
@@ -544,12 +587,10 @@ class TVTKScene(HasPrivateTraits):
             return
 
         f_pref = os.path.splitext(file_name)[0]
-        ex = tvtk.RIBExporter()
+        ex = self._get_exporter('RIBExporter', 'render_window')
         ex.size = int(resfactor*Nx), int(resfactor*Ny)
         ex.file_prefix = f_pref
         ex.texture_prefix = f_pref + "_tex"
-        self._lift()
-        ex.render_window = self._renwin
         ex.background = bg
 
         if VTK_VER[:3] in ['4.2', '4.4']:
@@ -614,9 +655,7 @@ class TVTKScene(HasPrivateTraits):
         file_name -- File name to save to
         """
         if len(file_name) != 0:
-            ex = tvtk.OBJExporter()
-            self._lift()
-            ex.input = self._renwin
+            ex = self._get_exporter('OBJExporter')
             f_pref = os.path.splitext(file_name)[0]
             ex.file_prefix = f_pref
             self._exporter_write(ex)
@@ -657,8 +696,10 @@ class TVTKScene(HasPrivateTraits):
                     raise TypeError(msg)
                 ex.file_prefix = f_prefix
             else:
-                ex = tvtk.GL2PSExporter()
-                # defaults
+                # The exporter is reused so the settings chosen in the
+                # dialog are remembered for the next save.
+                new = 'GL2PSExporter' not in self._save_objects
+                ex = self._get_exporter('GL2PSExporter', 'render_window')
                 ex.file_prefix = f_prefix
                 if f_ext == ".ps":
                     ex.file_format = 'ps'
@@ -668,8 +709,10 @@ class TVTKScene(HasPrivateTraits):
                     ex.file_format = 'pdf'
                 else:
                     ex.file_format = 'eps'
-                ex.sort = 'bsp'
-                ex.compress = 1
+                if new:
+                    # defaults
+                    ex.sort = 'bsp'
+                    ex.compress = 1
                 ex.edit_traits(kind='livemodal')
 
             self._lift()
@@ -698,12 +741,28 @@ class TVTKScene(HasPrivateTraits):
             return
 
         if len(file_name) != 0:
-            ex = tvtk.X3DExporter()
-            ex.input = self._renwin
+            ex = self._get_exporter('X3DExporter')
             ex.file_name = file_name
             ex.update()
             ex.write()
 
+    def save_glb(self, file_name, quantize=True):
+        """Save the polygons and lines of the scene to a binary glTF
+        file.
+
+        Keyword Arguments:
+
+        file_name -- File name to save to.
+
+        quantize -- Store the positions and normals as integers using
+        the KHR_mesh_quantization extension.  This makes the file much
+        smaller.
+        """
+        from tvtk.pyface.gltf_exporter import scene_to_glb
+        if len(file_name) != 0:
+            with open(file_name, 'wb') as fp:
+                fp.write(scene_to_glb(self, quantize=quantize))
+
     def save_povray(self, file_name):
         """Save scene to a POVRAY (Persistence of Vision Raytracer),
         file (http://www.povray.org).
@@ -720,8 +779,7 @@ class TVTKScene(HasPrivateTraits):
             return
 
         if len(file_name) != 0:
-            ex = tvtk.POVExporter()
-            ex.input = self._renwin
+            ex = self._get_exporter('POVExporter')
             if hasattr(ex, 'file_name'):
                 ex.file_name = file_name
             else:
@@ -830,15 +888,15 @@ class TVTKScene(HasPrivateTraits):
         # Sync various traits.
         self._renderer.background = self.background
         self.sync_trait('background', self._renderer)
-        self._renderer.on_trait_change(self.render, 'background')
+        self._renderer.on_trait_change(self._render_on_change, 'background')
         self._camera.parallel_projection = self.parallel_projection
         self.sync_trait('parallel_projection', self._camera)
         renwin.off_screen_rendering = self.off_screen_rendering
         self.sync_trait('off_screen_rendering', self._renwin)
-        self.render_window.on_trait_change(self.render, 'off_screen_rendering')
-        self.render_window.on_trait_change(self.render, 'stereo_render')
-        self.render_window.on_trait_change(self.render, 'stereo_type')
-        self.camera.on_trait_change(self.render, 'parallel_projection')
+        self.render_window.on_trait_change(self._render_on_change, 'off_screen_rendering')
+        self.render_window.on_trait_change(self._render_on_change, 'stereo_render')
+        self.render_window.on_trait_change(self._render_on_change, 'stereo_type')
+        self.camera.on_trait_change(self._render_on_change, 'parallel_projection')
 
         self._interactor.initialize()
         self._interactor.render()
@@ -852,38 +910,91 @@ class TVTKScene(HasPrivateTraits):
         return self._interactor
 
     def _get_window_to_image(self):
-        w2if = tvtk.WindowToImageFilter(
-            read_front_buffer=not self.off_screen_rendering
-        )
+        w2if = self._save_objects.get('WindowToImageFilter')
+        if w2if is None:
+            w2if = tvtk.WindowToImageFilter()
+            w2if.input = self._renwin
+            self._save_objects['WindowToImageFilter'] = w2if
+        w2if.read_front_buffer = not self.off_screen_rendering
         set_magnification(w2if, self.magnification)
         self._lift()
-        w2if.input = self._renwin
+        # The filter does not notice changes to the window's contents.
+        w2if.modified()
         return w2if
 
+    def _get_image_writer(self, class_name):
+        """Returns the cached image writer of the given TVTK class
+        connected to the cached WindowToImageFilter."""
+        w2if = self._get_window_to_image()
+        ex = self._save_objects.get(class_name)
+        if ex is None:
+            ex = getattr(tvtk, class_name)()
+            configure_input(ex, w2if)
+            self._save_objects[class_name] = ex
+        return ex
+
+    def _get_exporter(self, class_name, window_trait='input'):
+        """Returns the cached exporter of the given TVTK class whose
+        `window_trait` is set to the render window."""
+        ex = self._save_objects.get(class_name)
+        if ex is None:
+            ex = getattr(tvtk, class_name)()
+            setattr(ex, window_trait, self._renwin)
+            self._save_objects[class_name] = ex
+        self._lift()
+        return ex
+
+    def _get_save_method(self, file_name):
+        """Returns the save method for the file's extension."""
+        ext = os.path.splitext(file_name)[1]
+        meth_map = {'.ps': 'ps', '.bmp': 'bmp', '.tiff': 'tiff',
+                    '.png': 'png', '.jpg': 'jpg', '.jpeg': 'jpg',
+                    '.iv': 'iv', '.wrl': 'vrml', '.vrml':'vrml',
+                    '.oogl': 'oogl', '.rib': 'rib', '.obj': 'wavefront',
+                    '.eps': 'gl2ps', '.pdf':'gl2ps', '.tex': 'gl2ps',
+                    '.x3d': 'x3d', '.pov': 'povray', '.glb': 'glb'}
+        if ext.lower() not in meth_map:
+            raise ValueError(
+                'Unable to find suitable image type for given file extension.'
+            )
+        return getattr(self, 'save_' + meth_map[ext.lower()])
+
+    @on_trait_change('_renwin')
+    def _clear_save_objects(self):
+        self._save_objects.clear()
+
     def _lift(self):
         """Lift the window to the top. Useful when saving screen to an
         image."""
         return
 
+    def _set_anti_aliasing(self, frames):
+        """Sets the anti-aliasing frames of the render window and
+        returns the previous setting."""
+        rw = self.render_window
+        if hasattr(rw, 'aa_frames'):
+            old, rw.aa_frames = rw.aa_frames, frames
+        else:
+            old, rw.multi_samples = rw.multi_samples, frames
+        return old
+
     def _exporter_write(self, ex):
         """Abstracts the exporter's write method."""
+        rw = self.render_window
+        if self._saving_many:
+            # `save_many` sets up the anti-aliasing for all the files.
+            rw.render()
+            ex.update()
+            ex.write()
+            return
         # Bumps up the anti-aliasing frames when the image is saved so
         # that the saved picture looks nicer.
-        rw = self.render_window
-        if hasattr(rw, 'aa_frames'):
-            aa_frames = rw.aa_frames
-            rw.aa_frames = self.anti_aliasing_frames
-        else:
-            aa_frames = rw.multi_samples
-            rw.multi_samples = self.anti_aliasing_frames
+        aa_frames = self._set_anti_aliasing(self.anti_aliasing_frames)
         rw.render()
         ex.update()
         ex.write()
         # Set the frames back to original setting.
-        if hasattr(rw, 'aa_frames'):
-            rw.aa_frames = aa_frames
-        else:
-            rw.multi_samples = aa_frames
+        self._set_anti_aliasing(aa_frames)
         rw.render()
 
     def _update_view(self, x, y, z, vx, vy, vz):
@@ -895,6 +1006,27 @@ class TVTKScene(HasPrivateTraits):
         self._renderer.reset_camera()
         self.render()
 
+    def _do_render(self):
+        """Renders the window, toolkit specific scenes override this."""
+        self._renwin.render()
+
+    def _render_on_change(self):
+        """Renders when a trait of the render window, renderer or camera
+        changes.  `render` cannot be the handler since the new value of
+        the trait would be passed as `now`."""
+        self.render()
+
+    def _render_if_pending(self):
+        if self._render_pending:
+            self._render_pending = False
+            if not self.disable_render and self._renwin is not None:
+                self.render_count += 1
+                self._do_render()
+
+    def _coalesce_render_changed(self, value):
+        if not value and self._render_pending:
+            self.render(now=True)
+
     def _disable_render_changed(self, val):
         if not val and self._renwin is not None:
             self.render()
@@ -341,12 +341,6 @@ class Scene(TVTKScene, Widget):
     ###########################################################################
     # 'Scene' interface.
     ###########################################################################
-    def render(self):
-        """ Force the scene to be rendered. Nothing is done if the
-        `disable_render` trait is set to True."""
-        if not self.disable_render:
-            self._vtk_control.Render()
-
     def get_size(self):
         """Return size of the render window."""
         sz = self._vtk_control.size()
@@ -389,6 +383,9 @@ class Scene(TVTKScene, Widget):
     ###########################################################################
     # Non-public interface.
     ###########################################################################
+    def _do_render(self):
+        self._vtk_control.Render()
+
     def _create_control(self, parent):
         """ Create the toolkit-specific control that represents the widget. """
 
@@ -414,15 +411,15 @@ class Scene(TVTKScene, Widget):
         # Sync various traits.
         self._renderer.background = self.background
         self.sync_trait('background', self._renderer)
-        self.renderer.on_trait_change(self.render, 'background')
+        self.renderer.on_trait_change(self._render_on_change, 'background')
         renwin.off_screen_rendering = self.off_screen_rendering
         self._camera.parallel_projection = self.parallel_projection
         self.sync_trait('parallel_projection', self._camera)
         self.sync_trait('off_screen_rendering', self._renwin)
-        self.render_window.on_trait_change(self.render, 'off_screen_rendering')
-        self.render_window.on_trait_change(self.render, 'stereo_render')
-        self.render_window.on_trait_change(self.render, 'stereo_type')
-        self.camera.on_trait_change(self.render, 'parallel_projection')
+        self.render_window.on_trait_change(self._render_on_change, 'off_screen_rendering')
+        self.render_window.on_trait_change(self._render_on_change, 'stereo_render')
+        self.render_window.on_trait_change(self._render_on_change, 'stereo_type')
+        self.camera.on_trait_change(self._render_on_change, 'parallel_projection')
 
         self._interactor = tvtk.to_tvtk(window._Iren)
 
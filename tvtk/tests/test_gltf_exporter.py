@@ -0,0 +1,129 @@
+""" Tests for the binary glTF export of scenes.
+
+"""
+# Copyright (c) 2019, Enthought, Inc.
+# License: BSD Style.
+
+import json
+import struct
+import unittest
+
+import numpy as np
+
+from tvtk.api import tvtk
+from tvtk.common import configure_input, configure_source_data
+from tvtk.pyface.gltf_exporter import GLBBuilder
+
+
+def parse_glb(data):
+    magic, version, length = struct.unpack('<4sII', data[:12])
+    json_length = struct.unpack('<I', data[12:16])[0]
+    gltf = json.loads(data[20:20 + json_length].decode('utf-8'))
+    binary = data[28 + json_length:]
+    return magic, version, length, gltf, binary
+
+
+def get_accessor(gltf, binary, index, dtype, n_components):
+    accessor = gltf['accessors'][index]
+    view = gltf['bufferViews'][accessor['bufferView']]
+    stride = view.get('byteStride', 0)//np.dtype(dtype).itemsize
+    start = view['byteOffset']
+    arr = np.frombuffer(binary[start:start + view['byteLength']],
+                        dtype=dtype)
+    if stride:
+        return arr.reshape(-1, stride)[:, :n_components]
+    return arr.reshape(-1, n_components)
+
+
+class TestGLBBuilder(unittest.TestCase):
+
+    def setUp(self):
+        src = tvtk.SphereSource(theta_resolution=20, phi_resolution=20)
+        elevation = tvtk.ElevationFilter()
+        configure_input(elevation, src)
+        mapper = tvtk.PolyDataMapper()
+        configure_input(mapper, elevation)
+        self.actor = tvtk.Actor(mapper=mapper, position=(1, 2, 3))
+        self.points = src.output.points.to_array()
+        self.n_triangles = src.output.number_of_polys
+
+    def _export(self, quantize):
+        builder = GLBBuilder(quantize=quantize)
+        builder.add_actor(tvtk.to_vtk(self.actor))
+        data = builder.to_bytes()
+        magic, version, length, gltf, binary = parse_glb(data)
+        self.assertEqual(magic, b'glTF')
+        self.assertEqual(version, 2)
+        self.assertEqual(length, len(data))
+        return gltf, binary
+
+    def _get_positions(self, gltf, binary, dtype):
+        primitive = gltf['meshes'][0]['primitives'][0]
+        self.assertEqual(sorted(primitive['attributes']),
+                         ['COLOR_0', 'NORMAL', 'POSITION'])
+        indices = gltf['accessors'][primitive['indices']]
+        self.assertEqual(indices['count'], 3*self.n_triangles)
+        pos = get_accessor(gltf, binary, primitive['attributes']['POSITION'],
+                           dtype, 3)
+        matrix = np.array(gltf['nodes'][0]['matrix']).reshape(4, 4).T
+        return np.dot(pos, matrix[:3, :3].T) + matrix[:3, 3]
+
+    def test_float_export(self):
+        gltf, binary = self._export(quantize=False)
+        self.assertNotIn('extensionsRequired', gltf)
+        pos = self._get_positions(gltf, binary, np.float32)
+        np.testing.assert_allclose(pos, self.points + (1, 2, 3), atol=1e-6)
+
+    def test_quantized_export(self):
+        gltf, binary = self._export(quantize=True)
+        self.assertEqual(gltf['extensionsRequired'],
+                         ['KHR_mesh_quantization'])
+        pos = self._get_positions(gltf, binary, np.uint16)
+        np.testing.assert_allclose(pos, self.points + (1, 2, 3), atol=1e-4)
+
+    def test_quantized_normals_of_flat_mesh(self):
+        # The bounds of the plane are far from a cube.
+        plane = tvtk.PlaneSource(origin=(0, 0, 0), point1=(10, 0, 0),
+                                 point2=(0, 1, 0.1))
+        mapper = tvtk.PolyDataMapper()
+        configure_input(mapper, plane)
+        builder = GLBBuilder(quantize=True)
+        builder.add_actor(tvtk.to_vtk(tvtk.Actor(mapper=mapper)))
+        magic, version, length, gltf, binary = parse_glb(builder.to_bytes())
+        primitive = gltf['meshes'][0]['primitives'][0]
+        normals = get_accessor(gltf, binary,
+                               primitive['attributes']['NORMAL'], np.int8, 3)
+        matrix = np.array(gltf['nodes'][0]['matrix']).reshape(4, 4).T
+        # Viewers transform the normals by the inverse transpose.
+        normals = np.dot(normals/127.0, np.linalg.inv(matrix[:3, :3]))
+        normals /= np.linalg.norm(normals, axis=1)[:, None]
+        expected = np.array([0, -1, 10])/np.sqrt(101.0)
+        np.testing.assert_allclose(normals, np.tile(expected, (4, 1)),
+                                   atol=0.01)
+        pos = get_accessor(gltf, binary, primitive['attributes']['POSITION'],
+                           np.uint16, 3)
+        pos = np.dot(pos, matrix[:3, :3].T) + matrix[:3, 3]
+        np.testing.assert_allclose(pos, plane.output.points.to_array(),
+                                   atol=1e-3)
+
+    def test_glyph_mapper_export(self):
+        points = np.random.RandomState(0).uniform(size=(10, 3))
+        data = tvtk.PolyData(points=points)
+        data.point_data.vectors = points
+        data.point_data.vectors.name = 'vectors'
+        cone = tvtk.ConeSource(resolution=6)
+        mapper = tvtk.Glyph3DMapper()
+        configure_input(mapper, data)
+        configure_source_data(mapper, cone)
+        actor = tvtk.Actor(mapper=mapper)
+        builder = GLBBuilder()
+        builder.add_actor(tvtk.to_vtk(actor))
+        gltf = parse_glb(builder.to_bytes())[3]
+        primitive = gltf['meshes'][0]['primitives'][0]
+        positions = gltf['accessors'][primitive['attributes']['POSITION']]
+        # A cone of 7 points for every point.
+        self.assertEqual(positions['count'], 7*len(points))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ import tempfile
 import unittest
 
 from tvtk.pyface.movie_maker import MovieMaker
+from tvtk.pyface.tvtk_scene import TVTKScene
 
 
 class TestMovieMaker(unittest.TestCase):
@@ -80,6 +81,42 @@ class TestMovieMaker(unittest.TestCase):
         # Then
         self.assertEqual(mm._subdir, 'movie002')
 
+    def test_saves_synchronously_without_workers(self):
+        # Given
+        mm = MovieMaker(record=True, directory=self.root, n_workers=0)
+        mm.scene = mock.Mock(spec=TVTKScene)
+
+        # When
+        with mm.record_movie():
+            mm.animation_step()
+
+        # Then
+        self.assertEqual(mm.scene.save.call_count, 2)
+        fname = mm.scene.save.call_args[0][0]
+        self.assertEqual(os.path.basename(fname), 'anim00001.png')
+
+    def test_frames_are_handed_to_the_writer(self):
+        # Given
+        mm = MovieMaker(record=True, directory=self.root)
+        mm.scene = mock.Mock(spec=TVTKScene)
+        writer = mock.MagicMock()
+        writer.can_write.return_value = True
+        mm._writer = writer
+        mm._grabber = grabber = mock.MagicMock()
+
+        # When
+        mm.animation_step()
+        mm.animation_stop()
+
+        # Then
+        grabber.grab.assert_called_once_with(anti_alias=True)
+        frame, fname = writer.write.call_args[0]
+        self.assertIs(frame, grabber.grab.return_value)
+        self.assertEqual(os.path.basename(fname), 'anim00001.png')
+        writer.close.assert_called_once_with()
+        self.assertIsNone(mm._writer)
+        mm.scene.save.assert_not_called()
+
 
 if __name__ == '__main__':
     unittest.main()
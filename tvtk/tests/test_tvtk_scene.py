@@ -5,10 +5,15 @@
 # Copyright (c) 2015, Enthought, Inc.
 # License: BSD Style.
 
+import os
+import shutil
+import tempfile
 import unittest
 import weakref
 import gc
 
+import mock
+
 from tvtk.pyface.tvtk_scene import TVTKScene
 from tvtk.tests.common import restore_gc_state
 
@@ -38,6 +43,80 @@ class TestTVTKScene(unittest.TestCase):
         # The TVTK Scene should have been collected.
         self.assertTrue(scene_collected[0])
 
+    def test_save_reuses_writers(self):
+        # given
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        scene = TVTKScene(off_screen_rendering=True)
+        self.addCleanup(scene.close)
+        first, second = [os.path.join(root, 'f%d.png' % i) for i in (0, 1)]
+
+        # when
+        scene.save(first)
+        writer = scene._save_objects['PNGWriter']
+        scene.save(second)
+
+        # then
+        self.assertIs(scene._save_objects['PNGWriter'], writer)
+        self.assertTrue(os.path.exists(first))
+        self.assertTrue(os.path.exists(second))
+
+    def test_save_many(self):
+        # given
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        scene = TVTKScene(off_screen_rendering=True)
+        self.addCleanup(scene.close)
+        names = [os.path.join(root, 'f%d.%s' % (i, ext))
+                 for i, ext in enumerate(('png', 'jpg', 'png'))]
+        frames = []
+
+        # when
+        scene.save_many(names, callback=frames.append)
+
+        # then
+        self.assertEqual(frames, [0, 1, 2])
+        for name in names:
+            self.assertTrue(os.path.exists(name))
+        self.assertFalse(scene._saving_many)
+
+    def test_coalesced_renders(self):
+        # given
+        scene = TVTKScene(off_screen_rendering=True)
+        self.addCleanup(scene.close)
+        scene.coalesce_render = True
+        calls = []
+        count = scene.render_count
+
+        # when
+        with mock.patch('pyface.api.GUI.invoke_later', calls.append):
+            for i in range(10):
+                scene.render()
+
+        # then
+        self.assertEqual(scene.render_count, count)
+        self.assertEqual(len(calls), 1)
+
+        # when the UI is idle
+        calls[0]()
+
+        # then
+        self.assertEqual(scene.render_count, count + 1)
+
+        # when
+        scene.render(now=True)
+
+        # then
+        self.assertEqual(scene.render_count, count + 2)
+
+        # when a trait of the renderer changes
+        with mock.patch('pyface.api.GUI.invoke_later', calls.append):
+            scene.background = (1.0, 0.0, 0.0)
+
+        # then the render is deferred too
+        self.assertEqual(scene.render_count, count + 2)
+        self.assertEqual(len(calls), 2)
+
 
 if __name__ == "__main__":
     unittest.main()